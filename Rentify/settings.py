@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,9 +42,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app1.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'app1.routers.ReplicaStickinessMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -51,6 +54,18 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request query accounting (app1.middleware.QueryBudgetMiddleware).
+# Off unless QUERY_BUDGET_ENABLED=1; sample a fraction of production
+# traffic with QUERY_BUDGET_SAMPLE_RATE. Views override the limits with
+# @app1.middleware.query_budget.
+QUERY_BUDGET = {
+    'ENABLED': os.environ.get('QUERY_BUDGET_ENABLED') == '1',
+    'REPORT_PATH': os.environ.get('QUERY_BUDGET_REPORT', BASE_DIR / 'query_budget.jsonl'),
+    'SAMPLE_RATE': float(os.environ.get('QUERY_BUDGET_SAMPLE_RATE', '1.0')),
+    'REPEAT_THRESHOLD': int(os.environ.get('QUERY_BUDGET_REPEAT_THRESHOLD', '5')),
+    'MAX_QUERIES': int(os.environ.get('QUERY_BUDGET_MAX_QUERIES', '50')),
+}
+
 ROOT_URLCONF = 'Rentify.urls'
 
 TEMPLATES = [
@@ -74,13 +89,89 @@ WSGI_APPLICATION = 'Rentify.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Tuned for several gunicorn workers sharing one file. WAL lets readers
+# run alongside the writer, busy_timeout makes a writer wait for the lock
+# instead of failing with "database is locked", and IMMEDIATE transactions
+# take the write lock at BEGIN, so a transaction that reads and then writes
+# can never be refused halfway. Every pragma can be overridden from the
+# environment; they are applied to each new connection via init_command.
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    # Bytes of the file to memory-map, and page cache size (negative = KiB)
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', '-20000')),
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
+# The journal mode is stored in the database file itself, so it is set
+# once by `migrate` (app1 migration sqlite_journal_mode) rather than on
+# every connection.
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            'init_command': '; '.join(
+                f'PRAGMA {name} = {value}' for name, value in SQLITE_PRAGMAS.items()
+            ),
+            'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+        },
+        # Keep connections (and their pragmas and page cache) across requests
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
     }
 }
 
+# Read-only alias for pure-read views (app1.routers). Locally a mode=ro
+# connection to the same file; point SQLITE_REPLICA_PATH at a replica copy
+# in production. It never needs the write lock IMMEDIATE takes.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': 'file:{}?mode=ro'.format(
+        os.environ.get('SQLITE_REPLICA_PATH', DATABASES['default']['NAME'])
+    ),
+    'OPTIONS': {
+        'init_command': DATABASES['default']['OPTIONS']['init_command'],
+    },
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['app1.routers.ReadWriteRouter']
+
+# Seconds a session keeps reading from the primary after it wrote something
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', '10'))
+
+
+# Cache
+# Local memory by default, which only suits a single dev process: point
+# DJANGO_CACHE_BACKEND / DJANGO_CACHE_LOCATION at a shared backend (Redis,
+# or FileBasedCache + a directory) when running several workers, so version
+# bumps reach every process. `check --deploy` refuses LocMem without DEBUG.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'rentify'),
+    },
+    # Password reset codes and reset tokens (app1.otp; its counters are
+    # OtpCounter rows). Every worker must see the same codes, so this is
+    # never LocMem (app1.checks refuses it); the table is created by
+    # `migrate`, or point OTP_CACHE_BACKEND at Redis.
+    'otp': {
+        'BACKEND': os.environ.get(
+            'OTP_CACHE_BACKEND',
+            'django.core.cache.backends.db.DatabaseCache'
+        ),
+        'LOCATION': os.environ.get('OTP_CACHE_LOCATION', 'rentify_otp_cache'),
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -133,6 +224,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'app1.CustomUser'
 
+# Log in by email in one query; ModelBackend still serves username logins
+# (the admin)
+AUTHENTICATION_BACKENDS = [
+    'app1.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Pincode coordinates (app1.geo). The bundled file places ~18.7k 6-digit
+# pincodes at their taluk (or district) town; point this at the India Post
+# pincode directory CSV for post-office precision
+PINCODE_FILE = os.environ.get('PINCODE_FILE', BASE_DIR / 'app1' / 'data' / 'pincodes.csv')
+
+# Sent to Nominatim by `geocode_addresses --street`, as its usage policy asks
+GEOCODER_USER_AGENT = os.environ.get('GEOCODER_USER_AGENT', 'Rentify/1.0 (rentify.care@gmail.com)')
+
+# PBKDF2 cost; hashes made with another count are upgraded at next login
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', '1000000'))
+
+PASSWORD_HASHERS = [
+    'app1.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import CustomUser, Address, BuyerProfile, RentRequest, SellerProfile, Cloth, Category
+from django.db.models import Q
+from django.utils import timezone
+from . import search
+from .models import CustomUser, Address, BuyerProfile, ClothImport, EmailOutbox, RentRequest, SellerProfile, Cloth, Category
 
 
 @admin.register(CustomUser)
@@ -56,6 +59,26 @@ class ClothAdmin(admin.ModelAdmin):
 
     ordering = ("-created_at",)
 
+    list_select_related = ("seller",)
+
+    def get_queryset(self, request):
+        # display_categories reads the prefetch instead of one query per row
+        return super().get_queryset(request).prefetch_related("categories")
+
+    # -------- FULL-TEXT SEARCH -------- #
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search.is_enabled():
+            return super().get_search_results(request, queryset, search_term)
+
+        # FTS5 for name/description, LIKE only for the seller username
+        matches = search.search_clothes(queryset, search_term).values("id")
+        queryset = queryset.filter(
+            Q(id__in=matches)
+            | Q(seller__username__icontains=search_term)
+        )
+        return queryset, False
+
     # -------- CUSTOM ADMIN METHODS -------- #
 
     def display_categories(self, obj):
@@ -92,8 +115,40 @@ class RentRequestAdmin(admin.ModelAdmin):
     )
 
     list_filter = ("status", "created_at")
+    list_select_related = ("cloth", "buyer", "seller")
     search_fields = (
         "cloth__name",
         "buyer__username",
         "seller__username",
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("subject", "recipients", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "to")
+    readonly_fields = ("created_at", "sent_at", "last_error")
+    actions = ["requeue"]
+
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+
+    @admin.action(description="Requeue selected messages")
+    def requeue(self, request, queryset):
+        # Messages a worker is sending right now are left to it
+        count = queryset.exclude(status__in=["sent", "sending"]).update(
+            status="pending", attempts=0, next_attempt_at=timezone.now(), lease_until=None
+        )
+        self.message_user(request, f"{count} messages requeued.")
+
+
+@admin.register(ClothImport)
+class ClothImportAdmin(admin.ModelAdmin):
+    list_display = ("id", "seller", "status", "rows", "created", "error_count", "created_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("seller__username", "seller__email")
+    readonly_fields = (
+        "directory", "file_name", "image_names", "errors",
+        "created_at", "started_at", "lease_until", "finished_at",
+    )
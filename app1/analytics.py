@@ -0,0 +1,221 @@
+"""
+Seller analytics rollups.
+
+SellerDailyStat keeps one row per (seller, cloth, day the request was
+created). The rent-request views call the record_* hooks inside their
+transaction; each hook adds a delta with F() expressions, so the dashboard
+never aggregates raw RentRequest history. `rebuild()` recomputes the whole
+table from RentRequest with NumPy and must agree with the hooks:
+
+    requests                          every request
+    approved_*, unit-days, revenue    requests that are approved or completed
+    paid_amount                       requests marked paid
+"""
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Cloth, RentRequest, SellerDailyStat
+
+
+COUNTED_STATUSES = ("approved", "completed")
+
+DASHBOARD_DAYS = 30
+
+
+# ---------------- INCREMENTAL HOOKS ---------------- #
+
+def _key(rent):
+    return {
+        "seller_id": rent.seller_id,
+        "cloth_id": rent.cloth_id,
+        "day": timezone.localdate(rent.created_at),
+    }
+
+
+def _apply(rent, **deltas):
+    _apply_key(_key(rent), deltas)
+
+
+def _apply_key(key, deltas):
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+
+    if not SellerDailyStat.objects.filter(**key).update(**changes):
+        SellerDailyStat.objects.get_or_create(**key)
+        SellerDailyStat.objects.filter(**key).update(**changes)
+
+
+def record_request(rent):
+    _apply(rent, requests=1)
+
+
+def record_approval(rent, sign=1):
+    """Call with sign=-1 when an approved request is cancelled."""
+    _apply(
+        rent,
+        approved_requests=sign,
+        approved_units=sign * rent.quantity,
+        rented_unit_days=sign * rent.quantity * rent.total_days,
+        revenue=sign * rent.total_price,
+    )
+
+
+def record_approvals(rents):
+    """record_approval for many requests, one UPDATE per rollup row."""
+    totals = {}
+    for rent in rents:
+        key = tuple(_key(rent).items())
+        deltas = totals.setdefault(key, Counter())
+        deltas.update(
+            approved_requests=1,
+            approved_units=rent.quantity,
+            rented_unit_days=rent.quantity * rent.total_days,
+            revenue=rent.total_price,
+        )
+    for key, deltas in totals.items():
+        _apply_key(dict(key), deltas)
+
+
+def record_payment(rent):
+    _apply(rent, paid_amount=rent.total_price)
+
+
+def record_deletion(rent):
+    deltas = {"requests": -1}
+    if rent.status in COUNTED_STATUSES:
+        deltas.update(
+            approved_requests=-1,
+            approved_units=-rent.quantity,
+            rented_unit_days=-rent.quantity * rent.total_days,
+            revenue=-rent.total_price,
+        )
+    if rent.payment_status == "paid":
+        deltas["paid_amount"] = -rent.total_price
+    _apply(rent, **deltas)
+
+
+# ---------------- FULL REBUILD ---------------- #
+
+def rebuild(batch_size=2000):
+    """Recompute every rollup row from RentRequest; returns the row count."""
+    import numpy as np
+
+    rows = list(
+        RentRequest.objects
+        .annotate(day=TruncDate("created_at"))
+        .values_list("seller_id", "cloth_id", "day", "status", "payment_status",
+                     "quantity", "total_days", "total_price")
+        .iterator(chunk_size=batch_size)
+    )
+
+    stats = []
+    if rows:
+        seller, cloth, day, status, payment, quantity, days, price = zip(*rows)
+
+        keys = np.column_stack([
+            np.array(seller, dtype=np.int64),
+            np.array(day, dtype="datetime64[D]").astype(np.int64),
+            np.array(cloth, dtype=np.int64),
+        ])
+        groups, inverse = np.unique(keys, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        counted = np.isin(np.array(status), COUNTED_STATUSES)
+        paid = np.array(payment) == "paid"
+        quantity = np.array(quantity, dtype=np.int64)
+        unit_days = quantity * np.array(days, dtype=np.int64)
+        # Money in paise so the sums stay exact
+        paise = np.rint(np.array(price, dtype=np.float64) * 100).astype(np.int64)
+
+        def total(values):
+            sums = np.zeros(len(groups), dtype=np.int64)
+            np.add.at(sums, inverse, values)
+            return sums
+
+        columns = {
+            "requests": np.bincount(inverse, minlength=len(groups)),
+            "approved_requests": total(counted.astype(np.int64)),
+            "approved_units": total(np.where(counted, quantity, 0)),
+            "rented_unit_days": total(np.where(counted, unit_days, 0)),
+            "revenue": total(np.where(counted, paise, 0)),
+            "paid_amount": total(np.where(paid, paise, 0)),
+        }
+
+        epoch = np.datetime64("1970-01-01", "D")
+        for index, (seller_id, day_number, cloth_id) in enumerate(groups.tolist()):
+            stats.append(SellerDailyStat(
+                seller_id=seller_id,
+                cloth_id=cloth_id,
+                day=(epoch + np.timedelta64(day_number, "D")).item(),
+                requests=int(columns["requests"][index]),
+                approved_requests=int(columns["approved_requests"][index]),
+                approved_units=int(columns["approved_units"][index]),
+                rented_unit_days=int(columns["rented_unit_days"][index]),
+                revenue=Decimal(int(columns["revenue"][index])).scaleb(-2),
+                paid_amount=Decimal(int(columns["paid_amount"][index])).scaleb(-2),
+            ))
+
+    with transaction.atomic():
+        SellerDailyStat.objects.all().delete()
+        SellerDailyStat.objects.bulk_create(stats, batch_size=batch_size)
+
+    return len(stats)
+
+
+# ---------------- DASHBOARD ---------------- #
+
+def seller_summary(seller, days=DASHBOARD_DAYS):
+    """Totals and a per-day revenue series for the last `days` days."""
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+
+    daily = {
+        row["day"]: row
+        for row in (
+            SellerDailyStat.objects
+            .filter(seller=seller, day__gte=since)
+            .values("day")
+            .annotate(
+                requests=Sum("requests"),
+                approved_requests=Sum("approved_requests"),
+                rented_unit_days=Sum("rented_unit_days"),
+                revenue=Sum("revenue"),
+                paid_amount=Sum("paid_amount"),
+            )
+        )
+    }
+
+    zero = {"requests": 0, "approved_requests": 0, "rented_unit_days": 0,
+            "revenue": Decimal(0), "paid_amount": Decimal(0)}
+    series = [
+        {"day": since + timedelta(days=offset),
+         **daily.get(since + timedelta(days=offset), zero)}
+        for offset in range(days)
+    ]
+
+    totals = {key: sum(day[key] for day in series) for key in zero}
+    peak = max((day["revenue"] for day in series), default=0) or 1
+    for day in series:
+        day["height"] = round(day["revenue"] / peak * 100)
+
+    # Denominator for utilization: every unit the seller owns, on hand or out
+    owned = Cloth.objects.filter(seller=seller).aggregate(units=Sum("quantity"))["units"] or 0
+    capacity = owned * days
+
+    return {
+        "days": days,
+        "series": series,
+        "totals": totals,
+        "acceptance_rate": (
+            round(totals["approved_requests"] / totals["requests"] * 100)
+            if totals["requests"] else None
+        ),
+        "utilization": (
+            round(totals["rented_unit_days"] / capacity * 100) if capacity else None
+        ),
+    }
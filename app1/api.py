@@ -0,0 +1,161 @@
+"""
+Read-only JSON catalog for the mobile client.
+
+Both endpoints answer conditional GETs from cached version counters: the
+ETag is derived from the catalog (or cloth) version, the date and the
+request's filters, so a matching If-None-Match gets a 304 before any
+queryset is built. Last-Modified is when that version was bumped, or
+midnight if later: "available" means a unit is free today.
+"""
+import hashlib
+import json
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_GET
+
+from . import availability
+
+from .caching import cloth_namespace, get_version, last_modified
+from .facets import CATALOG
+from .models import Cloth
+from .pagination import KeysetPaginator
+from .routers import replica_reads
+
+
+API_PAGE_SIZE = 24
+API_MAX_PAGE_SIZE = 100
+
+FILTER_PARAMS = ("category", "pincode", "cursor", "limit")
+
+_encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+
+def _etag(*parts):
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _since_today(modified):
+    """Availability is for today, so responses also change at midnight."""
+    midnight = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return max(modified, midnight)
+
+
+# ---------------- RECORDS ---------------- #
+
+def listing_record(cloth):
+    return {
+        "id": cloth.id,
+        "name": cloth.name,
+        "rent_per_day": cloth.rent_per_day,
+        "condition": cloth.condition,
+        "available": cloth.is_available,
+        "categories": [cat.id for cat in cloth.categories.all()],
+        "image": cloth.card_image_url if cloth.image else None,
+        "srcset": cloth.image_srcset,
+        "pincode": cloth.pickup_pincode,
+        "updated_at": cloth.updated_at,
+    }
+
+
+def detail_record(cloth):
+    record = listing_record(cloth)
+    record.update({
+        "description": cloth.description,
+        "quantity": cloth.quantity,
+        "categories": [
+            {"id": cat.id, "name": cat.name, "slug": cat.slug}
+            for cat in cloth.categories.all()
+        ],
+        "pickup": {
+            "pincode": cloth.pickup_pincode,
+            "city": cloth.pickup_city,
+            "state": cloth.pickup_state,
+        },
+        "created_at": cloth.created_at,
+    })
+    return record
+
+
+def stream_page(page):
+    """Serialize one record at a time instead of building the whole body."""
+    yield '{"results":['
+    for index, cloth in enumerate(page):
+        yield ("," if index else "") + _encoder.encode(listing_record(cloth))
+    yield '],"next":' + json.dumps(page.next_cursor)
+    yield ',"previous":' + json.dumps(page.prev_cursor) + "}"
+
+
+# ---------------- CATALOG ---------------- #
+
+def catalog_etag(request):
+    params = sorted(
+        (key, request.GET.get(key, "")) for key in FILTER_PARAMS
+    )
+    return _etag("catalog", get_version(CATALOG), timezone.localdate(), params)
+
+
+def catalog_last_modified(request):
+    return _since_today(last_modified(CATALOG))
+
+
+@replica_reads
+@require_GET
+@condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified)
+def cloth_list_api(request):
+    category = request.GET.get("category", "all")
+    pincode = request.GET.get("pincode")
+
+    try:
+        limit = min(int(request.GET.get("limit", API_PAGE_SIZE)), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"detail": "limit must be a number."}, status=400)
+
+    # Clothes with a unit free today
+    today = timezone.localdate()
+    clothes = availability.available_between(
+        Cloth.objects.prefetch_related("categories"), today, today
+    )
+
+    if category != "all":
+        if not category.isdigit():
+            return JsonResponse({"detail": "Unknown category."}, status=400)
+        clothes = clothes.filter(categories__id=category)
+
+    if pincode:
+        clothes = clothes.filter(pickup_pincode=pincode)
+
+    paginator = KeysetPaginator(ordering=("-created_at", "-id"), per_page=max(limit, 1))
+    page = paginator.paginate(clothes, request.GET.get("cursor"))
+    availability.mark_free_units(page, today, today)
+
+    return StreamingHttpResponse(stream_page(page), content_type="application/json")
+
+
+# ---------------- DETAIL ---------------- #
+
+def detail_etag(request, cloth_id):
+    return _etag("cloth", cloth_id, get_version(cloth_namespace(cloth_id)), timezone.localdate())
+
+
+def detail_last_modified(request, cloth_id):
+    return _since_today(last_modified(cloth_namespace(cloth_id)))
+
+
+@replica_reads
+@require_GET
+@condition(etag_func=detail_etag, last_modified_func=detail_last_modified)
+def cloth_detail_api(request, cloth_id):
+    cloth = (
+        Cloth.objects
+        .prefetch_related("categories")
+        .filter(id=cloth_id)
+        .first()
+    )
+    if cloth is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+
+    return JsonResponse(detail_record(cloth), encoder=DjangoJSONEncoder)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class App1Config(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app1'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
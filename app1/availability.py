@@ -0,0 +1,127 @@
+"""
+Date-range availability for clothes.
+
+`Cloth.quantity` is every unit a cloth owns; approved requests hold some
+of them for their own dates through active StockReservations (see
+app1.inventory, which checks new reservations with the same functions).
+
+For a window [start, end] only the reservations that overlap it matter.
+Their start and end dates are swept in order, so the busiest day (which
+decides how many units are free) costs O(n log n) in the bookings, not
+in the length of the window. Windows are still capped at MAX_WINDOW_DAYS
+wherever a user picks them.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from .models import Cloth, StockReservation
+
+MAX_WINDOW_DAYS = 90
+
+
+def window_error(start, end):
+    """The message explaining why a user-picked window is refused, or None."""
+    if end < start:
+        return "End date cannot be before start date."
+    if (end - start).days + 1 > MAX_WINDOW_DAYS:
+        return f"Rentals can span at most {MAX_WINDOW_DAYS} days."
+    return None
+
+
+def overlapping_bookings(start, end, cloth_ids=None):
+    """Reserved (cloth_id, start, end, quantity) intervals touching the window."""
+    bookings = StockReservation.objects.filter(
+        released_at__isnull=True,
+        start_date__lte=end,
+        end_date__gte=start,
+    )
+    if cloth_ids is not None:
+        bookings = bookings.filter(cloth_id__in=cloth_ids)
+
+    return bookings.values_list("cloth_id", "start_date", "end_date", "quantity")
+
+
+def peak_occupancy(bookings, start, end):
+    """
+    Busiest day per cloth inside [start, end].
+
+    Each booking (clipped to the window, ignored if it misses it) adds +qty
+    on its first day and -qty the day after its last one; a running sum
+    over those events in date order gives the units in use after each one.
+    """
+    events = defaultdict(list)
+    for cloth_id, b_start, b_end, quantity in bookings:
+        if b_end < start or b_start > end:
+            continue
+        events[cloth_id].append((max(b_start, start), quantity))
+        events[cloth_id].append((min(b_end, end) + timedelta(days=1), -quantity))
+
+    peaks = {}
+    for cloth_id, changes in events.items():
+        # On the same day, units coming back (negative) count before new ones go out
+        changes.sort()
+        running = peak = 0
+        for _day, change in changes:
+            running += change
+            peak = max(peak, running)
+        peaks[cloth_id] = peak
+
+    return peaks
+
+
+def free_units_map(cloth_ids, start, end, bookings=None):
+    """Free units over the whole window for the given clothes."""
+    cloth_ids = list(cloth_ids)
+    owned = dict(
+        Cloth.objects.filter(id__in=cloth_ids).values_list("id", "quantity")
+    )
+
+    if bookings is None:
+        bookings = overlapping_bookings(start, end, cloth_ids)
+    peaks = peak_occupancy(bookings, start, end)
+
+    return {
+        cloth_id: max(units - peaks.get(cloth_id, 0), 0)
+        for cloth_id, units in owned.items()
+    }
+
+
+def free_units(cloth, start, end):
+    return free_units_map([cloth.id], start, end).get(cloth.id, 0)
+
+
+def mark_free_units(clothes, start, end):
+    """
+    Set `free_units` (units free on every day of the window) on loaded
+    clothes, with one query for all of them. Cloth.is_available reads it.
+    """
+    clothes = list(clothes)
+    peaks = peak_occupancy(
+        overlapping_bookings(start, end, [cloth.id for cloth in clothes]), start, end
+    )
+    for cloth in clothes:
+        cloth.free_units = max(cloth.quantity - peaks.get(cloth.id, 0), 0)
+    return clothes
+
+
+def available_between(queryset, start, end, quantity=1):
+    """
+    Restrict a Cloth queryset to clothes with at least `quantity` units free
+    on every day of [start, end].
+
+    Only reservations overlapping the window are read; every other cloth
+    is free up to the units it owns.
+    """
+    # Written as "> n - 1" so the default one-unit filter is "quantity > 0",
+    # the condition of the partial catalog index
+    queryset = queryset.filter(quantity__gt=quantity - 1)
+
+    bookings = list(overlapping_bookings(start, end))
+    if not bookings:
+        return queryset
+
+    booked_ids = {cloth_id for cloth_id, *_ in bookings}
+    free = free_units_map(booked_ids, start, end, bookings)
+    blocked = [cloth_id for cloth_id, units in free.items() if units < quantity]
+
+    return queryset.exclude(id__in=blocked)
@@ -0,0 +1,34 @@
+"""
+Log in with an email address.
+
+EmailBackend finds the user with one query on the unique email index and
+checks the password. When no user has that email it still hashes the
+password once, so a wrong email takes as long as a wrong password and the
+response time does not reveal which accounts exist.
+
+check_password() also rehashes a stored password whose hasher or
+iteration count is out of date (see PASSWORD_PBKDF2_ITERATIONS), so cost
+changes reach every account at its next login.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class EmailBackend(ModelBackend):
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        # Username logins (the admin) are left to ModelBackend
+        if email is None or password is None:
+            return None
+
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.get(email=email)
+        except UserModel.DoesNotExist:
+            # Same work as a real check, so misses cannot be timed apart
+            UserModel().set_password(password)
+            return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,792 @@
+"""
+Micro-benchmarks run with `python manage.py bench <scenario>`.
+
+Every scenario that needs data creates it inside a transaction that is
+rolled back at the end, so benchmarks never leave rows behind. The replica
+scenario has to commit its catalog for other connections to see it; it
+tags the rows with a run id and deletes them in a finally block.
+"""
+import random
+import statistics
+from contextlib import contextmanager
+from decimal import Decimal
+from time import perf_counter
+
+from django.db import transaction
+
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+@contextmanager
+def rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = perf_counter()
+        func()
+        samples.append(perf_counter() - started)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds."""
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+# ---------------- SYNTHETIC DATA ---------------- #
+
+WORDS = [
+    "silk", "cotton", "banarasi", "kanjivaram", "chiffon", "georgette",
+    "velvet", "embroidered", "zari", "bridal", "party", "festive", "saree",
+    "lehenga", "sherwani", "kurta", "gown", "anarkali", "dupatta", "jacket",
+    "red", "maroon", "gold", "ivory", "pastel", "navy", "emerald", "pink",
+]
+
+
+def make_catalog(size, seed=42, tag="bench"):
+    """
+    Bulk-create one seller, a few categories and `size` clothes, named
+    after `tag` so drop_catalog(tag) finds them again.
+    """
+    from .models import Category, Cloth, CustomUser
+
+    rng = random.Random(seed)
+
+    seller = CustomUser.objects.create(
+        username=f"{tag}-seller@rentify.test",
+        email=f"{tag}-seller@rentify.test",
+        is_seller=True,
+    )
+    categories = Category.objects.bulk_create([
+        Category(name=f"{tag.title()} {word.title()}", slug=f"{tag}-{word}")
+        for word in ("sarees", "lehengas", "sherwanis", "gowns", "kurtas")
+    ])
+
+    clothes = Cloth.objects.bulk_create([
+        Cloth(
+            seller=seller,
+            name=" ".join(rng.sample(WORDS, 3)).title(),
+            description=" ".join(rng.choices(WORDS, k=20) + [f"style{index}"]),
+            quantity=rng.randint(0, 5),
+            rent_per_day=Decimal(rng.randint(200, 5000)),
+        )
+        for index in range(size)
+    ], batch_size=1000)
+
+    Through = Cloth.categories.through
+    Through.objects.bulk_create([
+        Through(cloth_id=cloth.id, category_id=rng.choice(categories).id)
+        for cloth in clothes
+    ], batch_size=1000)
+
+    return seller, categories, clothes
+
+
+def drop_catalog(tag):
+    """Delete whatever make_catalog(tag=tag) created, even a partial run."""
+    from .models import Category, CustomUser
+
+    CustomUser.objects.filter(username=f"{tag}-seller@rentify.test").delete()
+    Category.objects.filter(slug__startswith=f"{tag}-").delete()
+
+
+# ---------------- SCENARIOS ---------------- #
+
+@scenario("search")
+def bench_search(options):
+    """FTS5 + BM25 search against the LIKE '%...%' scan it replaces."""
+    from . import search
+    from .models import Cloth
+
+    size = options["size"]
+    queries = {
+        # Matches a large share of the catalog
+        "common": ["silk saree", "bridal lehenga", "emb", "navy sherwani"],
+        # Matches one or two rows, so LIKE has to scan the whole table
+        "selective": [f"style{size // 3}", f"style{size // 2}", "style7 gold"],
+    }
+    results = {}
+
+    with rolled_back():
+        make_catalog(size)
+        search.rebuild_index()
+
+        base = Cloth.objects.filter(quantity__gt=0)
+
+        def run(search_func, ordering, terms):
+            def run_queries():
+                for q in terms:
+                    list(search_func(base, q)
+                         .order_by(*ordering)
+                         .values_list("id", flat=True)[:24])
+            return run_queries
+
+        for label, terms in queries.items():
+            results[f"fts5_{label}"] = summarize(timed(
+                run(search.search_clothes, ("search_rank", "id"), terms),
+                options["repeat"]
+            ))
+            results[f"like_{label}"] = summarize(timed(
+                run(search.like_search, ("-created_at", "-id"), terms),
+                options["repeat"]
+            ))
+
+    return results
+
+
+@scenario("receipts")
+def bench_receipts(options):
+    """
+    PDF receipts per second rendered in this process against a process pool.
+    Renders --size receipts per run; try `--size 500 --repeat 3`.
+    """
+    import os
+
+    from . import receipts
+
+    rng = random.Random(42)
+    field_list = [
+        {
+            "id": index,
+            "cloth": " ".join(rng.sample(WORDS, 3)).title(),
+            "seller": "Bench Seller",
+            "buyer": f"Buyer {index}",
+            "quantity": rng.randint(1, 3),
+            "start_date": "2026-01-01",
+            "end_date": "2026-01-05",
+            "total_days": 5,
+            "total_price": f"{rng.randint(500, 20000)}.00",
+        }
+        for index in range(options["size"])
+    ]
+    workers = os.cpu_count() or 1
+
+    def single():
+        for fields in field_list:
+            receipts.render_receipt(fields)
+
+    def pooled():
+        receipts.render_many(field_list, workers=workers)
+
+    results = {}
+    for label, func in (("single_process", single), (f"pool_{workers}_workers", pooled)):
+        summary = summarize(timed(func, options["repeat"]))
+        summary["receipts_per_s"] = round(len(field_list) / (summary["mean_ms"] / 1000), 1)
+        results[label] = summary
+
+    return results
+
+
+@scenario("import")
+def bench_import(options):
+    """
+    Bulk cloth import throughput for CSV and JSONL. Imports --size rows per
+    run, sharing a few dozen images; try `--size 10000 --repeat 3`.
+    """
+    import csv
+    import io
+    import json
+    import tempfile
+
+    from django.test import override_settings
+    from PIL import Image
+
+    from . import imports
+    from .models import Category, CustomUser
+
+    rng = random.Random(42)
+    size = options["size"]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as media_root, \
+            tempfile.TemporaryDirectory() as image_dir, \
+            override_settings(MEDIA_ROOT=media_root):
+
+        image_names = []
+        for index in range(24):
+            name = f"bench-{index}.jpg"
+            Image.new("RGB", (1200, 1600), (index * 10, 80, 120)).save(
+                f"{image_dir}/{name}", quality=85
+            )
+            image_names.append(name)
+
+        rows = [
+            {
+                "name": " ".join(rng.sample(WORDS, 3)).title(),
+                "description": " ".join(rng.choices(WORDS, k=20)),
+                "quantity": rng.randint(1, 5),
+                "rent_per_day": rng.randint(200, 5000),
+                "condition": rng.choice(["new", "like_new", "good", "fair"]),
+                "categories": "bench-sarees|bench-gowns" if index % 3 else "bench-kurtas",
+                "image": image_names[index % len(image_names)],
+            }
+            for index in range(size)
+        ]
+
+        text = io.StringIO()
+        writer = csv.DictWriter(text, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        files = {
+            "csv": text.getvalue().encode(),
+            "jsonl": "".join(json.dumps(row) + "\n" for row in rows).encode(),
+        }
+
+        for file_format, content in files.items():
+            created = []
+
+            def run():
+                with rolled_back():
+                    seller = CustomUser.objects.create(
+                        username="bench-seller@rentify.test", is_seller=True,
+                    )
+                    Category.objects.bulk_create([
+                        Category(name=f"Bench {word.title()}", slug=f"bench-{word}")
+                        for word in ("sarees", "gowns", "kurtas")
+                    ])
+                    result = imports.import_clothes(
+                        imports.read_rows(io.BytesIO(content), file_format),
+                        seller,
+                        image_dir,
+                    )
+                    created.append(result.created)
+
+            summary = summarize(timed(run, options["repeat"]))
+            summary["created"] = created[-1]
+            summary["rows_per_s"] = round(size / (summary["mean_ms"] / 1000), 1)
+            results[file_format] = summary
+
+    return results
+
+
+def _sqlite_database(path, options):
+    """
+    Register `path` as the "bench_sqlite" alias with the given DATABASES
+    OPTIONS, so the benchmark goes through Django's sqlite backend (its
+    init_command and transaction_mode) like the app does.
+    """
+    from django.db import connections
+    from django.db.utils import load_backend
+
+    alias = "bench_sqlite"
+    # Fills in the defaults a DATABASES entry gets (it must be called "default")
+    config = connections.configure_settings({
+        "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": path, "OPTIONS": options},
+    })["default"]
+    connections[alias] = load_backend(config["ENGINE"]).DatabaseWrapper(config, alias)
+    return alias
+
+
+def _sqlite_worker(job):
+    """One writer-reader process of the sqlite benchmark (a gunicorn worker)."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    from django.db import OperationalError, connections, transaction
+
+    path, db_options, operations, seed, size = job
+    rng = random.Random(seed)
+    alias = _sqlite_database(path, db_options)
+    connection = connections[alias]
+
+    reads, writes, locked = [], [], 0
+    for _ in range(operations):
+        started = perf_counter()
+        try:
+            if rng.random() < 0.8:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT id, name, quantity FROM bench_cloth WHERE quantity > 0 "
+                        "ORDER BY id DESC LIMIT 24 OFFSET %s", [rng.randrange(size // 2)]
+                    )
+                    cursor.fetchall()
+                reads.append(perf_counter() - started)
+            else:
+                # Read, then write in the same transaction, like accept_rent_request
+                cloth_id = rng.randrange(1, size + 1)
+                with transaction.atomic(using=alias), connection.cursor() as cursor:
+                    cursor.execute("SELECT quantity FROM bench_cloth WHERE id = %s", [cloth_id])
+                    cursor.fetchone()
+                    cursor.execute(
+                        "UPDATE bench_cloth SET quantity = quantity + 1 WHERE id = %s",
+                        [cloth_id]
+                    )
+                writes.append(perf_counter() - started)
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            locked += 1
+
+    connection.close()
+    return reads, writes, locked
+
+
+@scenario("sqlite")
+def bench_sqlite(options):
+    """
+    Concurrent reads and read-then-write transactions from several
+    processes against one SQLite file, each through a Django connection:
+    a bare DATABASES entry against the settings' OPTIONS (init_command
+    pragmas, IMMEDIATE transactions) on a file in SQLITE_JOURNAL_MODE.
+    Every process runs --repeat operations on a --size row table; try
+    `--repeat 2000`.
+    """
+    import os
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    from django.conf import settings
+    from django.db import connections, transaction
+
+    size = options["size"]
+    workers = max(4, (os.cpu_count() or 1) * 2)
+    profiles = {
+        # What a bare DATABASES entry gets: rollback journal, deferred BEGIN
+        "defaults": ({}, "DELETE"),
+        "tuned": (settings.DATABASES["default"]["OPTIONS"], settings.SQLITE_JOURNAL_MODE),
+    }
+    results = {}
+
+    for label, (db_options, journal_mode) in profiles.items():
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.sqlite3")
+            alias = _sqlite_database(path, db_options)
+            # Set once on the file, as the sqlite_journal_mode migration does for the app's database
+            with connections[alias].cursor() as cursor:
+                cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+            with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+                cursor.execute(
+                    "CREATE TABLE bench_cloth (id INTEGER PRIMARY KEY, name TEXT, quantity INTEGER)"
+                )
+                cursor.executemany(
+                    "INSERT INTO bench_cloth (name, quantity) VALUES (%s, %s)",
+                    [(f"cloth {index}", index % 5) for index in range(size)],
+                )
+            connections[alias].close()
+
+            jobs = [
+                (path, db_options, options["repeat"], seed, size)
+                for seed in range(workers)
+            ]
+            started = perf_counter()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outcomes = list(pool.map(_sqlite_worker, jobs))
+            elapsed = perf_counter() - started
+
+        reads = [sample for outcome in outcomes for sample in outcome[0]]
+        writes = [sample for outcome in outcomes for sample in outcome[1]]
+        locked = sum(outcome[2] for outcome in outcomes)
+
+        for kind, samples in (("read", reads), ("write", writes)):
+            summary = summarize(samples) if samples else {"runs": 0}
+            summary["ops_per_s"] = round(len(samples) / elapsed, 1)
+            if kind == "write":
+                summary["locked_errors"] = locked
+            results[f"{label}_{kind}"] = summary
+
+    return results
+
+
+@scenario("replica")
+def bench_replica(options):
+    """
+    Mixed load from threads, each with its own connections: readers page
+    through the catalog while writers update clothes in short
+    transactions. Reads run once on the primary and once through
+    use_replica(). Creates --size clothes, committed so every connection
+    sees them, under a tag of its own and deletes them afterwards; every
+    thread runs --repeat operations.
+    """
+    import threading
+    import uuid
+
+    from django.db import connections
+    from django.utils import timezone
+
+    from . import routers
+    from .models import Cloth
+
+    readers, writers = 6, 2
+    size = options["size"]
+    tag = f"bench-replica-{uuid.uuid4().hex[:8]}"
+    results = {}
+
+    def read(samples, rng, replica):
+        def page():
+            offset = rng.randrange(max(size - 24, 1))
+            list(
+                Cloth.objects.filter(quantity__gt=0)
+                .order_by("-created_at", "-id")
+                .values_list("id", "name", "rent_per_day")[offset:offset + 24]
+            )
+        for _ in range(options["repeat"]):
+            started = perf_counter()
+            if replica:
+                with routers.use_replica():
+                    page()
+            else:
+                page()
+            samples.append(perf_counter() - started)
+
+    def write(samples, rng):
+        for _ in range(options["repeat"]):
+            started = perf_counter()
+            with transaction.atomic():
+                Cloth.objects.filter(pk=rng.choice(cloth_ids)).update(updated_at=timezone.now())
+            samples.append(perf_counter() - started)
+
+    def run_thread(target, *args):
+        try:
+            target(*args)
+        finally:
+            connections.close_all()
+
+    try:
+        with transaction.atomic():
+            cloth_ids = [cloth.id for cloth in make_catalog(size, tag=tag)[2]]
+
+        for label, replica in (("primary", False), ("replica", True)):
+            read_samples, write_samples = [], []
+            threads = [
+                threading.Thread(target=run_thread, args=(read, read_samples, random.Random(seed), replica))
+                for seed in range(readers)
+            ] + [
+                threading.Thread(target=run_thread, args=(write, write_samples, random.Random(seed)))
+                for seed in range(writers)
+            ]
+            started = perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = perf_counter() - started
+
+            for kind, samples in (("read", read_samples), ("write", write_samples)):
+                summary = summarize(samples)
+                summary["ops_per_s"] = round(len(samples) / elapsed, 1)
+                results[f"{label}_{kind}"] = summary
+    finally:
+        drop_catalog(tag)
+
+    return results
+
+
+def _view_fixtures():
+    """
+    One seller and one buyer who between them have a request in every
+    state the views need, and the URL kwargs/POST data for each view.
+    """
+    from . import otp
+    from .models import Cloth, RentRequest
+
+    def first(**filters):
+        return RentRequest.objects.filter(**filters).order_by("id").first()
+
+    seller_id = (
+        RentRequest.objects.filter(status="approved", payment_status="paid")
+        .values_list("seller_id", flat=True).order_by("id").first()
+    )
+    pending = first(seller_id=seller_id, status="pending")
+    paid = first(seller_id=seller_id, status="approved", payment_status="paid")
+    unpaid = first(seller_id=seller_id, status="approved", payment_status="pending")
+    closed = first(seller_id=seller_id, status__in=["rejected", "cancelled"])
+    cloth = Cloth.objects.filter(seller_id=seller_id).order_by("id").first()
+    buyer_rent = first(buyer_id=pending.buyer_id, status="pending") if pending else None
+
+    def rent(value):
+        return {"pk": value.pk} if value else None
+
+    start = buyer_rent.start_date if buyer_rent else None
+    return {
+        "seller": seller_id,
+        "buyer": buyer_rent.buyer_id if buyer_rent else None,
+        # URL name: (who, method, kwargs, data); kwargs None = no fixture
+        "plan": {
+            "home": (None, "get", {}, None),
+            "login": (None, "get", {}, None),
+            "register": (None, "get", {}, None),
+            "logout": ("buyer", "get", {}, None),
+            "buyer_dashboard": ("buyer", "get", {}, None),
+            "edit_rent_request": ("buyer", "post", rent(buyer_rent), {
+                "quantity": 1,
+                "start_date": str(start),
+                "end_date": str(start),
+            }),
+            "cancel_rent_request": ("buyer", "post", rent(buyer_rent), {}),
+            "rent_clothes": ("buyer", "get", {}, None),
+            "seller_dashboard": ("seller", "get", {}, None),
+            "list_clothes": ("seller", "get", {}, None),
+            "import_clothes": ("seller", "get", {}, None),
+            "edit_cloth": ("seller", "post", {"cloth_id": cloth.pk} if cloth else None, {
+                "name": cloth.name,
+                "quantity": cloth.quantity,
+                "rent_per_day": cloth.rent_per_day,
+                "condition": cloth.condition,
+                "description": cloth.description,
+                "categories": list(cloth.categories.values_list("id", flat=True)),
+            } if cloth else None),
+            "delete_cloth": ("seller", "post", {"cloth_id": cloth.pk} if cloth else None, {}),
+            "cloth_detail": ("buyer", "get", {"cloth_id": cloth.pk} if cloth else None, None),
+            "request_cloth": ("buyer", "get", {"cloth_id": cloth.pk} if cloth else None, None),
+            "delete_rent_request": ("seller", "post", rent(closed), {}),
+            "accept_rent": ("seller", "post", rent(pending), {}),
+            "reject_rent": ("seller", "post", rent(pending), {}),
+            "mark_paid": ("seller", "post", rent(unpaid), {}),
+            "complete_rental": ("seller", "post", rent(paid), {}),
+            "bulk_rent_requests": ("seller", "post", {}, {
+                "action": "reject",
+                "ids": list(
+                    RentRequest.objects.filter(seller_id=seller_id, status="pending")
+                    .order_by("id").values_list("id", flat=True)[:20]
+                ),
+            }),
+            "download_receipt": ("seller", "get", rent(paid), None),
+            "forgot_password": (None, "get", {}, None),
+            "verify_otp": (None, "get", {}, {
+                "token": otp.verify_token(buyer_rent.buyer.email),
+            } if buyer_rent else None),
+            "reset_password": (None, "get", {}, None),
+            "api_cloth_list": (None, "get", {}, None),
+            "api_cloth_detail": (None, "get", {"cloth_id": cloth.pk} if cloth else None, None),
+        },
+    }
+
+
+@scenario("views")
+def bench_views(options):
+    """
+    Every URL in app1/urls.py through the test client against a seeded
+    marketplace of --size clothes (one seller per 100, two requests per
+    cloth): latency percentiles, queries and peak Python memory per
+    request. Each request runs in a savepoint that is rolled back, so the
+    views that accept, reject or delete see the same rows on every run.
+    Caches are warmed by one untimed run first; `cold_queries` is what
+    that run cost. Use `--json` to keep results for diffing.
+    """
+    import copy
+    import tempfile
+    import tracemalloc
+
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from . import seeding, urls
+    from .models import CustomUser
+
+    size = options["size"]
+    sellers = max(size // 100, 1)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as media_root, override_settings(
+        MEDIA_ROOT=media_root,
+        ALLOWED_HOSTS=["testserver"],
+        EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    ), rolled_back():
+        seeding.seed(sellers=sellers, clothes=size, requests=size * 2)
+        fixtures = _view_fixtures()
+
+        clients = {None: Client()}
+        for role in ("seller", "buyer"):
+            clients[role] = Client()
+            if fixtures[role]:
+                clients[role].force_login(CustomUser.objects.get(pk=fixtures[role]))
+
+        def request(client, method, url, data, statements=None):
+            # Roll back the rows and the cookies, so logout logs out once
+            cookies = copy.deepcopy(client.cookies)
+            with transaction.atomic():
+                if statements is None:
+                    response = getattr(client, method)(url, data or {})
+                else:
+                    # The test client resets connection.queries on every
+                    # request, so count statements as they execute instead
+                    with connection.execute_wrapper(
+                        lambda execute, sql, *args: statements.append(sql) or execute(sql, *args)
+                    ):
+                        response = getattr(client, method)(url, data or {})
+                transaction.set_rollback(True)
+            client.cookies = cookies
+            return response
+
+        for pattern in urls.urlpatterns:
+            name = pattern.name
+            if name not in fixtures["plan"]:
+                results[name] = {"skipped": "no plan"}
+                continue
+            role, method, kwargs, data = fixtures["plan"][name]
+            if kwargs is None or (role and not fixtures[role]):
+                results[name] = {"skipped": "no matching rows"}
+                continue
+
+            url = reverse(name, kwargs=kwargs)
+            client = clients[role]
+
+            cold, warm = [], []
+            cache.clear()
+            response = request(client, method, url, data, cold)
+            request(client, method, url, data, warm)
+
+            tracemalloc.start()
+            request(client, method, url, data)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            summary = summarize(timed(
+                lambda: request(client, method, url, data), options["repeat"]
+            ))
+            summary.update({
+                "method": method.upper(),
+                "status": response.status_code,
+                "queries": len(warm),
+                "cold_queries": len(cold),
+                "peak_kb": round(peak / 1024, 1),
+            })
+            results[name] = summary
+
+    return results
+
+
+@scenario("otp")
+def bench_otp(options):
+    """
+    One password reset's worth of OTP bookkeeping: send, check the code,
+    then set the password. "session" replays what the views used to do
+    with the database session store; "cache" is app1.otp. Reports latency
+    and the database writes each flow makes.
+    """
+    from importlib import import_module
+
+    from django.conf import settings
+    from django.db import connection
+
+    from . import otp
+
+    SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+    rng = random.Random(42)
+
+    def session_flow():
+        email = f"user{rng.randrange(options['size'])}@rentify.test"
+        code = str(rng.randint(100000, 999999))
+        # forgot_password
+        session = SessionStore()
+        session["reset_email"] = email
+        session["reset_otp"] = code
+        session.save()
+        # verify_otp
+        session = SessionStore(session.session_key)
+        session.get("reset_otp")
+        # reset_password
+        session = SessionStore(session.session_key)
+        session.get("reset_email")
+        del session["reset_email"]
+        del session["reset_otp"]
+        session.save()
+
+    def cache_flow():
+        email = f"user{rng.randrange(options['size'])}@rentify.test"
+        # forgot_password
+        otp.rate_limited(email, "10.0.0.1")
+        code = otp.issue(email)
+        token = otp.verify_token(email)
+        # verify_otp
+        otp.verify(otp.email_from_verify_token(token), code)
+        token = otp.reset_token(email)
+        # reset_password
+        otp.email_from_reset_token(token)
+        otp.consume_reset_token(token)
+
+    results = {}
+    with rolled_back():
+        for label, func in (("session", session_flow), ("cache", cache_flow)):
+            writes = []
+
+            def count_writes(execute, sql, *args):
+                if sql.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+                    writes.append(sql)
+                return execute(sql, *args)
+
+            with connection.execute_wrapper(count_writes):
+                func()
+            summary = summarize(timed(func, options["repeat"]))
+            summary["db_writes"] = len(writes)
+            results[label] = summary
+
+    return results
+
+
+@scenario("login")
+def bench_login(options):
+    """
+    Login checks per second among --size accounts, hits and misses: the
+    old two-step lookup (get by email, then ModelBackend by username)
+    against EmailBackend. Hashes at the configured
+    PASSWORD_PBKDF2_ITERATIONS, so keep --repeat low (try `--repeat 10`).
+    A miss that is much faster than a hit leaks which emails exist.
+    """
+    from django.contrib.auth.backends import ModelBackend
+    from django.contrib.auth.hashers import make_password
+
+    from .backends import EmailBackend
+    from .models import CustomUser
+
+    size = options["size"]
+    rng = random.Random(42)
+    password = "bench-pass-123"
+
+    def old_flow(email):
+        try:
+            user = CustomUser.objects.get(email=email)
+        except CustomUser.DoesNotExist:
+            return None
+        return ModelBackend().authenticate(None, username=user.username, password=password)
+
+    def new_flow(email):
+        return EmailBackend().authenticate(None, email=email, password=password)
+
+    results = {}
+    with rolled_back():
+        hashed = make_password(password)
+        CustomUser.objects.bulk_create([
+            CustomUser(username=f"login{index}", email=f"login{index}@rentify.test", password=hashed)
+            for index in range(size)
+        ], batch_size=1000)
+
+        for label, flow in (("two_step", old_flow), ("email_backend", new_flow)):
+            for outcome, domain in (("hit", "rentify.test"), ("miss", "nowhere.test")):
+                summary = summarize(timed(
+                    lambda: flow(f"login{rng.randrange(size)}@{domain}"), options["repeat"]
+                ))
+                summary["logins_per_s"] = round(1000 / summary["mean_ms"], 1)
+                results[f"{label}_{outcome}"] = summary
+
+    return results
@@ -0,0 +1,173 @@
+import hashlib
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+# ---------------- VERSION COUNTERS ---------------- #
+
+def _version_key(namespace):
+    return f"rentify:version:{namespace}"
+
+
+def get_version(namespace):
+    """Current version counter of a cached namespace (starts at 1)."""
+    return cache.get_or_set(_version_key(namespace), 1, timeout=None)
+
+
+def _modified_key(namespace):
+    return f"rentify:modified:{namespace}"
+
+
+def _incr_version(namespace):
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+        return 2
+
+
+def bump_version(namespace):
+    """
+    Invalidate everything cached under `namespace` by moving its counter.
+    Old entries are never read again and simply expire.
+    """
+    version = _incr_version(namespace)
+    cache.set(_modified_key(namespace), timezone.now(), timeout=None)
+    return version
+
+
+def get_versions(namespaces):
+    """{namespace: version} for many counters in one cache round trip."""
+    keys = {_version_key(ns): ns for ns in namespaces}
+    found = cache.get_many(keys)
+    return {ns: found.get(key, 1) for key, ns in keys.items()}
+
+
+def bump_versions(namespaces):
+    namespaces = list(namespaces)
+    for namespace in namespaces:
+        _incr_version(namespace)
+    now = timezone.now()
+    cache.set_many({_modified_key(namespace): now for namespace in namespaces}, timeout=None)
+
+
+def bump_on_commit(namespaces):
+    """
+    bump_versions() once the current transaction commits. Bumped earlier,
+    a concurrent request could still read the old rows and cache them
+    under the new version.
+    """
+    namespaces = list(namespaces)
+    transaction.on_commit(lambda: bump_versions(namespaces))
+
+
+def last_modified(namespace):
+    """
+    When `namespace` was last bumped, which covers deletes and relation
+    changes no updated_at column sees. A timestamp the cache lost starts
+    again from now.
+    """
+    return cache.get_or_set(_modified_key(namespace), timezone.now, timeout=None)
+
+
+def cloth_namespace(cloth_id):
+    return f"cloth:{cloth_id}"
+
+
+# ---------------- FRAGMENT KEYS ---------------- #
+
+def fragment_key(name, parts):
+    raw = "|".join(str(part) for part in parts)
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"rentify:fragment:{name}:{digest}"
+
+
+# ---------------- BATCHED LOOKUPS ---------------- #
+
+_batch = ContextVar("cache_batch", default=None)
+
+
+@contextmanager
+def batched_lookups(keys=()):
+    """
+    Render a page of fragments with two cache round trips instead of two
+    per fragment: `keys` are fetched with one get_many up front, and the
+    hit/miss counters recorded inside the block are written on exit with
+    one incr per counter.
+    """
+    keys = list(keys)
+    batch = {
+        "keys": set(keys),
+        "found": cache.get_many(keys) if keys else {},
+        "counts": Counter(),
+    }
+    token = _batch.set(batch)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+        for key, count in batch["counts"].items():
+            _incr(key, count)
+
+
+def get_fragment(key):
+    batch = _batch.get()
+    if batch is not None and key in batch["keys"]:
+        return batch["found"].get(key)
+    return cache.get(key)
+
+
+# ---------------- HIT / MISS STATS ---------------- #
+
+STATS_KEYS = ("hits", "misses")
+
+
+def _stats_key(name, outcome):
+    return f"rentify:stats:{name}:{outcome}"
+
+
+def _incr(key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def record_lookup(name, hit):
+    key = _stats_key(name, "hits" if hit else "misses")
+    batch = _batch.get()
+    if batch is not None:
+        batch["counts"][key] += 1
+    else:
+        _incr(key, 1)
+
+
+def lookup_stats(names):
+    """{name: {"hits", "misses", "hit_rate"}} for the given cache names."""
+    keys = [_stats_key(name, outcome) for name in names for outcome in STATS_KEYS]
+    found = cache.get_many(keys)
+
+    stats = {}
+    for name in names:
+        hits = found.get(_stats_key(name, "hits"), 0)
+        misses = found.get(_stats_key(name, "misses"), 0)
+        total = hits + misses
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else None,
+        }
+    return stats
+
+
+def reset_stats(names):
+    cache.delete_many([
+        _stats_key(name, outcome) for name in names for outcome in STATS_KEYS
+    ])
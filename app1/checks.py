@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from . import geo
+
+# Fewer 6-digit pincodes than this and most searches only find a district
+MIN_PINCODES = 10000
+
+# Backends whose entries live inside one process
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches)
+def check_otp_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("otp", {}).get("BACKEND")
+    if backend is None:
+        return [Error(
+            'CACHES has no "otp" alias.',
+            hint="Password reset codes are kept in it (app1.otp).",
+            id="app1.E001",
+        )]
+    if backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f'CACHES["otp"] uses {backend}, which each worker keeps to itself.',
+            hint="Codes and reset tokens must be shared: use "
+                 "DatabaseCache or Redis.",
+            id="app1.E002",
+        )]
+    return []
+
+
+@register(Tags.caches, deploy=True)
+def check_default_cache(app_configs, **kwargs):
+    backend = settings.CACHES["default"]["BACKEND"]
+    if not settings.DEBUG and backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f'CACHES["default"] uses {backend}, which each worker keeps to itself.',
+            hint="A catalog version bumped in one worker would not reach the "
+                 "others; set DJANGO_CACHE_BACKEND to a shared backend such as "
+                 "Redis, FileBasedCache or DatabaseCache.",
+            id="app1.E003",
+        )]
+    return []
+
+
+@register()
+def check_pincode_file(app_configs, **kwargs):
+    try:
+        table = geo.pincode_table()
+    except OSError as exc:
+        return [Error(
+            f"PINCODE_FILE cannot be read: {exc}",
+            hint="Radius search needs it (app1.geo).",
+            id="app1.E004",
+        )]
+    pincodes = sum(len(pincode) == 6 for pincode in table)
+    if pincodes < MIN_PINCODES:
+        return [Warning(
+            f"PINCODE_FILE ({settings.PINCODE_FILE}) lists only {pincodes} 6-digit pincodes.",
+            hint="Other pincodes are placed at their district's centroid or not "
+                 "found at all; use the bundled app1/data/pincodes.csv or the "
+                 "India Post pincode directory.",
+            id="app1.W001",
+        )]
+    return []
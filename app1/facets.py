@@ -0,0 +1,45 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .caching import get_version
+from .models import Cloth
+
+
+# Version namespace bumped whenever a listing, its categories or a
+# category changes (see app1.signals)
+CATALOG = "catalog"
+
+FACET_TIMEOUT = 300
+
+
+def _cache_key(filters):
+    raw = "&".join(f"{key}={filters[key]}" for key in sorted(filters))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f"rentify:facets:{get_version(CATALOG)}:{digest}"
+
+
+def category_counts(queryset, filters):
+    """
+    {category_id: matching clothes} for a filtered Cloth queryset, computed
+    with one GROUP BY over the Cloth.categories through table.
+
+    `filters` are the request filters that shaped `queryset` (everything
+    except the category itself) and form the cache key.
+    """
+    key = _cache_key(filters)
+    counts = cache.get(key)
+
+    if counts is None:
+        Through = Cloth.categories.through
+        counts = dict(
+            Through.objects
+            .filter(cloth_id__in=queryset.values("id"))
+            .values("category_id")
+            .annotate(total=Count("cloth_id"))
+            .values_list("category_id", "total")
+        )
+        cache.set(key, counts, FACET_TIMEOUT)
+
+    return counts
@@ -0,0 +1,62 @@
+"""
+Atomic file writes.
+
+A file is written to a temporary name in its target directory and renamed
+over the target, so readers see either the old file or the new one, never
+a partial write, and two writers racing on one name leave one file.
+
+mkstemp() creates the temporary file 0600 and the rename keeps that mode,
+so the file is first given the mode FileSystemStorage would have used:
+the web server serving MEDIA_ROOT usually runs as another user.
+"""
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+
+@lru_cache(maxsize=1)
+def _default_mode():
+    # os.umask() can only be read by setting it
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def write_atomic(path, content, mode=None):
+    """
+    Replace `path` with `content`. The file gets `mode`, else
+    FILE_UPLOAD_PERMISSIONS, else 0666 less the umask.
+    """
+    if mode is None:
+        mode = settings.FILE_UPLOAD_PERMISSIONS
+    if mode is None:
+        mode = _default_mode()
+
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            os.fchmod(handle.fileno(), mode)
+            handle.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def store_atomic(storage, name, content):
+    """
+    Write `content` to exactly `name` in a Django storage. Storage.save()
+    would pick a suffixed name when another writer got there first.
+    """
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        # Remote storages replace an object in a single request
+        storage.save(name, ContentFile(content))
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, content, getattr(storage, "file_permissions_mode", None))
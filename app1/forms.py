@@ -4,6 +4,8 @@ from .models import BuyerProfile, Cloth, Category, CustomUser, RentRequest, Sell
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import UploadedFile
 
+from .availability import MAX_WINDOW_DAYS
+
 
 class ClothForm(forms.ModelForm):
 
@@ -108,6 +110,18 @@ class ClothForm(forms.ModelForm):
         return desc
 
 
+class ClothImportForm(ClothForm):
+    """
+    ClothForm's rules for one row of a bulk import. Categories and the
+    image are resolved by app1.imports, which keeps them off the form.
+    """
+
+    categories = None
+
+    class Meta(ClothForm.Meta):
+        fields = ["name", "quantity", "rent_per_day", "condition", "description"]
+
+
 
 
 class RentRequestForm(forms.ModelForm):
@@ -157,6 +171,9 @@ class RentRequestForm(forms.ModelForm):
         if start and end and start >= end:
             raise ValidationError("End date must be after start date.")
 
+        if start and end and (end - start).days + 1 > MAX_WINDOW_DAYS:
+            raise ValidationError(f"Rentals can span at most {MAX_WINDOW_DAYS} days.")
+
         return cleaned
 
 
@@ -0,0 +1,225 @@
+"""
+Offline pincode geocoding and radius search over seller pickup addresses.
+
+Coordinates come from the pincode table named by `settings.PINCODE_FILE`,
+so no geocoding API is called while serving a request. The file bundled
+at `app1/data/pincodes.csv` places each 6-digit pincode at its taluk's
+town, or its district's headquarters when the taluk is not a known place.
+It is built by `manage.py build_pincode_table` from the India Post
+pincode directory (data.gov.in, GODL) and GeoNames places (CC BY 4.0).
+Deployments that need post-office precision point PINCODE_FILE at the
+data.gov.in "All India Pincode Directory" CSV, read as is. Every post
+office of a pincode is averaged into one point, an exact 6-digit match
+wins, and pincodes missing from the table fall back to their 3-digit
+sorting district's centroid.
+
+`geocode_addresses --street` refines seller addresses further through
+OpenStreetMap's Nominatim, offline and rate limited.
+"""
+import csv
+import json
+import math
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db.models import Case, FloatField, Value, When
+
+from .caching import get_version
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# ~28 km tall cells: a 10 km query touches at most a 2 × 2 block
+GRID_CELL_DEGREES = 0.25
+
+SELLER_LOCATIONS = "geo:sellers"
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+
+
+def _coordinate(value, low, high):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    # The directory writes unknown coordinates as "NA" or 0
+    return value if low <= value <= high and value != 0 else None
+
+
+@lru_cache(maxsize=1)
+def pincode_table():
+    """
+    {pincode: (lat, lon)} with an entry per 6-digit pincode in the file and
+    per 3-digit district, averaged over their offices. Column names match
+    case-insensitively; rows with missing ("NA") coordinates are skipped.
+    """
+    points = defaultdict(list)
+    with open(settings.PINCODE_FILE, newline="", encoding="utf-8-sig") as fh:
+        for row in csv.DictReader(fh):
+            row = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items() if key}
+            lat = _coordinate(row.get("latitude"), -90, 90)
+            lon = _coordinate(row.get("longitude"), -180, 180)
+            pincode = row.get("pincode", "")
+            if lat is None or lon is None or not pincode.isdigit():
+                continue
+            points[pincode].append((lat, lon))
+
+    # Districts the file does not list take the mean of their pincodes
+    districts = defaultdict(list)
+    for pincode, located in points.items():
+        if len(pincode) == 6:
+            districts[pincode[:3]].extend(located)
+
+    table = {}
+    for pincode, located in list(districts.items()) + list(points.items()):
+        table[pincode] = (
+            round(sum(lat for lat, _ in located) / len(located), 6),
+            round(sum(lon for _, lon in located) / len(located), 6),
+        )
+    return table
+
+
+def locate(pincode):
+    """(lat, lon) for a pincode, or None when it is not in the table."""
+    pincode = (pincode or "").strip()
+    if len(pincode) != 6 or not pincode.isdigit():
+        return None
+
+    table = pincode_table()
+    return table.get(pincode) or table.get(pincode[:3])
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def seller_distance_km(distances, seller="seller_id"):
+    """
+    The {seller_id: km} of sellers_near() as a database expression on
+    `seller`, rounded to 10 m; NULL for sellers it does not list. The
+    distances come from the seller index, so no query joins through to
+    the pickup addresses.
+    """
+    return Case(
+        *(When(**{seller: seller_id}, then=Value(round(km, 2))) for seller_id, km in distances.items()),
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def geocode_street(address, timeout=10):
+    """
+    (lat, lon) for a full address from Nominatim, or None when it has no
+    match. Network errors propagate; callers fall back to locate().
+    """
+    query = urlencode({
+        "street": address.building,
+        "city": address.city,
+        "county": address.taluka,
+        "state": address.state,
+        "postalcode": address.pincode,
+        "country": "India",
+        "format": "jsonv2",
+        "limit": 1,
+    })
+    request = Request(
+        f"{NOMINATIM_URL}?{query}",
+        headers={"User-Agent": settings.GEOCODER_USER_AGENT},
+    )
+    with urlopen(request, timeout=timeout) as response:
+        results = json.load(response)
+
+    if not results:
+        return None
+    return float(results[0]["lat"]), float(results[0]["lon"])
+
+
+class GridIndex:
+    """
+    Uniform lat/lon grid. A radius query only looks at the cells its
+    bounding box covers, then filters by exact great-circle distance.
+    """
+
+    def __init__(self, points, cell_degrees=GRID_CELL_DEGREES):
+        self.cell = cell_degrees
+        self.cells = {}
+        self.size = 0
+
+        for key, lat, lon in points:
+            self.cells.setdefault(self._cell_of(lat, lon), []).append((key, lat, lon))
+            self.size += 1
+
+    def _cell_of(self, lat, lon):
+        return (math.floor(lat / self.cell), math.floor(lon / self.cell))
+
+    def within(self, lat, lon, radius_km):
+        """[(key, distance_km)] inside the radius, nearest first."""
+        lat_span = radius_km / 111.32
+        lon_span = radius_km / (111.32 * max(math.cos(math.radians(lat)), 0.01))
+
+        row_lo, col_lo = self._cell_of(lat - lat_span, lon - lon_span)
+        row_hi, col_hi = self._cell_of(lat + lat_span, lon + lon_span)
+
+        found = []
+        for row in range(row_lo, row_hi + 1):
+            for col in range(col_lo, col_hi + 1):
+                for key, p_lat, p_lon in self.cells.get((row, col), ()):
+                    distance = haversine_km(lat, lon, p_lat, p_lon)
+                    if distance <= radius_km:
+                        found.append((key, distance))
+
+        found.sort(key=lambda item: item[1])
+        return found
+
+
+# ---------------- SELLER INDEX (ONE PER WORKER) ---------------- #
+
+_seller_index = None
+_seller_index_version = None
+
+
+def seller_index():
+    """
+    Grid of seller pickup locations, built once per worker process and
+    rebuilt only after an address or seller profile change bumps the
+    `geo:sellers` version.
+    """
+    global _seller_index, _seller_index_version
+
+    version = get_version(SELLER_LOCATIONS)
+    if _seller_index is None or version != _seller_index_version:
+        from .models import SellerProfile
+
+        points = (
+            SellerProfile.objects
+            .filter(pickup_address__latitude__isnull=False)
+            .values_list(
+                "user_id",
+                "pickup_address__latitude",
+                "pickup_address__longitude"
+            )
+        )
+        _seller_index = GridIndex(points)
+        _seller_index_version = version
+
+    return _seller_index
+
+
+def sellers_near(pincode, radius_km):
+    """
+    {seller_id: distance_km} for sellers within `radius_km` of a pincode,
+    or None if the pincode cannot be located.
+    """
+    origin = locate(pincode)
+    if origin is None:
+        return None
+
+    return dict(seller_index().within(origin[0], origin[1], radius_km))
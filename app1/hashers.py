@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher as BasePBKDF2PasswordHasher
+
+
+class PBKDF2PasswordHasher(BasePBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with the iteration count taken from settings.
+    Stored hashes with a different count are upgraded on the next login.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
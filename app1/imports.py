@@ -0,0 +1,405 @@
+"""
+Bulk cloth import from CSV or JSONL.
+
+Rows are streamed from the file and checked with ClothForm's own field
+rules (ClothImportForm). Each distinct image is handed to a process pool
+as soon as a row names it, to be stored and given its WebP variants while
+later rows are still being read. Clothes and their category links are
+then written a batch at a time, with one bulk_create each.
+
+bulk_create skips the Cloth signals, so each batch also copies the
+seller's pickup location, indexes the new rows for search and bumps the
+catalog version itself.
+
+Columns: name, description, quantity, rent_per_day, condition,
+categories (names or slugs; "|"-separated in CSV, a list in JSONL) and
+image (a file name relative to the image directory).
+
+Uploads from the listing page never import in the request: queue_import
+stores the file and images and records a ClothImport, and
+`manage.py run_imports` runs the queued jobs with the same code. A job's
+counts are saved in the transaction of each batch, together with a lease
+renewal. A job whose worker died is claimed again once its lease expires
+and resumes after the rows already committed, so nothing is imported twice.
+"""
+import csv
+import io
+import itertools
+import json
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import facets, pickup, search
+from .caching import bump_version
+from .forms import ClothImportForm
+from .models import Category, Cloth, ClothImport, SellerProfile
+
+
+FORMATS = ("csv", "jsonl")
+
+IMPORT_BATCH_SIZE = 500
+
+# Same limit ClothForm puts on an uploaded image
+MAX_IMAGE_SIZE = 2 * 1024 * 1024
+
+# Row errors kept on a ClothImport for the seller to read
+JOB_ERRORS_KEPT = 50
+
+# How long a worker may go without finishing a batch before another
+# worker may take its job over
+LEASE = timedelta(minutes=10)
+
+
+class ImportResult:
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []  # (line, message)
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+class LeaseLost(Exception):
+    """Another worker took over a job whose lease had expired."""
+
+
+# ---------------- READING ---------------- #
+
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    return "jsonl" if extension in ("jsonl", "ndjson") else "csv"
+
+
+def read_rows(handle, file_format):
+    """
+    Yield (line, row) from a binary file object, decoding as it goes.
+    A JSONL line that does not parse yields a string instead of a dict.
+    """
+    text = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as exc:
+            yield line, f"Invalid JSON: {exc}"
+            continue
+        yield line, row if isinstance(row, dict) else "Each line must be a JSON object."
+
+
+# ---------------- VALIDATION ---------------- #
+
+def category_lookup():
+    """Active categories by lower-cased name and by slug."""
+    lookup = {}
+    for category in Category.objects.filter(is_active=True).only("id", "name", "slug"):
+        lookup[category.slug.lower()] = category.id
+        lookup[category.name.lower()] = category.id
+    return lookup
+
+
+def split_categories(value):
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in str(value or "").split("|") if item.strip()]
+
+
+def validate_row(row, categories, image_dir, image_names=None):
+    """
+    Returns (cloth, category_ids, image_path) or raises ValueError with a
+    message for the seller. `image_names` maps names used in the file to
+    the names the images were stored under in `image_dir`.
+    """
+    form = ClothImportForm({
+        field: row.get(field, "") for field in ClothImportForm.Meta.fields
+    })
+    if not form.is_valid():
+        raise ValueError("; ".join(
+            f"{field}: {' '.join(errors)}" for field, errors in form.errors.items()
+        ))
+
+    names = split_categories(row.get("categories"))
+    if not names:
+        raise ValueError("categories: Please select at least one category.")
+    unknown = [name for name in names if name.lower() not in categories]
+    if unknown:
+        raise ValueError(f"categories: Unknown category {', '.join(unknown)}.")
+
+    image = str(row.get("image") or "").strip()
+    if not image:
+        raise ValueError("image: Cloth image is required.")
+    # Only plain names inside image_dir; no absolute paths or ../
+    stored = (image_names or {}).get(image, image)
+    image_path = os.path.normpath(os.path.join(image_dir, stored))
+    if os.path.commonpath([image_dir, image_path]) != image_dir or not os.path.isfile(image_path):
+        raise ValueError(f"image: {image} was not found.")
+    if os.path.getsize(image_path) > MAX_IMAGE_SIZE:
+        raise ValueError("image: Image size must be less than 2 MB.")
+
+    category_ids = sorted({categories[name.lower()] for name in names})
+    return form.save(commit=False), category_ids, image_path
+
+
+# ---------------- IMAGES (worker processes) ---------------- #
+
+def store_image(path):
+    """
+    Copy one source image into media/clothes/ and build its variants.
+    Returns (stored name, variant widths); raises OSError if unreadable.
+    """
+    from django.core.files import File
+    from PIL import Image
+
+    from . import thumbnails
+
+    with Image.open(path) as image:
+        image.verify()
+
+    field = Cloth._meta.get_field("image")
+    with open(path, "rb") as handle:
+        name = field.storage.save(
+            field.generate_filename(None, os.path.basename(path)), File(handle)
+        )
+    return name, thumbnails.build_variants(field.attr_class(None, field, name))
+
+
+def _store_or_error(path):
+    try:
+        return store_image(path)
+    except OSError as exc:
+        return exc
+
+
+# ---------------- WRITING ---------------- #
+
+def _write_batch(batch, seller, location, images, result):
+    clothes, links = [], []
+    for line, cloth, category_ids, image_path in batch:
+        image = images[image_path].result()
+        if isinstance(image, Exception):
+            result.error(line, f"image: {os.path.basename(image_path)} could not be read.")
+            continue
+        cloth.seller = seller
+        cloth.image, cloth.image_variants = image
+        for field, value in location.items():
+            setattr(cloth, field, value)
+        clothes.append(cloth)
+        links.append(category_ids)
+
+    if not clothes:
+        return
+
+    Cloth.objects.bulk_create(clothes)
+    Through = Cloth.categories.through
+    Through.objects.bulk_create([
+        Through(cloth_id=cloth.id, category_id=category_id)
+        for cloth, category_ids in zip(clothes, links)
+        for category_id in category_ids
+    ])
+    search.index_cloths(cloth.id for cloth in clothes)
+    # New clothes have no cached cards; only the catalog pages change
+    transaction.on_commit(lambda: bump_version(facets.CATALOG))
+
+    result.created += len(clothes)
+
+
+def _commit_batch(batch, seller, location, images, result, progress):
+    with transaction.atomic():
+        _write_batch(batch, seller, location, images, result)
+        if progress:
+            progress(result)
+
+
+def import_clothes(rows, seller, image_dir, batch_size=IMPORT_BATCH_SIZE,
+                   workers=None, progress=None, image_names=None):
+    """
+    Import `rows` ((line, dict) pairs from read_rows) as clothes of
+    `seller`. Invalid rows are skipped and reported in the result; valid
+    ones are committed a batch at a time. `progress(result)` is called
+    inside every batch's transaction, so whatever it records commits or
+    rolls back with the batch.
+    """
+    image_dir = os.path.abspath(image_dir)
+    categories = category_lookup()
+    profile = (
+        SellerProfile.objects
+        .select_related("pickup_address")
+        .filter(user=seller)
+        .first()
+    )
+    location = pickup.pickup_values(profile.pickup_address if profile else None)
+
+    result = ImportResult()
+    batch = []
+    # Source path -> future; rows sharing an image store it once, and the
+    # pool works on a batch's images while its rows are still being read
+    images = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for line, row in rows:
+            result.rows += 1
+            try:
+                if isinstance(row, str):
+                    raise ValueError(row)
+                entry = validate_row(row, categories, image_dir, image_names)
+            except ValueError as exc:
+                result.error(line, str(exc))
+                continue
+
+            image_path = entry[-1]
+            if image_path not in images:
+                images[image_path] = pool.submit(_store_or_error, image_path)
+            batch.append((line, *entry))
+
+            if len(batch) >= batch_size:
+                _commit_batch(batch, seller, location, images, result, progress)
+                batch = []
+
+        _commit_batch(batch, seller, location, images, result, progress)
+
+    return result
+
+
+# ---------------- QUEUED UPLOADS ---------------- #
+
+def queue_import(upload, images, seller):
+    """Store an uploaded file and its images for run_imports; returns the job."""
+    directory = f"imports/{uuid.uuid4().hex}"
+    file_format = detect_format(upload.name)
+    file_name = default_storage.save(f"{directory}/rows.{file_format}", upload)
+
+    # The storage may store an image under a suffixed name; rows still
+    # refer to it by the name it was uploaded with
+    image_names = {}
+    for image in images:
+        name = os.path.basename(image.name)
+        stored = default_storage.save(f"{directory}/images/{name}", image)
+        image_names[name] = os.path.basename(stored)
+
+    return ClothImport.objects.create(
+        seller=seller,
+        directory=directory,
+        file_name=os.path.basename(file_name),
+        file_format=file_format,
+        image_names=image_names,
+    )
+
+
+def runnable_jobs(now=None):
+    """Pending jobs, and running ones whose worker stopped renewing the lease."""
+    return ClothImport.objects.filter(
+        Q(status="pending") | Q(status="running", lease_until__lt=now or timezone.now())
+    ).order_by("created_at", "id")
+
+
+def _discard_upload(directory):
+    folders, files = default_storage.listdir(directory)
+    for folder in folders:
+        _discard_upload(f"{directory}/{folder}")
+    for name in files:
+        default_storage.delete(f"{directory}/{name}")
+    default_storage.delete(directory)
+
+
+def claim(job, now):
+    """
+    Take `job` for this worker; False if another worker holds it. A job
+    left running by a dead worker is taken over once its lease expires.
+    """
+    claimed = ClothImport.objects.filter(
+        Q(status="pending") | Q(status="running", lease_until__lt=now), pk=job.pk,
+    ).update(status="running", started_at=now, lease_until=now + LEASE)
+    if claimed != 1:
+        return False
+    job.refresh_from_db()
+    return True
+
+
+def _save_job(job, **fields):
+    """
+    Write `fields` and renew the lease while this worker still holds it;
+    raises LeaseLost when another worker took the job over.
+    """
+    lease_until = timezone.now() + LEASE if fields.get("status", "running") == "running" else None
+    updated = ClothImport.objects.filter(
+        pk=job.pk, status="running", lease_until=job.lease_until
+    ).update(lease_until=lease_until, **fields)
+    if updated != 1:
+        raise LeaseLost(job.pk)
+    for field, value in fields.items():
+        setattr(job, field, value)
+    job.lease_until = lease_until
+
+
+def run_import(job, workers=None, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Run a queued import, unless another worker holds it. A job taken over
+    from a dead worker resumes after the rows it already committed.
+    Returns the ImportResult of this run, or None if the job was not
+    claimed, was taken over, or failed.
+    """
+    if not claim(job, timezone.now()):
+        return None
+
+    # Counts committed by earlier runs of this job
+    done_rows, done_created = job.rows, job.created
+    done_errors, done_error_count = list(job.errors), job.error_count
+
+    def progress(result):
+        errors = done_errors + [list(error) for error in result.errors]
+        _save_job(
+            job,
+            rows=done_rows + result.rows,
+            created=done_created + result.created,
+            errors=errors[:JOB_ERRORS_KEPT],
+            error_count=done_error_count + len(result.errors),
+        )
+
+    try:
+        with default_storage.open(f"{job.directory}/{job.file_name}", "rb") as handle:
+            result = import_clothes(
+                itertools.islice(read_rows(handle, job.file_format), done_rows, None),
+                job.seller,
+                default_storage.path(f"{job.directory}/images"),
+                batch_size=batch_size,
+                workers=workers,
+                progress=progress,
+                image_names=job.image_names,
+            )
+    except LeaseLost:
+        return None
+    except Exception as exc:
+        # Rows of the batches already committed stay imported and counted
+        errors = [*job.errors, [0, f"{type(exc).__name__}: {exc}"]]
+        fields = {
+            "status": "failed",
+            "errors": errors[-JOB_ERRORS_KEPT:],
+            "error_count": job.error_count + 1,
+        }
+        result = None
+    else:
+        fields = {"status": "done"}
+
+    try:
+        _save_job(job, finished_at=timezone.now(), **fields)
+    except LeaseLost:
+        return None
+    # Stored images were copied into media/clothes/; the upload can go
+    _discard_upload(job.directory)
+    return result
@@ -0,0 +1,217 @@
+"""
+Inventory ledger for clothes.
+
+`Cloth.quantity` is every unit a cloth owns. An approved rent request holds
+some of them for its own dates through an active StockReservation, so the
+units free for any window are quantity minus the busiest day of the active
+reservations that overlap it (app1.availability does the sweep).
+
+reserve() checks exactly that before it writes a reservation, with the
+cloth rows locked: SELECT ... FOR UPDATE where the database has it, and
+the IMMEDIATE transaction SQLite opens for every atomic block otherwise.
+Two concurrent accepts can therefore never overbook a day, and a booking
+next month never blocks one this month, the same answer the catalog and
+the request form give.
+
+Updates through the queryset skip the Cloth signals, so the catalog cache
+versions are bumped here, once the transaction commits.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import availability, facets
+from .caching import bump_on_commit, cloth_namespace
+from .models import Cloth, RentRequest, StockReservation
+
+
+class InsufficientStock(Exception):
+    pass
+
+
+def _invalidate(cloth_ids):
+    bump_on_commit([facets.CATALOG, *(cloth_namespace(cloth_id) for cloth_id in cloth_ids)])
+
+
+def _locked_quantities(cloth_ids):
+    """{cloth_id: units owned}, with the rows locked until commit."""
+    return dict(
+        Cloth.objects.select_for_update()
+        .filter(id__in=cloth_ids)
+        .order_by("id")
+        .values_list("id", "quantity")
+    )
+
+
+def fitting(rents, quantities=None):
+    """
+    The requests that fit next to the active reservations and each other,
+    taken in the given order; a request that does not fit is skipped.
+    """
+    rents = list(rents)
+    if not rents:
+        return []
+    cloth_ids = {rent.cloth_id for rent in rents}
+    if quantities is None:
+        quantities = dict(Cloth.objects.filter(id__in=cloth_ids).values_list("id", "quantity"))
+
+    bookings = defaultdict(list)
+    for booking in availability.overlapping_bookings(
+        min(rent.start_date for rent in rents),
+        max(rent.end_date for rent in rents),
+        cloth_ids,
+    ):
+        bookings[booking[0]].append(booking)
+
+    fits = []
+    for rent in rents:
+        held = bookings[rent.cloth_id]
+        peak = availability.peak_occupancy(held, rent.start_date, rent.end_date)
+        if quantities.get(rent.cloth_id, 0) - peak.get(rent.cloth_id, 0) >= rent.quantity:
+            held.append((rent.cloth_id, rent.start_date, rent.end_date, rent.quantity))
+            fits.append(rent)
+    return fits
+
+
+@transaction.atomic
+def reserve_many(rents):
+    """
+    Hold units for approved requests over their dates; raises
+    InsufficientStock, writing nothing, unless every one of them fits.
+    """
+    rents = list(rents)
+    cloth_ids = {rent.cloth_id for rent in rents}
+    quantities = _locked_quantities(cloth_ids)
+
+    if len(fitting(rents, quantities)) != len(rents):
+        raise InsufficientStock(sorted(cloth_ids))
+
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            cloth_id=rent.cloth_id,
+            rent_request=rent,
+            quantity=rent.quantity,
+            start_date=rent.start_date,
+            end_date=rent.end_date,
+        )
+        for rent in rents
+    ])
+    _invalidate(cloth_ids)
+
+
+def reserve(rent):
+    """Hold `rent.quantity` units over the request's dates."""
+    reserve_many([rent])
+
+
+def release(rent):
+    """Free a request's reserved units, at most once."""
+    # Compare-and-set on released_at so a double release is a no-op
+    reservation = (
+        StockReservation.objects
+        .filter(rent_request=rent, released_at__isnull=True)
+        .values_list("id", "cloth_id")
+        .first()
+    )
+    if reservation is None:
+        return False
+
+    released = StockReservation.objects.filter(
+        pk=reservation[0], released_at__isnull=True
+    ).update(released_at=timezone.now())
+    if not released:
+        return False
+
+    _invalidate([reservation[1]])
+    return True
+
+
+def release_many(rents):
+    """release() for several requests; returns how many were active."""
+    reservations = StockReservation.objects.filter(
+        rent_request__in=rents, released_at__isnull=True
+    )
+    cloth_ids = set(reservations.values_list("cloth_id", flat=True))
+    released = reservations.update(released_at=timezone.now())
+    if released:
+        _invalidate(cloth_ids)
+    return released
+
+
+@transaction.atomic
+def adjust(cloth, delta):
+    """
+    Seller added (delta > 0) or removed (delta < 0) units of a cloth.
+    Removal only succeeds while no upcoming day needs more units than remain.
+    """
+    if not delta:
+        return
+    owned = _locked_quantities([cloth.pk]).get(cloth.pk, 0)
+
+    if delta < 0:
+        today = timezone.localdate()
+        upcoming = list(
+            StockReservation.objects
+            .filter(cloth_id=cloth.pk, released_at__isnull=True, end_date__gte=today)
+            .values_list("cloth_id", "start_date", "end_date", "quantity")
+        )
+        if upcoming:
+            last = max(booking[2] for booking in upcoming)
+            peak = availability.peak_occupancy(upcoming, today, last).get(cloth.pk, 0)
+            if owned + delta < peak:
+                raise InsufficientStock(cloth.pk)
+
+    Cloth.objects.filter(pk=cloth.pk).update(
+        quantity=F("quantity") + delta,
+        updated_at=timezone.now(),
+    )
+    _invalidate([cloth.pk])
+
+
+# ---------------- RECONCILIATION ---------------- #
+
+def missing_reservations():
+    """Approved requests that hold no units."""
+    return (
+        RentRequest.objects
+        .filter(status="approved")
+        .exclude(id__in=StockReservation.objects.filter(
+            released_at__isnull=True
+        ).values("rent_request_id"))
+        .order_by("id")
+    )
+
+
+def stale_reservations():
+    """Active reservations whose request is no longer approved."""
+    return (
+        StockReservation.objects
+        .filter(released_at__isnull=True)
+        .exclude(rent_request__status="approved")
+        .order_by("id")
+    )
+
+
+def overbooked():
+    """{cloth_id: (units owned, busiest day's reserved units)} where reserved > owned."""
+    bookings = defaultdict(list)
+    for booking in (
+        StockReservation.objects
+        .filter(released_at__isnull=True)
+        .values_list("cloth_id", "start_date", "end_date", "quantity")
+    ):
+        bookings[booking[0]].append(booking)
+
+    quantities = dict(
+        Cloth.objects.filter(id__in=bookings).values_list("id", "quantity")
+    )
+    result = {}
+    for cloth_id, held in bookings.items():
+        start = min(booking[1] for booking in held)
+        end = max(booking[2] for booking in held)
+        peak = availability.peak_occupancy(held, start, end).get(cloth_id, 0)
+        if peak > quantities.get(cloth_id, 0):
+            result[cloth_id] = (quantities.get(cloth_id, 0), peak)
+    return result
@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app1.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = "Run a named micro-benchmark and print (or save) its latency summary."
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenario", help=f"One of: {', '.join(sorted(SCENARIOS))}")
+        parser.add_argument("--size", type=int, default=5000,
+                            help="Number of synthetic rows to benchmark against.")
+        parser.add_argument("--repeat", type=int, default=50,
+                            help="Timed runs per measurement.")
+        parser.add_argument("--json", dest="json_path",
+                            help="Also write the results to this JSON file.")
+
+    def handle(self, *args, **options):
+        func = SCENARIOS.get(options["scenario"])
+        if func is None:
+            raise CommandError(
+                f"Unknown scenario {options['scenario']!r}. "
+                f"Available: {', '.join(sorted(SCENARIOS))}"
+            )
+
+        results = func(options)
+
+        for name, summary in results.items():
+            line = "  ".join(f"{key}={value}" for key, value in summary.items())
+            self.stdout.write(f"{name:<20} {line}")
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump({options["scenario"]: results}, fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+from app1 import facets, thumbnails
+from app1.caching import bump_version, bump_versions, cloth_namespace
+from app1.models import Cloth
+
+
+class Command(BaseCommand):
+    help = ("Build the responsive WebP variants for existing cloth images and "
+            "strip EXIF/XMP from their originals (--all covers images already built).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Rebuild every image, not only ones without variants.")
+
+    def handle(self, *args, **options):
+        clothes = Cloth.objects.all()
+        if not options["all"]:
+            clothes = clothes.filter(image_variants=[])
+
+        # Clothes sharing a file (the default image) are processed once
+        by_image = {}
+        for cloth_id, name in clothes.values_list("id", "image").iterator():
+            if name:
+                by_image.setdefault(name, []).append(cloth_id)
+
+        built = failed = 0
+        updated_ids = []
+        field = Cloth._meta.get_field("image")
+
+        for name, cloth_ids in by_image.items():
+            image = field.attr_class(None, field, name)
+            try:
+                widths = thumbnails.build_variants(image)
+            except OSError as exc:
+                failed += 1
+                self.stderr.write(f"{name}: {exc}")
+                continue
+
+            Cloth.objects.filter(id__in=cloth_ids).update(image_variants=widths)
+            updated_ids.extend(cloth_ids)
+            built += 1
+
+        # update() skips the signals that version the cached cards
+        if updated_ids:
+            bump_version(facets.CATALOG)
+            bump_versions(cloth_namespace(cloth_id) for cloth_id in updated_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built variants for {built} images ({len(updated_ids)} clothes); "
+            f"{failed} could not be read."
+        ))
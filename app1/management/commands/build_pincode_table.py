@@ -0,0 +1,174 @@
+import csv
+import re
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app1 import geo
+
+
+# India Post spells some places differently from GeoNames
+ALIASES = {
+    "kochi": "cochin", "bengaluru": "bangalore", "mysuru": "mysore",
+    "mangaluru": "mangalore", "belagavi": "belgaum", "kalaburagi": "gulbarga",
+    "gurugram": "gurgaon", "prayagraj": "allahabad", "vadodara": "baroda",
+}
+
+# India Post state -> GeoNames admin1; Andhra Pradesh predates Telangana
+STATES = {
+    "chattisgarh": ["chhattisgarh"], "delhi": ["nct"], "jammuandkashmir": ["kashmir"],
+    "lakshadweep": ["laccadives"], "andhrapradesh": ["andhrapradesh", "telangana"],
+}
+
+# A name whose matches lie further apart than this is ambiguous
+AMBIGUOUS_KM = 50
+# A pincode placed further than this from its district is a false match
+DISTRICT_KM = 150
+# A headquarters further than this from the district's matched pincodes
+HQ_KM = 100
+
+
+def _name(value):
+    value = value.lower().replace("&", "and")
+    value = re.sub(r"\(.*?\)", "", value)
+    value = re.sub(r"\b(district|dist|urban|rural|city|nagar|kalan|khurd|division)\b", "", value)
+    value = re.sub(r"[^a-z]", "", value)
+    return ALIASES.get(value, value)
+
+
+def _skeleton(value):
+    """Spelling-tolerant key: Ahmadabad and Ahmedabad agree."""
+    value = _name(value)
+    return value[:1] + re.sub(r"[aeiouyh]", "", value[1:])
+
+
+def _mean(points):
+    return (
+        sum(lat for lat, _ in points) / len(points),
+        sum(lon for _, lon in points) / len(points),
+    )
+
+
+def _spread_km(points):
+    return max(geo.haversine_km(*points[0], *point) for point in points)
+
+
+class Places:
+    """GeoNames places of India by (state, name) and (state, district)."""
+
+    def __init__(self, rows):
+        self.exact = defaultdict(list)
+        self.loose = defaultdict(list)
+        self.districts = defaultdict(list)
+        for row in rows:
+            if row["cc"].strip() != "IN":
+                continue
+            point = (float(row["lat"]), float(row["lon"]))
+            state, district = _name(row["admin1"]), _name(row["admin2"])
+            self.exact[(state, _name(row["name"]))].append((district, point))
+            self.loose[(state, _skeleton(row["name"]))].append((district, point))
+            if district:
+                self.districts[(state, district)].append(point)
+
+    @staticmethod
+    def _states(state):
+        state = _name(state)
+        return STATES.get(state, [state])
+
+    def find(self, name, state, district, fuzzy=True):
+        """
+        Points of the places called `name` in `state`, preferring those in
+        `district`; [] when there are none or they are too far apart.
+        """
+        tables = [(self.exact, _name), (self.loose, _skeleton)][:2 if fuzzy else 1]
+        for table, key in tables:
+            found = [match for st in self._states(state) for match in table.get((st, key(name)), [])]
+            if found:
+                points = [point for d, point in found if d == _name(district)] or [p for _, p in found]
+                return points if _spread_km(points) <= AMBIGUOUS_KM else []
+        return []
+
+    def in_district(self, district, state):
+        return [p for st in self._states(state) for p in self.districts.get((st, _name(district)), [])]
+
+
+class Command(BaseCommand):
+    help = ("Build the bundled pincode table (app1/data/pincodes.csv) from the India Post "
+            "pincode directory and GeoNames places.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory",
+                            help="India Post directory CSV with pincode, Taluk, Districtname "
+                                 "and statename columns.")
+        parser.add_argument("places",
+                            help="GeoNames cities CSV with lat, lon, name, admin1, admin2 and "
+                                 "cc columns (as shipped by reverse_geocoder).")
+        parser.add_argument("--output", default="app1/data/pincodes.csv")
+
+    def read(self, path):
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as fh:
+                return list(csv.DictReader(fh))
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+    def handle(self, *args, **options):
+        places = Places(self.read(options["places"]))
+        offices = {}
+        for row in self.read(options["directory"]):
+            if row["pincode"].isdigit() and len(row["pincode"]) == 6:
+                offices.setdefault(row["pincode"], row)
+
+        # 1. Pincodes whose taluk is a place in their state
+        points = {}
+        for pincode, row in offices.items():
+            found = places.find(row["Taluk"], row["statename"], row["Districtname"])
+            if found:
+                points[pincode] = _mean(found)
+
+        # 2. Districts: their headquarters town, else their located pincodes,
+        #    else every place GeoNames puts in them
+        located = defaultdict(list)
+        for pincode, row in offices.items():
+            if pincode in points:
+                located[(row["statename"], row["Districtname"])].append(points[pincode])
+
+        centres = {}
+        for row in offices.values():
+            key = state, district = row["statename"], row["Districtname"]
+            if key in centres:
+                continue
+            hq = places.find(district, state, district, fuzzy=False)
+            if hq and located[key] and geo.haversine_km(*_mean(hq), *_mean(located[key])) > HQ_KM:
+                hq = []
+            found = hq or located[key] or places.in_district(district, state)
+            if found:
+                centres[key] = _mean(found)
+
+        # 3. Every pincode at its taluk, or its district when that is all we know
+        counts = Counter()
+        table = []
+        for pincode, row in sorted(offices.items()):
+            key = (row["statename"], row["Districtname"])
+            point, centre = points.get(pincode), centres.get(key)
+            if point and centre and geo.haversine_km(*point, *centre) > DISTRICT_KM:
+                point = None
+            if point:
+                counts["taluk"] += 1
+            elif centre:
+                point = centre
+                counts["district"] += 1
+            else:
+                counts["missing"] += 1
+                continue
+            table.append((pincode, f"{point[0]:.4f}", f"{point[1]:.4f}", *key[::-1]))
+
+        with open(options["output"], "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh, lineterminator="\n")
+            writer.writerow(["pincode", "latitude", "longitude", "district", "statename"])
+            writer.writerows(table)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(table)} pincodes ({counts['taluk']} at their taluk, "
+            f"{counts['district']} at their district); {counts['missing']} not located."
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from app1.caching import lookup_stats, reset_stats
+
+
+CACHE_NAMES = ("catalog_page", "cloth_card", "seller_cloth_card", "seller_cloth_modal")
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss rates of the catalog page and cloth card caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true",
+                            help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        for name, stats in lookup_stats(CACHE_NAMES).items():
+            rate = "-" if stats["hit_rate"] is None else f"{stats['hit_rate']:.1%}"
+            self.stdout.write(
+                f"{name:<20} hits={stats['hits']:<8} misses={stats['misses']:<8} hit rate={rate}"
+            )
+
+        if options["reset"]:
+            reset_stats(CACHE_NAMES)
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
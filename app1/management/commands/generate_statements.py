@@ -0,0 +1,39 @@
+import os
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app1 import statements
+
+
+class Command(BaseCommand):
+    help = "Render one PDF statement per seller for a month (YYYY-MM)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", required=True, help="Month as YYYY-MM.")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Renderer processes (default: CPU count).")
+        parser.add_argument("--output-dir",
+                            help="Defaults to MEDIA_ROOT/statements/<month>/.")
+
+    def handle(self, *args, **options):
+        month = options["month"]
+        try:
+            statements.month_bounds(month)
+        except ValueError:
+            raise CommandError(f"--month must look like 2026-03, got {month!r}.")
+
+        output_dir = options["output_dir"] or os.path.join(
+            settings.MEDIA_ROOT, statements.STATEMENT_DIR, month
+        )
+
+        started = perf_counter()
+        count, rentals = statements.generate(month, output_dir, options["workers"])
+        elapsed = perf_counter() - started
+
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {count} statements ({rentals} rentals) to {output_dir} "
+            f"in {elapsed:.1f}s ({rate:.1f} statements/s)."
+        ))
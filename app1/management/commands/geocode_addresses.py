@@ -0,0 +1,67 @@
+import time
+from urllib.error import URLError
+
+from django.core.management.base import BaseCommand
+
+from app1 import geo
+from app1.caching import bump_version
+from app1.models import Address
+
+
+class Command(BaseCommand):
+    help = "Fill Address.latitude/longitude from the pincode table, or the street address."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true",
+                            help="Recompute every address, not only missing ones.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--street", action="store_true",
+                            help="Geocode seller pickup addresses through Nominatim, "
+                                 "falling back to the pincode table.")
+        parser.add_argument("--delay", type=float, default=1.0,
+                            help="Seconds between Nominatim requests (its policy allows one per second).")
+
+    def handle(self, *args, **options):
+        addresses = Address.objects.only(
+            "id", "building", "city", "state", "taluka", "pincode", "latitude", "longitude"
+        )
+        if options["street"]:
+            addresses = addresses.filter(sellerprofile__isnull=False).distinct()
+        if not options["all"]:
+            addresses = addresses.filter(latitude__isnull=True)
+
+        batch = []
+        located = streets = missing = 0
+
+        for address in addresses.iterator(chunk_size=options["batch_size"]):
+            location = None
+            if options["street"]:
+                try:
+                    location = geo.geocode_street(address)
+                except (URLError, OSError, ValueError, KeyError) as exc:
+                    self.stderr.write(f"  address {address.id}: {exc}")
+                time.sleep(options["delay"])
+                streets += location is not None
+
+            location = location or geo.locate(address.pincode)
+            if location is None:
+                missing += 1
+                continue
+
+            address.latitude, address.longitude = location
+            batch.append(address)
+            located += 1
+
+            if len(batch) >= options["batch_size"]:
+                Address.objects.bulk_update(batch, ["latitude", "longitude"])
+                batch = []
+
+        if batch:
+            Address.objects.bulk_update(batch, ["latitude", "longitude"])
+
+        bump_version(geo.SELLER_LOCATIONS)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Located {located} addresses ({streets} by street); "
+            f"{missing} pincodes not in the table."
+        ))
@@ -0,0 +1,68 @@
+import os
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from app1 import imports
+
+
+class Command(BaseCommand):
+    help = "Import clothes for one seller from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file, one cloth per row.")
+        parser.add_argument("--seller", required=True,
+                            help="Username or email of the seller who owns the clothes.")
+        parser.add_argument("--images", dest="image_dir",
+                            help="Directory the image column is relative to "
+                                 "(defaults to the file's directory).")
+        parser.add_argument("--format", choices=imports.FORMATS,
+                            help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=imports.IMPORT_BATCH_SIZE)
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Image worker processes (defaults to the CPU count).")
+
+    def handle(self, *args, **options):
+        seller = get_user_model().objects.filter(
+            Q(username=options["seller"]) | Q(email=options["seller"]),
+            is_seller=True,
+        ).first()
+        if seller is None:
+            raise CommandError(f"No seller {options['seller']!r}.")
+
+        path = options["path"]
+        file_format = options["format"] or imports.detect_format(path)
+        image_dir = options["image_dir"] or os.path.dirname(os.path.abspath(path))
+        started = perf_counter()
+
+        def progress(result):
+            elapsed = perf_counter() - started
+            self.stdout.write(
+                f"  {result.rows} rows read, {result.created} created, "
+                f"{len(result.errors)} errors ({result.rows / elapsed:.0f} rows/s)"
+            )
+
+        try:
+            handle = open(path, "rb")
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        with handle:
+            result = imports.import_clothes(
+                imports.read_rows(handle, file_format),
+                seller,
+                image_dir,
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+                progress=progress,
+            )
+
+        for line, message in result.errors:
+            self.stderr.write(f"  line {line}: {message}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} of {result.rows} rows "
+            f"in {perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,24 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app1 import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FTS5 full-text index over cloth names, descriptions and categories."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not search.is_enabled():
+            raise CommandError("Full-text search needs the SQLite FTS5 backend.")
+
+        started = perf_counter()
+        total = search.rebuild_index(batch_size=options["batch_size"])
+        elapsed = perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {total} clothes in {elapsed:.2f}s"
+        ))
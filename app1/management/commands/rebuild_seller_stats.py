@@ -0,0 +1,19 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from app1 import analytics
+
+
+class Command(BaseCommand):
+    help = "Recompute the SellerDailyStat rollups from all rent requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        count = analytics.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {count} rollup rows in {perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app1 import inventory
+from app1.models import Cloth, StockReservation
+
+
+class Command(BaseCommand):
+    help = "Check that reservations match the approved requests and no day is overbooked."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true",
+                            help="Release stale reservations and reserve units for "
+                                 "approved requests that hold none.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            missing = list(inventory.missing_reservations())
+            stale = list(inventory.stale_reservations())
+
+            for rent in missing[:20]:
+                self.stdout.write(f"  missing: approved request {rent.id} holds no units")
+            for reservation in stale[:20]:
+                self.stdout.write(
+                    f"  stale: reservation {reservation.id} is held for request "
+                    f"{reservation.rent_request_id}, which is no longer approved"
+                )
+
+            if options["fix"] and (missing or stale):
+                inventory.release_many([reservation.rent_request_id for reservation in stale])
+                # A request keeps one reservation row; replace released ones
+                StockReservation.objects.filter(rent_request__in=missing).delete()
+                try:
+                    inventory.reserve_many(missing)
+                except inventory.InsufficientStock:
+                    raise CommandError(
+                        "Not enough units to reserve for every approved request; "
+                        "nothing was changed."
+                    )
+                self.stdout.write(self.style.SUCCESS(
+                    f"Released {len(stale)} and created {len(missing)} reservations."
+                ))
+                missing, stale = [], []
+
+            overbooked = inventory.overbooked()
+
+        names = dict(Cloth.objects.filter(id__in=overbooked).values_list("id", "name"))
+        for cloth_id, (owned, peak) in sorted(overbooked.items())[:20]:
+            self.stdout.write(
+                f"  overbooked: cloth {cloth_id} ({names.get(cloth_id)}) owns {owned}, "
+                f"{peak} reserved on its busiest day"
+            )
+
+        problems = len(missing) + len(stale) + len(overbooked)
+        if problems:
+            raise CommandError(f"{problems} inventory problems found.")
+
+        self.stdout.write(self.style.SUCCESS("Inventory is consistent."))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app1 import imports
+
+
+class Command(BaseCommand):
+    help = "Run the cloth imports sellers queued from the listing page."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Image worker processes (defaults to the CPU count).")
+        parser.add_argument("--interval", type=float, default=0,
+                            help="Keep running, checking for new imports every N seconds.")
+
+    def run_pending(self, options):
+        for job in imports.runnable_jobs():
+            result = imports.run_import(job, workers=options["workers"])
+            if result is None and job.status != "failed":
+                continue  # Another worker holds it
+            if job.status == "failed":
+                self.stderr.write(
+                    f"Import {job.id} failed after {job.created} clothes: {job.errors[-1][1]}"
+                )
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"Import {job.id}: {job.created} of {job.rows} rows imported, "
+                f"{job.error_count} errors."
+            ))
+
+    def handle(self, *args, **options):
+        self.run_pending(options)
+
+        while options["interval"]:
+            time.sleep(options["interval"])
+            self.run_pending(options)
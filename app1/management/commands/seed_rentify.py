@@ -0,0 +1,47 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app1 import seeding
+from app1.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Fill the database with synthetic sellers, buyers, clothes and rent requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sellers", type=int, default=50)
+        parser.add_argument("--clothes", type=int, default=5000)
+        parser.add_argument("--requests", type=int, default=10000)
+        parser.add_argument("--buyers", type=int, default=None,
+                            help="Defaults to five buyers per seller.")
+        parser.add_argument("--seed", type=int, default=42,
+                            help="Random seed; the same seed gives the same data set.")
+        parser.add_argument("--password", default=seeding.DEFAULT_PASSWORD,
+                            help="Password of every generated account.")
+
+    def handle(self, *args, **options):
+        if options["sellers"] < 1:
+            raise CommandError("--sellers must be at least 1.")
+        if options["requests"] and not options["clothes"]:
+            raise CommandError("Rent requests need at least one cloth.")
+        # Generated accounts have fixed emails, so a second run would collide
+        if CustomUser.objects.filter(email__endswith="@rentify.test").exists():
+            raise CommandError("This database has already been seeded.")
+
+        started = perf_counter()
+        counts = seeding.seed(
+            sellers=options["sellers"],
+            clothes=options["clothes"],
+            requests=options["requests"],
+            buyers=options["buyers"],
+            seed=options["seed"],
+            password=options["password"],
+        )
+
+        for table, count in counts.items():
+            self.stdout.write(f"  {table:<14} {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded in {perf_counter() - started:.1f}s; "
+            f"log in as seller0@rentify.test or buyer0@rentify.test."
+        ))
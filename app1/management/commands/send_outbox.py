@@ -0,0 +1,53 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from app1 import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued EmailOutbox messages. Use --host/--port to point at a "
+        "local debugging server, e.g. `python -m aiosmtpd -n -l localhost:1025`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--host", help="SMTP host overriding EMAIL_HOST (no TLS, no auth).")
+        parser.add_argument("--port", type=int, default=1025)
+        parser.add_argument("--interval", type=float, default=0,
+                            help="Keep running, draining every N seconds.")
+
+    def get_connection(self, options):
+        if not options["host"]:
+            return get_connection(fail_silently=False)
+        return get_connection(
+            "django.core.mail.backends.smtp.EmailBackend",
+            host=options["host"],
+            port=options["port"],
+            username="",
+            password="",
+            use_tls=False,
+            use_ssl=False,
+            fail_silently=False,
+        )
+
+    def drain(self, options):
+        sent, failed = outbox.drain(
+            batch_size=options["batch_size"],
+            connection=self.get_connection(options),
+            max_batches=options["max_batches"],
+        )
+        if sent or failed or not options["interval"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Sent {sent} messages; {failed} failed and will be retried or dead-lettered."
+            ))
+
+    def handle(self, *args, **options):
+        self.drain(options)
+
+        while options["interval"]:
+            time.sleep(options["interval"])
+            self.drain(options)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app1 import pickup
+
+
+class Command(BaseCommand):
+    help = "Backfill or verify the pickup pincode/city/state copied onto each cloth."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify", action="store_true",
+                            help="Only report clothes whose copies are out of date.")
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            stale = pickup.stale_clothes()
+            count = stale.count()
+
+            for cloth in stale.only("id", "name", "seller_id")[:20]:
+                self.stdout.write(f"  stale: cloth {cloth.id} ({cloth.name}), seller {cloth.seller_id}")
+
+            if count:
+                raise CommandError(f"{count} clothes have stale pickup locations.")
+
+            self.stdout.write(self.style.SUCCESS("All pickup locations are in sync."))
+            return
+
+        updated = pickup.sync_all()
+        self.stdout.write(self.style.SUCCESS(f"Synced pickup location on {updated} clothes."))
@@ -0,0 +1,171 @@
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+_report_lock = threading.Lock()
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Normalize a statement to its shape: literals become ?, IN lists of any
+    length collapse, whitespace is squeezed. Two queries with the same
+    fingerprint differ only in their parameters.
+    """
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """execute_wrapper that times every statement run during a request."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((
+                context["connection"].alias,
+                sql,
+                time.perf_counter() - started,
+            ))
+
+
+def query_budget(max_queries=None, repeat_threshold=None):
+    """
+    Per-view override of QUERY_BUDGET's MAX_QUERIES / REPEAT_THRESHOLD,
+    for views that legitimately need more (or should stay under less):
+
+        @query_budget(max_queries=120)
+        def bulk_update_requests(request): ...
+    """
+    overrides = {
+        key: value for key, value in (
+            ("max_queries", max_queries), ("repeat_threshold", repeat_threshold),
+        ) if value is not None
+    }
+
+    def decorator(view):
+        view.query_budget = overrides
+        return view
+
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """
+    Opt-in per-view query accounting.
+
+    For every sampled request it records the number of queries, the total
+    time spent in the database and how often each query shape repeated.
+    A shape run more than REPEAT_THRESHOLD times is reported as a likely
+    N+1. Each request becomes one JSON line in REPORT_PATH. Streaming
+    responses are reported once their body has been sent, so queries run
+    while iterating it are counted too.
+
+    Configure with settings.QUERY_BUDGET, and per view with @query_budget;
+    when ENABLED is false Django drops the middleware at startup.
+    """
+
+    def __init__(self, get_response):
+        config = getattr(settings, "QUERY_BUDGET", {})
+        if not config.get("ENABLED"):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.report_path = config.get("REPORT_PATH", "query_budget.jsonl")
+        self.repeat_threshold = config.get("REPEAT_THRESHOLD", 5)
+        self.max_queries = config.get("MAX_QUERIES", 50)
+        self.sample_rate = config.get("SAMPLE_RATE", 1.0)
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+
+        with self.recording(recorder):
+            response = self.get_response(request)
+
+        if response.streaming:
+            response.streaming_content = self.streamed(
+                request, response, recorder, started, response.streaming_content
+            )
+        else:
+            self.report(request, response, recorder, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def recording(recorder):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        return stack
+
+    def streamed(self, request, response, recorder, started, content):
+        try:
+            with self.recording(recorder):
+                yield from content
+        finally:
+            self.report(request, response, recorder, time.perf_counter() - started)
+
+    def report(self, request, response, recorder, elapsed):
+        match = getattr(request, "resolver_match", None)
+        budget = getattr(match.func, "query_budget", {}) if match else {}
+        max_queries = budget.get("max_queries", self.max_queries)
+        repeat_threshold = budget.get("repeat_threshold", self.repeat_threshold)
+
+        shapes = Counter(fingerprint(sql) for _, sql, _ in recorder.queries)
+        repeated = [
+            {"count": count, "sql": sql}
+            for sql, count in shapes.most_common()
+            if count > repeat_threshold
+        ]
+
+        entry = {
+            "ts": round(time.time(), 3),
+            "view": match.view_name if match else None,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "queries": len(recorder.queries),
+            "db_ms": round(sum(t for _, _, t in recorder.queries) * 1000, 2),
+            "max_queries": max_queries,
+            "over_budget": len(recorder.queries) > max_queries,
+            "n_plus_one": repeated,
+        }
+
+        if repeated or entry["over_budget"]:
+            logger.warning(
+                "Query budget: %s ran %d queries (%d repeated shapes)",
+                entry["view"] or entry["path"], entry["queries"], len(repeated)
+            )
+
+        line = json.dumps(entry, separators=(",", ":"))
+        with _report_lock:
+            with open(self.report_path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
@@ -0,0 +1,75 @@
+import app1.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+FTS_TABLE = "app1_cloth_fts"
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, description, categories, "
+        "tokenize = 'unicode61 remove_diacritics 2', "
+        "prefix = '2 3')"
+    )
+
+    # Rank by column-weighted BM25: name, description, categories
+    schema_editor.execute(
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) "
+        "VALUES ('rank', 'bm25(10.0, 2.0, 5.0)')"
+    )
+
+    # Index the clothes that already exist
+    Cloth = apps.get_model("app1", "Cloth")
+    rows = []
+    for cloth in Cloth.objects.prefetch_related("categories"):
+        rows.append((
+            cloth.id,
+            cloth.name,
+            cloth.description,
+            " ".join(cat.name for cat in cloth.categories.all()),
+        ))
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, categories) "
+            "VALUES (%s, %s, %s, %s)",
+            rows
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0009_alter_rentrequest_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+        migrations.CreateModel(
+            name='ClothSearchEntry',
+            fields=[
+                ('cloth', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='app1.cloth')),
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('categories', models.TextField()),
+                ('document', app1.models.SearchDocumentField(db_column='app1_cloth_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'app1_cloth_fts',
+                'managed': False,
+            },
+        ),
+    ]
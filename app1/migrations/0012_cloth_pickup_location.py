@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:39
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def copy_pickup_locations(apps, schema_editor):
+    Cloth = apps.get_model("app1", "Cloth")
+    SellerProfile = apps.get_model("app1", "SellerProfile")
+
+    values = {}
+    for cloth_field, address_field in (
+        ("pickup_pincode", "pincode"),
+        ("pickup_city", "city"),
+        ("pickup_state", "state"),
+    ):
+        source = (
+            SellerProfile.objects
+            .filter(user_id=OuterRef("seller_id"))
+            .values(f"pickup_address__{address_field}")[:1]
+        )
+        values[cloth_field] = Coalesce(Subquery(source), Value(""))
+
+    Cloth.objects.update(**values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0011_address_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cloth',
+            name='pickup_city',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='cloth',
+            name='pickup_pincode',
+            field=models.CharField(blank=True, max_length=6),
+        ),
+        migrations.AddField(
+            model_name='cloth',
+            name='pickup_state',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='cloth',
+            index=models.Index(fields=['pickup_pincode', '-created_at', '-id'], name='cloth_pincode_created_idx'),
+        ),
+        migrations.RunPython(copy_pickup_locations, migrations.RunPython.noop),
+    ]
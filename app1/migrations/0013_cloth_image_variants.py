@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0012_cloth_pickup_location'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cloth',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0014_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SellerDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('requests', models.IntegerField(default=0)),
+                ('approved_requests', models.IntegerField(default=0)),
+                ('approved_units', models.IntegerField(default=0)),
+                ('rented_unit_days', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('cloth', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='app1.cloth')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('seller', 'day', 'cloth'), name='seller_daily_stat_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0015_seller_daily_stat'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rentrequest',
+            index=models.Index(fields=['seller', 'status', 'created_at'], name='rent_seller_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentrequest',
+            index=models.Index(fields=['buyer', 'status', 'created_at'], name='rent_buyer_status_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def _held(reservations):
+    return Coalesce(Subquery(
+        reservations.filter(cloth=OuterRef("pk"))
+        .values("cloth")
+        .annotate(units=Sum("quantity"))
+        .values("units")
+    ), 0)
+
+
+def open_reservations(apps, schema_editor):
+    """
+    One reservation per approved request, over its dates; quantity becomes
+    the units owned (on hand + held) rather than the units on hand.
+    """
+    Cloth = apps.get_model("app1", "Cloth")
+    RentRequest = apps.get_model("app1", "RentRequest")
+    StockReservation = apps.get_model("app1", "StockReservation")
+
+    approved = RentRequest.objects.filter(status="approved")
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            cloth_id=cloth_id, rent_request_id=rent_id, quantity=quantity,
+            start_date=start_date, end_date=end_date,
+        )
+        for rent_id, cloth_id, quantity, start_date, end_date in approved.values_list(
+            "id", "cloth_id", "quantity", "start_date", "end_date"
+        )
+    ], batch_size=1000)
+
+    Cloth.objects.update(quantity=F("quantity") + _held(StockReservation.objects.all()))
+
+
+def close_reservations(apps, schema_editor):
+    Cloth = apps.get_model("app1", "Cloth")
+    StockReservation = apps.get_model("app1", "StockReservation")
+
+    active = StockReservation.objects.filter(released_at__isnull=True)
+    Cloth.objects.update(quantity=F("quantity") - _held(active))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0016_rentrequest_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+                ('cloth', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='app1.cloth')),
+                ('rent_request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reservation', to='app1.rentrequest')),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['cloth', 'released_at'], name='reservation_cloth_idx'),
+                    models.Index(condition=models.Q(('released_at__isnull', True)), fields=['end_date', 'start_date'], name='reservation_active_dates_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(open_reservations, close_reservations),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0017_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cloth',
+            index=models.Index(condition=models.Q(('quantity__gt', 0)), fields=['-created_at', '-id'], name='cloth_in_stock_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentrequest',
+            index=models.Index(fields=['buyer', 'cloth', 'status'], name='rent_buyer_cloth_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentrequest',
+            index=models.Index(fields=['created_at'], name='rent_created_idx'),
+        ),
+    ]
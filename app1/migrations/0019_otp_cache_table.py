@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """The "otp" cache defaults to a database table; create it with the schema."""
+    if any(
+        cache["BACKEND"].endswith("DatabaseCache") for cache in settings.CACHES.values()
+    ):
+        call_command(
+            "createcachetable", database=schema_editor.connection.alias, verbosity=0
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0018_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
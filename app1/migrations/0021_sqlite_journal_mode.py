@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def set_journal_mode(apps, schema_editor):
+    """WAL (settings.SQLITE_JOURNAL_MODE) is kept by the file once set."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+
+
+def reset_journal_mode(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode = DELETE")
+
+
+class Migration(migrations.Migration):
+
+    # The journal mode cannot change inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('app1', '0020_outbox_claims'),
+    ]
+
+    operations = [
+        migrations.RunPython(set_journal_mode, reset_journal_mode, atomic=False),
+    ]
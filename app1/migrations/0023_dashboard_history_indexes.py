@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0022_queued_cloth_imports'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rentrequest',
+            index=models.Index(fields=['seller', 'created_at', 'id'], name='rent_seller_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentrequest',
+            index=models.Index(fields=['buyer', 'created_at', 'id'], name='rent_buyer_created_idx'),
+        ),
+    ]
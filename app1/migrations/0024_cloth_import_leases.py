@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0023_dashboard_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clothimport',
+            name='image_names',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='clothimport',
+            name='lease_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
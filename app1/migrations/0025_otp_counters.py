@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app1', '0024_cloth_import_leases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OtpCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='otp_counter_expiry_idx')],
+            },
+        ),
+    ]
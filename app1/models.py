@@ -1,8 +1,11 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 
+from . import thumbnails
+
 # Create your models here.
 class Address(models.Model):
     building = models.CharField(max_length=255)
@@ -19,6 +22,11 @@ class Address(models.Model):
         ]
     )
 
+    # Filled from the pincode table (app1.geo) on save, or from the street
+    # address by `geocode_addresses --street`
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
     def __str__(self):
         return f"{self.building}, {self.taluka}, {self.city}, {self.state} - {self.pincode}"
 
@@ -134,7 +142,11 @@ class Cloth(models.Model):
         upload_to="clothes/",
         default="clothes/default.png"
     )
+    # Widths of the WebP variants built by app1.thumbnails, smallest first
+    image_variants = models.JSONField(default=list, blank=True)
 
+    # Units owned; approved requests hold some of them for their dates
+    # (StockReservation, see app1.inventory)
     quantity = models.PositiveIntegerField(default=1)
 
     rent_per_day = models.DecimalField(
@@ -148,20 +160,118 @@ class Cloth(models.Model):
         default="good"
     )
 
+    # Copies of the seller's pickup address, kept in sync by app1.signals
+    pickup_pincode = models.CharField(max_length=6, blank=True)
+    pickup_city = models.CharField(max_length=100, blank=True, db_index=True)
+    pickup_state = models.CharField(max_length=100, blank=True, db_index=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Pincode-filtered catalog pages, same seek order
+            models.Index(
+                fields=["pickup_pincode", "-created_at", "-id"],
+                name="cloth_pincode_created_idx",
+            ),
+            # Seek index for keyset pagination of the catalog, which only
+            # ever lists clothes in stock
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(quantity__gt=0),
+                name="cloth_in_stock_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
     # ✅ COMPUTED AVAILABILITY (NO DB FIELD)
+    # `quantity` is units owned; what is free depends on the bookings.
+    # Pages set `free_units` in bulk (availability.mark_free_units), a
+    # single cloth looks up today's on first use.
+    def available_stock(self):
+        if getattr(self, "free_units", None) is None:
+            from . import availability
+
+            today = timezone.localdate()
+            availability.mark_free_units([self], today, today)
+        return self.free_units
+
     @property
     def is_available(self):
-        return self.quantity > 0
+        return self.available_stock() > 0
 
-    def available_stock(self):
-        return self.quantity if self.is_available else 0
+    # ---------------- RESPONSIVE IMAGES ---------------- #
+
+    def image_variant_url(self, width):
+        return self.image.storage.url(
+            thumbnails.variant_name(self.image.name, width)
+        )
+
+    @property
+    def image_srcset(self):
+        return ", ".join(
+            f"{self.image_variant_url(width)} {width}w"
+            for width in self.image_variants
+        )
+
+    def _nearest_variant_url(self, width):
+        if not self.image_variants:
+            return self.image.url
+        fitting = [w for w in self.image_variants if w >= width]
+        return self.image_variant_url(fitting[0] if fitting else self.image_variants[-1])
+
+    @property
+    def card_image_url(self):
+        return self._nearest_variant_url(thumbnails.CARD_WIDTH)
 
+    @property
+    def thumbnail_url(self):
+        return self._nearest_variant_url(thumbnails.VARIANT_WIDTHS[0])
+
+
+
+class SearchDocumentField(models.TextField):
+    """The hidden FTS5 column named after its table; supports `__match`."""
+
+
+@SearchDocumentField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class ClothSearchEntry(models.Model):
+    """
+    Read-only view of the `app1_cloth_fts` FTS5 table (see app1.search).
+    The virtual table's rowid is the cloth id.
+    """
+
+    cloth = models.OneToOneField(
+        Cloth,
+        on_delete=models.DO_NOTHING,
+        db_column="rowid",
+        db_constraint=False,
+        primary_key=True,
+        related_name="search_entry"
+    )
+
+    name = models.TextField()
+    description = models.TextField()
+    categories = models.TextField()
+
+    document = SearchDocumentField(db_column="app1_cloth_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "app1_cloth_fts"
 
 
 class RentRequest(models.Model):
@@ -237,5 +347,316 @@ class RentRequest(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Dashboard status tabs; scanned backwards for newest first
+            models.Index(
+                fields=["seller", "status", "created_at"],
+                name="rent_seller_status_idx",
+            ),
+            models.Index(
+                fields=["buyer", "status", "created_at"],
+                name="rent_buyer_status_idx",
+            ),
+            # The dashboards' "all" tab, read in (created_at, id) order
+            models.Index(
+                fields=["seller", "created_at", "id"],
+                name="rent_seller_created_idx",
+            ),
+            models.Index(
+                fields=["buyer", "created_at", "id"],
+                name="rent_buyer_created_idx",
+            ),
+            # "Already requested?" on the cloth pages
+            models.Index(
+                fields=["buyer", "cloth", "status"],
+                name="rent_buyer_cloth_status_idx",
+            ),
+            # Monthly statements: rentals created in a date range
+            models.Index(fields=["created_at"], name="rent_created_idx"),
+        ]
+
     def __str__(self):
         return f"{self.buyer} → {self.cloth.name} ({self.status})"
+
+    # ---------------- STATE MACHINE ---------------- #
+    # action -> states it may start from, and the columns it sets
+    TRANSITIONS = {
+        "accept": {
+            "from": {"status": ("pending",)},
+            "to": {"status": "approved"},
+        },
+        "reject": {
+            "from": {"status": ("pending",)},
+            "to": {"status": "rejected"},
+        },
+        "cancel": {
+            "from": {"status": ("pending", "approved")},
+            "to": {"status": "cancelled"},
+        },
+        "mark_paid": {
+            "from": {"status": ("approved",), "payment_status": ("pending",)},
+            "to": {"payment_status": "paid"},
+        },
+        "complete": {
+            "from": {"status": ("approved",), "payment_status": ("paid",)},
+            "to": {"status": "completed"},
+        },
+    }
+
+    def transition(self, action):
+        """
+        Compare-and-set `action` against the state this instance was loaded
+        in: one `UPDATE ... WHERE id = ? AND status = ? ...` touching only the
+        changed columns. Returns True if this call won; False if the request
+        was not in an allowed state or another request changed it first.
+        """
+        rule = self.TRANSITIONS[action]
+        observed = {field: getattr(self, field) for field in rule["from"]}
+
+        if any(observed[field] not in allowed for field, allowed in rule["from"].items()):
+            return False
+
+        won = RentRequest.objects.filter(pk=self.pk, **observed).update(**rule["to"])
+        if won:
+            for field, value in rule["to"].items():
+                setattr(self, field, value)
+        return bool(won)
+
+    @classmethod
+    def transition_many(cls, action, rents):
+        """
+        `transition` for several loaded requests in one UPDATE. Returns True
+        only if every request was still in the state it was loaded in; on
+        False some rows may already have changed, so run it inside
+        transaction.atomic() and roll back.
+        """
+        rule = cls.TRANSITIONS[action]
+        states = {}
+        for rent in rents:
+            observed = tuple((field, getattr(rent, field)) for field in rule["from"])
+            if any(value not in rule["from"][field] for field, value in observed):
+                return False
+            states.setdefault(observed, []).append(rent.pk)
+
+        if not states:
+            return True
+
+        match = models.Q()
+        for observed, pks in states.items():
+            match |= models.Q(pk__in=pks, **dict(observed))
+
+        if cls.objects.filter(match).update(**rule["to"]) != len(rents):
+            return False
+        for rent in rents:
+            for field, value in rule["to"].items():
+                setattr(rent, field, value)
+        return True
+
+
+class EmailOutbox(models.Model):
+    """
+    Mail waiting to be sent by `manage.py send_outbox`.
+
+    Rows are written in the same transaction as the change they announce,
+    so a rolled-back request never emails and an SMTP outage never rolls
+    back a request. A worker claims a row ("sending") until `lease_until`
+    before it talks to the server, so two workers never send the same one.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("dead", "Dead"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    # [{"filename", "mimetype", "content" (base64)}]
+    attachments = models.JSONField(default=list, blank=True)
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default="pending"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    lease_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # send_outbox: due pending mail, oldest first
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
+
+
+class StockReservation(models.Model):
+    """
+    Units of a cloth held by an approved rent request over its dates.
+    Written and released by app1.inventory.
+    """
+
+    cloth = models.ForeignKey(
+        Cloth,
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+    rent_request = models.OneToOneField(
+        RentRequest,
+        on_delete=models.CASCADE,
+        related_name="reservation"
+    )
+    quantity = models.PositiveIntegerField()
+    # Copies of the request's dates, which cannot change once it is approved
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Active units per cloth for reconciliation
+            models.Index(
+                fields=["cloth", "released_at"],
+                name="reservation_cloth_idx",
+            ),
+            # Active reservations overlapping a date window, for the catalog
+            models.Index(
+                fields=["end_date", "start_date"],
+                condition=models.Q(released_at__isnull=True),
+                name="reservation_active_dates_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} × {self.cloth_id} for request {self.rent_request_id}"
+
+
+class SellerDailyStat(models.Model):
+    """
+    Per seller, cloth and day rollup of rent requests, maintained by
+    app1.analytics. `day` is the day the request was created.
+    """
+
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_stats"
+    )
+    cloth = models.ForeignKey(
+        Cloth,
+        on_delete=models.CASCADE,
+        related_name="daily_stats"
+    )
+    day = models.DateField()
+
+    requests = models.IntegerField(default=0)
+    approved_requests = models.IntegerField(default=0)
+    approved_units = models.IntegerField(default=0)
+    # approved units x rental days, for utilization
+    rented_unit_days = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "day", "cloth"],
+                name="seller_daily_stat_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.seller} / {self.cloth_id} / {self.day}"
+
+
+class ClothImport(models.Model):
+    """
+    A seller's uploaded import file and images, waiting for
+    `manage.py run_imports`. The upload is stored under `directory` in the
+    default storage; the worker records its progress here after every
+    batch, holding the job ("running") until `lease_until`, and the seller
+    sees the outcome on their next visit to the listing page.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="cloth_imports"
+    )
+    directory = models.CharField(max_length=255)
+    file_name = models.CharField(max_length=255)
+    file_format = models.CharField(max_length=10)
+    # Image name in the file -> name it was stored under in `directory`
+    image_names = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default="pending"
+    )
+    lease_until = models.DateTimeField(null=True, blank=True)
+    rows = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # First few [line, message] pairs, for the seller
+    errors = models.JSONField(default=list, blank=True)
+    reported = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # run_imports: oldest pending first
+            models.Index(fields=["status", "created_at"], name="import_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"Import {self.id} by {self.seller} ({self.status})"
+
+
+class OtpCounter(models.Model):
+    """
+    A password reset counter (wrong guesses at a code, or codes sent to an
+    email or IP) until `expires_at`, maintained by app1.otp. `key` is an
+    HMAC, never the email or IP itself. Counts only move through a
+    conditional UPDATE, so parallel requests cannot read the same value
+    and both slip under the limit.
+    """
+
+    key = models.CharField(max_length=100, unique=True)
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # issue(): purge expired counters
+            models.Index(fields=["expires_at"], name="otp_counter_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.key}: {self.count}"
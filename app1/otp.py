@@ -0,0 +1,182 @@
+"""
+One-time codes for password reset, kept in the "otp" cache instead of the
+session. That cache is shared by every worker (a database table unless
+configured otherwise), so a code issued by one is checked by another.
+
+The code itself is never stored: the cache holds an HMAC of (email, code)
+that expires after OTP_TTL. Wrong guesses are counted and the code is
+burned after OTP_MAX_ATTEMPTS; sending codes is rate-limited per email and
+per client IP. Those counters are OtpCounter rows, moved with a
+conditional `count = count + 1` UPDATE: cache incr() is a get-then-set on
+DatabaseCache, which lets parallel requests count past a limit.
+
+The pages in between carry the email in signed tokens (django.core.signing)
+rather than in the session, so an anonymous reset never writes a session
+row. A verified code is exchanged for a reset token whose nonce lives in
+the cache and is deleted when the password is changed, so each token
+resets once.
+"""
+import secrets
+from datetime import timedelta
+
+from django.core import signing
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import OtpCounter
+
+
+OTP_TTL = 10 * 60
+
+OTP_MAX_ATTEMPTS = 5
+
+# Codes sent per RATE_WINDOW
+EMAIL_RATE_LIMIT = 5
+IP_RATE_LIMIT = 20
+RATE_WINDOW = 60 * 60
+
+cache = ConnectionProxy(caches, "otp")
+
+VERIFY_SALT = "app1.otp.verify"
+RESET_SALT = "app1.otp.reset"
+
+
+def _digest(value):
+    return salted_hmac("app1.otp.key", value.lower()).hexdigest()
+
+
+def _code_key(email):
+    return f"rentify:otp:code:{_digest(email)}"
+
+
+def _attempts_key(email):
+    return f"rentify:otp:attempts:{_digest(email)}"
+
+
+def _rate_key(kind, value):
+    return f"rentify:otp:rate:{kind}:{_digest(value)}"
+
+
+def _reset_key(nonce):
+    return f"rentify:otp:reset:{nonce}"
+
+
+def _hash_code(email, code):
+    return salted_hmac("app1.otp.code", f"{email.lower()}:{code}").hexdigest()
+
+
+def _count(key, limit, window):
+    """
+    Add one to counter `key` unless it already reached `limit`; returns the
+    new count, or None when the limit was reached. A counter starts over
+    `window` seconds after its first hit.
+    """
+    now = timezone.now()
+    live = OtpCounter.objects.filter(key=key, expires_at__gt=now)
+
+    def increment():
+        # The updated row stays locked until commit, so the count read
+        # back is the one this UPDATE wrote
+        with transaction.atomic():
+            if live.filter(count__lt=limit).update(count=F("count") + 1):
+                return live.values_list("count", flat=True).first()
+        return None
+
+    count = increment()
+    if count is not None or live.exists():
+        return count
+
+    # No counter, or an expired one: start a new window
+    OtpCounter.objects.filter(key=key, expires_at__lte=now).delete()
+    try:
+        with transaction.atomic():
+            OtpCounter.objects.create(key=key, count=1, expires_at=now + timedelta(seconds=window))
+    except IntegrityError:
+        # Another request started it first; count on top of theirs
+        return increment()
+    return 1
+
+
+# ---------------- CODES ---------------- #
+
+def rate_limited(email, ip):
+    """Count one send for `email` and `ip`; True once either is over its limit."""
+    by_email = _count(_rate_key("email", email), EMAIL_RATE_LIMIT, RATE_WINDOW) is None
+    by_ip = bool(ip) and _count(_rate_key("ip", ip), IP_RATE_LIMIT, RATE_WINDOW) is None
+    return by_email or by_ip
+
+
+def issue(email):
+    """New 6-digit code for `email`; replaces any earlier one."""
+    code = f"{secrets.randbelow(900000) + 100000}"
+    cache.set(_code_key(email), _hash_code(email, code), timeout=OTP_TTL)
+    # A new code gets a fresh guess count; expired counters go with it
+    OtpCounter.objects.filter(key=_attempts_key(email)).delete()
+    OtpCounter.objects.filter(expires_at__lte=timezone.now()).delete()
+    return code
+
+
+def verify(email, code):
+    """Check a code; a match or too many wrong guesses burns it."""
+    stored = cache.get(_code_key(email))
+    if stored is None:
+        return False
+
+    # The counter outlives a burned code, so a guess already in flight
+    # cannot start a new count; only issue() resets it
+    attempts = _count(_attempts_key(email), OTP_MAX_ATTEMPTS, OTP_TTL)
+    if attempts is None:
+        cache.delete(_code_key(email))
+        return False
+
+    matched = constant_time_compare(stored, _hash_code(email, (code or "").strip()))
+    if matched or attempts >= OTP_MAX_ATTEMPTS:
+        cache.delete(_code_key(email))
+    return matched
+
+
+# ---------------- TOKENS ---------------- #
+
+def verify_token(email):
+    """Token that carries `email` from the request form to the code form."""
+    return signing.dumps({"email": email}, salt=VERIFY_SALT)
+
+
+def email_from_verify_token(token):
+    try:
+        return signing.loads(token or "", salt=VERIFY_SALT, max_age=OTP_TTL)["email"]
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+def reset_token(email):
+    """Single-use token that allows setting a new password for `email`."""
+    nonce = secrets.token_urlsafe(16)
+    cache.set(_reset_key(nonce), email, timeout=OTP_TTL)
+    return signing.dumps({"email": email, "nonce": nonce}, salt=RESET_SALT)
+
+
+def _read_reset_token(token):
+    try:
+        data = signing.loads(token or "", salt=RESET_SALT, max_age=OTP_TTL)
+        return data["email"], data["nonce"]
+    except (signing.BadSignature, KeyError, TypeError):
+        return None, None
+
+
+def email_from_reset_token(token):
+    """The token's email while it is still unused, else None."""
+    email, nonce = _read_reset_token(token)
+    if email is None or cache.get(_reset_key(nonce)) != email:
+        return None
+    return email
+
+
+def consume_reset_token(token):
+    """Use up a reset token; only the first caller gets True."""
+    email, nonce = _read_reset_token(token)
+    return email is not None and cache.delete(_reset_key(nonce))
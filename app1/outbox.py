@@ -0,0 +1,200 @@
+"""
+Transactional email.
+
+Views call `queue_email` inside the transaction that changes the data;
+`manage.py send_outbox` drains due rows over one reused SMTP connection.
+A failed message is retried with exponential backoff and moved to `dead`
+after MAX_ATTEMPTS.
+
+Several workers may drain at once. Each message is claimed first with a
+conditional UPDATE (pending -> sending, with a lease) and only sent by the
+worker whose UPDATE changed the row. A worker that dies mid-send leaves
+the row "sending"; once the lease expires it is pending again and is
+retried, so mail is delivered at least once but never sent twice by
+workers that are alive. The outcome is written with the same kind of
+conditional UPDATE, matched on this worker's lease, so a worker whose
+lease ran out during a slow send never overwrites the row another worker
+has since claimed.
+"""
+import base64
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from . import receipts
+from .models import EmailOutbox, RentRequest
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+BASE_BACKOFF = timedelta(minutes=1)
+MAX_BACKOFF = timedelta(hours=2)
+
+# How long a claimed message may take before another worker may retry it
+LEASE = timedelta(minutes=10)
+
+
+def queue_email(subject, body, to, from_email=None, attachments=(), receipt_ids=()):
+    """
+    Store a message for the outbox worker.
+
+    `attachments` is a sequence of (filename, content bytes, mimetype).
+    `receipt_ids` are RentRequest ids whose PDF receipts the worker renders
+    (or reuses from storage) when it sends the message.
+    """
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        attachments=[
+            {
+                "filename": filename,
+                "mimetype": mimetype,
+                "content": base64.b64encode(content).decode(),
+            }
+            for filename, content, mimetype in attachments
+        ] + [{"receipt": rent_id} for rent_id in receipt_ids],
+    )
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts + 1`: 1, 2, 4 ... minutes, capped."""
+    return min(BASE_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+
+
+def build_message(entry, connection=None):
+    message = EmailMessage(
+        subject=entry.subject,
+        body=entry.body,
+        from_email=entry.from_email,
+        to=entry.to,
+        connection=connection,
+    )
+    for attachment in entry.attachments:
+        if "receipt" in attachment:
+            rent = RentRequest.objects.select_related("cloth", "buyer", "seller").get(
+                id=attachment["receipt"]
+            )
+            message.attach(*receipts.receipt_pdf(rent), "application/pdf")
+            continue
+        message.attach(
+            attachment["filename"],
+            base64.b64decode(attachment["content"]),
+            attachment["mimetype"],
+        )
+    return message
+
+
+def release_expired(now=None):
+    """Hand messages whose worker died mid-send back to the queue."""
+    return EmailOutbox.objects.filter(
+        status="sending", lease_until__lt=now or timezone.now()
+    ).update(status="pending", lease_until=None)
+
+
+def due_messages(limit, now=None):
+    return list(
+        EmailOutbox.objects
+        .filter(status="pending", next_attempt_at__lte=now or timezone.now())
+        .order_by("next_attempt_at", "id")[:limit]
+    )
+
+
+def claim(entry, now):
+    """
+    Take `entry` for this worker; False if another worker got it first.
+    The UPDATE only matches while the row is still pending, due and at the
+    attempt count `entry` was read with.
+    """
+    claimed = EmailOutbox.objects.filter(
+        pk=entry.pk, status="pending", next_attempt_at__lte=now, attempts=entry.attempts
+    ).update(status="sending", lease_until=now + LEASE)
+    if claimed != 1:
+        return False
+    entry.status = "sending"
+    entry.lease_until = now + LEASE
+    return True
+
+
+def _finish(entry, **fields):
+    """
+    Write the outcome of a send while this worker's lease still holds the
+    row; False when the lease expired and another worker took it over.
+    """
+    updated = EmailOutbox.objects.filter(
+        pk=entry.pk, status="sending", lease_until=entry.lease_until
+    ).update(lease_until=None, **fields)
+    if updated != 1:
+        logger.warning("Outbox message %s was taken over by another worker "
+                       "before its outcome was recorded", entry.id)
+        return False
+    for field, value in fields.items():
+        setattr(entry, field, value)
+    entry.lease_until = None
+    return True
+
+
+def _record_failure(entry, error, now):
+    attempts = entry.attempts + 1
+    last_error = f"{type(error).__name__}: {error}"
+    if attempts >= MAX_ATTEMPTS:
+        if _finish(entry, status="dead", attempts=attempts, last_error=last_error):
+            logger.error("Outbox message %s dead after %s attempts: %s",
+                         entry.id, attempts, last_error)
+    else:
+        _finish(entry, status="pending", attempts=attempts, last_error=last_error,
+                next_attempt_at=now + backoff(attempts))
+
+
+def send_batch(entries, connection):
+    """
+    Send `entries` over `connection`, recording each outcome. Entries
+    another worker claimed first are skipped. Returns (sent, failed).
+    """
+    sent = failed = 0
+
+    for entry in entries:
+        now = timezone.now()
+        if not claim(entry, now):
+            continue
+        try:
+            connection.open()
+            connection.send_messages([build_message(entry, connection)])
+        except Exception as error:
+            failed += 1
+            _record_failure(entry, error, now)
+            # The server may have dropped us; reconnect for the next one
+            connection.close()
+            continue
+
+        sent += 1
+        _finish(entry, status="sent", sent_at=now, attempts=entry.attempts + 1, last_error="")
+
+    return sent, failed
+
+
+def drain(batch_size=50, connection=None, max_batches=None):
+    """Send every due message, `batch_size` at a time, over one connection."""
+    connection = connection or get_connection(fail_silently=False)
+    total_sent = total_failed = batches = 0
+
+    release_expired()
+    try:
+        while max_batches is None or batches < max_batches:
+            entries = due_messages(batch_size)
+            if not entries:
+                break
+            sent, failed = send_batch(entries, connection)
+            total_sent += sent
+            total_failed += failed
+            batches += 1
+    finally:
+        connection.close()
+
+    return total_sent, total_failed
@@ -0,0 +1,156 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Seek pagination over a fixed ordering.
+
+    Instead of OFFSET, each page remembers the ordering values of its first
+    and last rows and the next page filters past them, so page N costs the
+    same index range scan as page 1. The ordering must end in a unique
+    column (the primary key) to be a total order.
+
+    Cursors come back from clients, so a token that does not decode, or
+    whose values the ordering's fields reject, is treated as no cursor
+    and the first page is served.
+    """
+
+    def __init__(self, ordering=("-created_at", "-id"), per_page=24):
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+
+    # ---------------- CURSOR TOKENS ---------------- #
+
+    def encode_cursor(self, obj, direction):
+        values = []
+        for key in self.ordering:
+            value = getattr(obj, key.lstrip("-"))
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+
+        raw = json.dumps({"d": direction, "v": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, values = data["d"], data["v"]
+        except (ValueError, TypeError, KeyError):
+            return None, None
+
+        if direction not in ("next", "prev") or not isinstance(values, list):
+            return None, None
+        if len(values) != len(self.ordering):
+            return None, None
+
+        return direction, values
+
+    def _clean_values(self, queryset, values):
+        """
+        Cursor values converted by their ordering fields (annotations
+        included), or None if any of them is not a valid value.
+        """
+        cleaned = []
+        try:
+            for key, value in zip(self.ordering, values):
+                name = key.lstrip("-")
+                annotation = queryset.query.annotations.get(name)
+                if annotation is not None:
+                    field = annotation.output_field
+                else:
+                    field = queryset.model._meta.get_field(name)
+                value = field.to_python(value)
+                if value is None:
+                    return None
+                cleaned.append(value)
+        except (ValidationError, ValueError, TypeError):
+            return None
+        return cleaned
+
+    # ---------------- SEEK ---------------- #
+
+    def _seek_filter(self, values, forward):
+        """
+        Rows strictly after `values` in the (possibly reversed) ordering:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        condition = Q()
+        equal = Q()
+
+        for key, value in zip(self.ordering, values):
+            field = key.lstrip("-")
+            descending = key.startswith("-")
+            lookup = "lt" if descending == forward else "gt"
+
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+
+        return condition
+
+    def paginate(self, queryset, cursor=None):
+        direction, values = self.decode_cursor(cursor) if cursor else (None, None)
+        if values is not None:
+            values = self._clean_values(queryset, values)
+            if values is None:
+                direction = None
+        forward = direction != "prev"
+
+        if forward:
+            ordering = self.ordering
+        else:
+            ordering = tuple(
+                key[1:] if key.startswith("-") else f"-{key}"
+                for key in self.ordering
+            )
+
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, forward))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if not forward:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+
+        if forward:
+            has_next, has_prev = has_more, values is not None
+        else:
+            has_next, has_prev = True, has_more
+
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], "next") if has_next else None,
+            prev_cursor=self.encode_cursor(rows[0], "prev") if has_prev else None,
+        )
@@ -0,0 +1,94 @@
+"""
+Denormalized pickup location on Cloth.
+
+Each cloth carries copies of its seller's pickup pincode, city and state
+so the catalog can filter on one indexed table instead of joining
+Cloth → CustomUser → SellerProfile → Address. app1.signals keeps the
+copies current; `manage.py sync_pickup_locations` backfills and verifies.
+
+Updates through the queryset skip the Cloth signals, so the catalog and
+cloth:<id> cache versions of the rewritten clothes are bumped here, once
+the transaction commits.
+"""
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from . import facets
+from .caching import bump_on_commit, cloth_namespace
+from .models import Cloth, SellerProfile
+
+
+# Cloth field -> Address field
+PICKUP_FIELDS = {
+    "pickup_pincode": "pincode",
+    "pickup_city": "city",
+    "pickup_state": "state",
+}
+
+
+def pickup_values(address):
+    return {
+        cloth_field: getattr(address, address_field) if address else ""
+        for cloth_field, address_field in PICKUP_FIELDS.items()
+    }
+
+
+def _invalidate(cloth_ids):
+    bump_on_commit([facets.CATALOG, *(cloth_namespace(cloth_id) for cloth_id in cloth_ids)])
+
+
+def _copy(clothes, address):
+    cloth_ids = list(clothes.values_list("id", flat=True))
+    updated = Cloth.objects.filter(id__in=cloth_ids).update(**pickup_values(address))
+    _invalidate(cloth_ids)
+    return updated
+
+
+def sync_seller(seller_id, address):
+    """Copy one seller's pickup address onto all of their clothes."""
+    return _copy(Cloth.objects.filter(seller_id=seller_id), address)
+
+
+def _picked_up_at(address):
+    return Cloth.objects.filter(seller__seller_profile__pickup_address=address)
+
+
+def sync_address(address):
+    """Copy an edited address onto every cloth picked up there."""
+    return _copy(_picked_up_at(address), address)
+
+
+def clear_address(address):
+    """Blank the copies of an address that is about to be deleted."""
+    return _copy(_picked_up_at(address), None)
+
+
+def source_values():
+    """Per-cloth expressions reading the pickup address through the joins."""
+    expressions = {}
+    for cloth_field, address_field in PICKUP_FIELDS.items():
+        source = (
+            SellerProfile.objects
+            .filter(user_id=OuterRef("seller_id"))
+            .values(f"pickup_address__{address_field}")[:1]
+        )
+        expressions[cloth_field] = Coalesce(Subquery(source), Value(""))
+    return expressions
+
+
+def stale_clothes():
+    """Clothes whose copies disagree with their seller's pickup address."""
+    sources = {f"source_{field}": expr for field, expr in source_values().items()}
+
+    # exclude(a=x, b=y, c=z) keeps rows where any copy differs
+    return Cloth.objects.annotate(**sources).exclude(**{
+        cloth_field: F(f"source_{cloth_field}") for cloth_field in PICKUP_FIELDS
+    })
+
+
+def sync_all():
+    """Rewrite every cloth's copies in one UPDATE; returns rows touched."""
+    stale_ids = list(stale_clothes().values_list("id", flat=True))
+    updated = Cloth.objects.update(**source_values())
+    _invalidate(stale_ids)
+    return updated
@@ -0,0 +1,123 @@
+"""
+Payment receipts.
+
+Rendering is a pure function of a small dict of receipt fields, so it can
+run in the outbox worker or a process pool. Styles and the table style are
+built once per process. Documents are rendered with `invariant=1`, which
+fixes ReportLab's timestamps and IDs, so the same fields always produce the
+same bytes; the file is stored as `receipts/<sha256 of the fields>.pdf` and
+re-served from storage on every later download. Concurrent first downloads
+each render the same bytes and atomically replace one file, rather than
+leaving suffixed copies behind.
+"""
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.core.files.storage import default_storage
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .files import store_atomic
+
+
+RECEIPT_DIR = "receipts"
+
+# Bump when the layout changes so old files are not served for new receipts
+LAYOUT_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def receipt_styles():
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=None)
+def table_style():
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ("PADDING", (0, 0), (-1, -1), 8),
+    ])
+
+
+def receipt_fields(rent):
+    """The plain values a receipt prints; all a renderer process needs."""
+    return {
+        "id": rent.id,
+        "cloth": rent.cloth.name,
+        "seller": rent.seller.first_name,
+        "buyer": rent.buyer.first_name,
+        "quantity": rent.quantity,
+        "start_date": str(rent.start_date),
+        "end_date": str(rent.end_date),
+        "total_days": rent.total_days,
+        "total_price": str(rent.total_price),
+    }
+
+
+def receipt_filename(fields):
+    return f"Rentify_Receipt_RENT{fields['id']}.pdf"
+
+
+def receipt_path(fields):
+    payload = json.dumps([LAYOUT_VERSION, fields], sort_keys=True)
+    digest = hashlib.sha256(payload.encode()).hexdigest()
+    return f"{RECEIPT_DIR}/{digest}.pdf"
+
+
+def render_receipt(fields):
+    styles = receipt_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, invariant=1)
+
+    table = Table([
+        ["Item Name", fields["cloth"]],
+        ["Seller", fields["seller"]],
+        ["Buyer", fields["buyer"]],
+        ["Quantity", str(fields["quantity"])],
+        ["Rental Period", f"{fields['start_date']} to {fields['end_date']}"],
+        ["Total Days", str(fields["total_days"])],
+        ["Amount Paid", f"₹{fields['total_price']}"],
+    ], colWidths=[150, 300])
+    table.setStyle(table_style())
+
+    doc.build([
+        Paragraph("<b>RENTIFY – PAYMENT RECEIPT</b>", styles["Title"]),
+        Spacer(1, 12),
+        Paragraph(f"<b>Order ID:</b> RENT{fields['id']}", styles["Normal"]),
+        Paragraph("<b>Payment Status:</b> PAID", styles["Normal"]),
+        Spacer(1, 12),
+        table,
+        Spacer(1, 20),
+        Paragraph(
+            "Thank you for choosing Rentify. This receipt confirms successful payment.",
+            styles["Italic"]
+        ),
+    ])
+    return buffer.getvalue()
+
+
+def stored_receipt(fields):
+    """Path of the receipt in storage, rendering it on the first request."""
+    path = receipt_path(fields)
+    if not default_storage.exists(path):
+        store_atomic(default_storage, path, render_receipt(fields))
+    return path
+
+
+def receipt_pdf(rent):
+    """(filename, bytes) of the receipt for a RentRequest."""
+    fields = receipt_fields(rent)
+    with default_storage.open(stored_receipt(fields), "rb") as handle:
+        return receipt_filename(fields), handle.read()
+
+
+def render_many(field_list, workers=None):
+    """Render receipts across a process pool; returns the PDFs in order."""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(render_receipt, field_list, chunksize=8))
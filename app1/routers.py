@@ -0,0 +1,138 @@
+"""
+Read/write splitting.
+
+Writes always go to `default`. Reads go to the read-only REPLICA alias
+only inside `use_replica()`, which the `replica_reads` decorator wraps
+around pure-read views (GET/HEAD). Everything else reads from the
+primary, so a view that reads and then writes never mixes connections.
+
+Even inside use_replica() reads stay on the primary
+- within a transaction on the primary,
+- for sessions, which must see a login the moment it happens, and for
+  the database cache table behind app1.otp,
+- for a short while after the same session wrote anything:
+  ReplicaStickinessMiddleware watches the statements a request runs on the
+  primary and, once one of them changed a row, pins the session to the
+  primary for REPLICA_STICKY_SECONDS so users see their own changes while
+  a real replica catches up. Asking the router for the write alias is not
+  a write (get_or_create asks before it reads), and neither are session
+  or cache-table writes. Only logged-in sessions are pinned.
+"""
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+
+
+REPLICA = "replica"
+
+PRIMARY_ONLY_APPS = {"sessions", "django_cache"}
+
+PIN_SESSION_KEY = "_db_primary_until"
+
+_use_replica = ContextVar("use_replica", default=False)
+
+_WRITE_RE = re.compile(
+    r'^\s*(INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)"?',
+    re.IGNORECASE,
+)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def use_replica():
+    token = _use_replica.set(replica_configured())
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def primary_only_tables():
+    """Tables whose writes never pin a session: sessions and cache tables."""
+    tables = {"django_session"}
+    for config in settings.CACHES.values():
+        if config["BACKEND"] == "django.core.cache.backends.db.DatabaseCache":
+            tables.add(config["LOCATION"])
+    return tables
+
+
+def pinned_to_primary(request):
+    session = getattr(request, "session", None)
+    return session is not None and session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+def replica_reads(view):
+    """Serve a read-only view from the replica unless the session is pinned."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or pinned_to_primary(request):
+            return view(request, *args, **kwargs)
+        with use_replica():
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReadWriteRouter:
+
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get():
+            return None
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        if connections["default"].in_atomic_block:
+            return None
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pin a session to the primary after a request that wrote. Must sit
+    after SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.ignored_tables = primary_only_tables()
+
+    def __call__(self, request):
+        wrote = []
+
+        def note_writes(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            match = _WRITE_RE.match(sql)
+            if match and match.group(2) not in self.ignored_tables:
+                # Inserts RETURNING their ids report no rowcount until fetched;
+                # an UPDATE/DELETE that matched nothing changed nothing
+                if match.group(1).upper().startswith(("INSERT", "REPLACE")) or context["cursor"].rowcount:
+                    wrote.append(match.group(2))
+            return result
+
+        with connections["default"].execute_wrapper(note_writes):
+            response = self.get_response(request)
+
+        # Anonymous pages never read back what they wrote, and pinning them
+        # would create a session row for every password reset
+        user = getattr(request, "user", None)
+        if wrote and hasattr(request, "session") and user and user.is_authenticated:
+            request.session[PIN_SESSION_KEY] = time.time() + settings.REPLICA_STICKY_SECONDS
+        return response
@@ -0,0 +1,142 @@
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+
+
+FTS_TABLE = "app1_cloth_fts"
+
+MAX_QUERY_TERMS = 8
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_enabled():
+    """FTS5 only exists on SQLite; other backends use the LIKE fallback."""
+    return connection.vendor == "sqlite"
+
+
+def build_match_query(text):
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so user input can never be
+    parsed as FTS5 syntax (NEAR, column filters, unbalanced quotes...).
+    Terms are implicitly AND-ed.
+    """
+    terms = _TERM_RE.findall(text or "")[:MAX_QUERY_TERMS]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+# ---------------- INDEX MAINTENANCE ---------------- #
+
+def index_cloths(cloth_ids):
+    cloth_ids = list(cloth_ids)
+    if not cloth_ids or not is_enabled():
+        return
+
+    from .models import Cloth
+
+    rows = []
+    clothes = (
+        Cloth.objects
+        .filter(id__in=cloth_ids)
+        .prefetch_related("categories")
+        .only("id", "name", "description")
+    )
+    for cloth in clothes:
+        category_names = " ".join(cat.name for cat in cloth.categories.all())
+        rows.append((cloth.id, cloth.name, cloth.description, category_names))
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [(cloth_id,) for cloth_id in cloth_ids]
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, categories) "
+            f"VALUES (%s, %s, %s, %s)",
+            rows
+        )
+
+
+def remove_cloths(cloth_ids):
+    cloth_ids = list(cloth_ids)
+    if not cloth_ids or not is_enabled():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [(cloth_id,) for cloth_id in cloth_ids]
+        )
+
+
+def rebuild_index(batch_size=1000):
+    """Drop every indexed document and re-index all clothes."""
+    if not is_enabled():
+        return 0
+
+    from .models import Cloth
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    total = 0
+    batch = []
+    for cloth_id in Cloth.objects.values_list("id", flat=True).iterator():
+        batch.append(cloth_id)
+        if len(batch) >= batch_size:
+            index_cloths(batch)
+            total += len(batch)
+            batch = []
+
+    if batch:
+        index_cloths(batch)
+        total += len(batch)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+    return total
+
+
+# ---------------- QUERYING ---------------- #
+
+def search_clothes(queryset, text):
+    """
+    Restrict a Cloth queryset to full-text matches of `text` and annotate
+    each row with `search_rank` (weighted BM25, lower is better).
+
+    The FTS table is joined on rowid = cloth.id, so SQLite runs the MATCH
+    once and looks clothes up by primary key.
+    """
+    match = build_match_query(text)
+    if not match:
+        # Punctuation only: nothing to match, but callers still order by rank
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if not is_enabled():
+        return like_search(queryset, text)
+
+    return queryset.filter(
+        search_entry__document__match=match
+    ).annotate(
+        search_rank=F("search_entry__rank")
+    )
+
+
+def like_search(queryset, text):
+    """The old LIKE '%...%' path, kept as the fallback and benchmark baseline."""
+    condition = Q()
+    for term in _TERM_RE.findall(text or "")[:MAX_QUERY_TERMS]:
+        condition &= (
+            Q(name__icontains=term)
+            | Q(description__icontains=term)
+            | Q(categories__name__icontains=term)
+        )
+    return (
+        queryset.filter(condition)
+        .annotate(search_rank=Value(0.0, output_field=FloatField()))
+        .distinct()
+    )
@@ -0,0 +1,209 @@
+"""
+Synthetic marketplace data for benchmarks and local profiling.
+
+`seed()` bulk-inserts sellers (with pickup addresses and store profiles),
+buyers, clothes with categories, and rent requests spread over the last
+few months in a realistic status mix. Everything the signals would
+normally maintain is filled in directly: approved requests hold dated
+reservations that never overbook a day, pickup copies match the seller's
+address, and the search index, analytics rollups and cache versions are
+rebuilt at the end.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import analytics, availability, facets, geo, search
+from .caching import bump_versions
+from .models import (
+    Address, BuyerProfile, Category, Cloth, CustomUser, RentRequest,
+    SellerProfile, StockReservation,
+)
+
+
+CATEGORIES = ["Sarees", "Lehengas", "Sherwanis", "Gowns", "Kurtas", "Jackets", "Dupattas"]
+
+WORDS = [
+    "silk", "cotton", "banarasi", "kanjivaram", "chiffon", "georgette",
+    "velvet", "embroidered", "zari", "bridal", "party", "festive",
+    "red", "maroon", "gold", "ivory", "pastel", "navy", "emerald", "pink",
+]
+
+# Share of requests in each status, roughly what a live marketplace holds
+STATUS_MIX = {
+    "pending": 0.20,
+    "approved": 0.15,
+    "rejected": 0.15,
+    "completed": 0.40,
+    "cancelled": 0.10,
+}
+
+HISTORY_DAYS = 120
+
+BATCH_SIZE = 1000
+
+DEFAULT_PASSWORD = "rentify123"
+
+
+def _users(prefix, count, hashed, **flags):
+    return CustomUser.objects.bulk_create([
+        CustomUser(
+            username=f"{prefix}{index}@rentify.test",
+            email=f"{prefix}{index}@rentify.test",
+            first_name=f"{prefix.title()} {index}",
+            contact=f"9{index:09d}",
+            password=hashed,
+            **flags,
+        )
+        for index in range(count)
+    ], batch_size=BATCH_SIZE)
+
+
+def _addresses(rng, count):
+    # The table also keys 3-digit districts; sellers sit at real pincodes
+    pincodes = sorted(pincode for pincode in geo.pincode_table() if len(pincode) == 6)
+    addresses = []
+    for index in range(count):
+        pincode = rng.choice(pincodes)
+        latitude, longitude = geo.locate(pincode) or (None, None)
+        addresses.append(Address(
+            building=f"{index + 1} Market Road",
+            taluka="Central",
+            city=f"City {pincode[:3]}",
+            state="State",
+            pincode=pincode,
+            latitude=latitude,
+            longitude=longitude,
+        ))
+    return Address.objects.bulk_create(addresses, batch_size=BATCH_SIZE)
+
+
+@transaction.atomic
+def seed(sellers, clothes, requests, buyers=None, seed=42, password=DEFAULT_PASSWORD):
+    """Insert the data set; returns {table: rows created}."""
+    rng = random.Random(seed)
+    buyers = buyers or max(sellers * 5, 1)
+    hashed = make_password(password)
+    now = timezone.now()
+
+    seller_users = _users("seller", sellers, hashed, is_seller=True)
+    buyer_users = _users("buyer", buyers, hashed, is_buyer=True)
+
+    addresses = _addresses(rng, sellers + buyers)
+    SellerProfile.objects.bulk_create([
+        SellerProfile(user=user, store_name=f"{user.first_name}'s Boutique", pickup_address=address)
+        for user, address in zip(seller_users, addresses)
+    ], batch_size=BATCH_SIZE)
+    BuyerProfile.objects.bulk_create([
+        BuyerProfile(user=user, address=address)
+        for user, address in zip(buyer_users, addresses[sellers:])
+    ], batch_size=BATCH_SIZE)
+    pickup = {user.id: address for user, address in zip(seller_users, addresses)}
+
+    existing = set(Category.objects.values_list("slug", flat=True))
+    Category.objects.bulk_create([
+        Category(name=name, slug=name.lower())
+        for name in CATEGORIES if name.lower() not in existing
+    ])
+    categories = list(Category.objects.filter(slug__in=[name.lower() for name in CATEGORIES]))
+
+    cloth_rows = []
+    for index in range(clothes):
+        seller = rng.choice(seller_users)
+        address = pickup[seller.id]
+        cloth_rows.append(Cloth(
+            seller=seller,
+            name=" ".join(rng.sample(WORDS, 3)).title(),
+            description=" ".join(rng.choices(WORDS, k=15)),
+            quantity=rng.randint(1, 5),
+            rent_per_day=Decimal(rng.randrange(200, 5000, 50)),
+            condition=rng.choice(Cloth.CONDITION_CHOICES)[0],
+            pickup_pincode=address.pincode,
+            pickup_city=address.city,
+            pickup_state=address.state,
+        ))
+    cloth_rows = Cloth.objects.bulk_create(cloth_rows, batch_size=BATCH_SIZE)
+
+    Through = Cloth.categories.through
+    Through.objects.bulk_create([
+        Through(cloth_id=cloth.id, category_id=category.id)
+        for cloth in cloth_rows
+        for category in rng.sample(categories, rng.choice((1, 1, 2)))
+    ], batch_size=BATCH_SIZE)
+
+    # Requests: approved ones only while their dates have units free, so
+    # the reservations never overbook a day
+    statuses, weights = zip(*STATUS_MIX.items())
+    booked = {cloth.id: [] for cloth in cloth_rows}
+    rent_rows, created = [], []
+    for _ in range(requests):
+        cloth = rng.choice(cloth_rows)
+        status = rng.choices(statuses, weights)[0]
+        quantity = rng.randint(1, 2)
+
+        created_at = now - timedelta(
+            days=rng.randrange(HISTORY_DAYS), seconds=rng.randrange(86400)
+        )
+        if status in ("pending", "approved"):
+            start = timezone.localdate() + timedelta(days=rng.randint(1, 45))
+        else:
+            start = timezone.localdate(created_at) + timedelta(days=rng.randint(1, 10))
+        days = rng.randint(1, 7)
+        end = start + timedelta(days=days - 1)
+
+        if status == "approved":
+            peak = availability.peak_occupancy(booked[cloth.id], start, end).get(cloth.id, 0)
+            if cloth.quantity - peak < quantity:
+                status = "pending"
+            else:
+                booked[cloth.id].append((cloth.id, start, end, quantity))
+
+        paid = status == "completed" or (status == "approved" and rng.random() < 0.4)
+        rent_rows.append(RentRequest(
+            buyer=rng.choice(buyer_users),
+            seller_id=cloth.seller_id,
+            cloth=cloth,
+            quantity=quantity,
+            start_date=start,
+            end_date=end,
+            total_days=days,
+            total_price=cloth.rent_per_day * quantity * days,
+            status=status,
+            payment_status="paid" if paid else "pending",
+        ))
+        created.append(created_at)
+
+    rent_rows = RentRequest.objects.bulk_create(rent_rows, batch_size=BATCH_SIZE)
+
+    # auto_now_add stamped every row with now; spread them over the history
+    for rent, created_at in zip(rent_rows, created):
+        rent.created_at = created_at
+    RentRequest.objects.bulk_update(rent_rows, ["created_at"], batch_size=BATCH_SIZE)
+
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            cloth_id=rent.cloth_id,
+            rent_request=rent,
+            quantity=rent.quantity,
+            start_date=rent.start_date,
+            end_date=rent.end_date,
+        )
+        for rent in rent_rows if rent.status == "approved"
+    ], batch_size=BATCH_SIZE)
+
+    search.rebuild_index()
+    analytics.rebuild()
+    transaction.on_commit(
+        lambda: bump_versions([facets.CATALOG, geo.SELLER_LOCATIONS])
+    )
+
+    return {
+        "sellers": len(seller_users),
+        "buyers": len(buyer_users),
+        "clothes": len(cloth_rows),
+        "rent_requests": len(rent_rows),
+    }
@@ -0,0 +1,207 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import facets, geo, pickup, search, thumbnails
+from .caching import bump_on_commit, cloth_namespace
+from .models import Address, Category, Cloth, SellerProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------- FULL-TEXT SEARCH INDEX ---------------- #
+
+@receiver(post_save, sender=Cloth)
+def index_saved_cloth(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_cloths([instance.id])
+
+
+@receiver(post_delete, sender=Cloth)
+def unindex_deleted_cloth(sender, instance, **kwargs):
+    search.remove_cloths([instance.id])
+
+
+@receiver(m2m_changed, sender=Cloth.categories.through)
+def reindex_cloth_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+
+    if not reverse:
+        # cloth.categories.add/remove/clear/set
+        if action != "pre_clear":
+            search.index_cloths([instance.id])
+        return
+
+    # category.clothes.add/remove/clear: `instance` is the Category
+    if action == "pre_clear":
+        instance._cleared_cloth_ids = list(
+            instance.clothes.values_list("id", flat=True)
+        )
+    elif action == "post_clear":
+        search.index_cloths(getattr(instance, "_cleared_cloth_ids", []))
+    else:
+        search.index_cloths(pk_set or [])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_clothes(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    search.index_cloths(instance.clothes.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_clothes(sender, instance, **kwargs):
+    instance._deleted_cloth_ids = list(
+        instance.clothes.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+def reindex_deleted_category_clothes(sender, instance, **kwargs):
+    search.index_cloths(getattr(instance, "_deleted_cloth_ids", []))
+
+
+# ---------------- PICKUP LOCATIONS ---------------- #
+
+@receiver(pre_save, sender=Address)
+def geocode_address(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Keep coordinates `geocode_addresses --street` found while the pincode stands
+    if instance.pk and instance.latitude is not None and Address.objects.filter(
+        pk=instance.pk, pincode=instance.pincode
+    ).exists():
+        return
+    location = geo.locate(instance.pincode)
+    instance.latitude, instance.longitude = location or (None, None)
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+@receiver(post_save, sender=SellerProfile)
+@receiver(post_delete, sender=SellerProfile)
+def invalidate_seller_locations(sender, **kwargs):
+    bump_on_commit([geo.SELLER_LOCATIONS])
+
+
+@receiver(pre_save, sender=Cloth)
+def copy_pickup_location(sender, instance, raw=False, **kwargs):
+    if raw or not instance._state.adding or instance.pickup_pincode:
+        return
+
+    profile = (
+        SellerProfile.objects
+        .select_related("pickup_address")
+        .filter(user_id=instance.seller_id)
+        .first()
+    )
+    address = profile.pickup_address if profile else None
+    for field, value in pickup.pickup_values(address).items():
+        setattr(instance, field, value)
+
+
+@receiver(post_save, sender=Address)
+def sync_address_to_clothes(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pickup.sync_address(instance)
+
+
+@receiver(pre_delete, sender=Address)
+def clear_deleted_address_from_clothes(sender, instance, **kwargs):
+    pickup.clear_address(instance)
+
+
+@receiver(post_save, sender=SellerProfile)
+def sync_profile_to_clothes(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pickup.sync_seller(instance.user_id, instance.pickup_address)
+
+
+# ---------------- IMAGE VARIANTS ---------------- #
+# Built once the upload's transaction commits, so the request that saved
+# the cloth never holds its transaction open across image encoding.
+# Registered before the cache versions below, so the card cache is bumped
+# after the new variant widths are stored.
+
+@receiver(pre_save, sender=Cloth)
+def note_image_upload(sender, instance, raw=False, **kwargs):
+    # An uploaded file stays uncommitted until the field saves it
+    instance._image_uploaded = not raw and not instance.image._committed
+
+
+@receiver(post_save, sender=Cloth)
+def build_image_variants(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(instance, "_image_uploaded", False):
+        return
+    instance._image_uploaded = False
+
+    def build():
+        try:
+            widths = thumbnails.build_variants(instance.image)
+        except OSError:
+            logger.warning("Could not build image variants for cloth %s", instance.id,
+                           exc_info=True)
+            widths = []
+
+        instance.image_variants = widths
+        Cloth.objects.filter(id=instance.id).update(image_variants=widths)
+
+    transaction.on_commit(build)
+
+
+# ---------------- CATALOG CACHE VERSIONS ---------------- #
+# `catalog` versions whole catalog pages and facet counts; `cloth:<id>`
+# versions the rendered card of a single cloth. Both move when the write's
+# transaction commits.
+
+@receiver(post_save, sender=Cloth)
+@receiver(post_delete, sender=Cloth)
+def invalidate_cloth(sender, instance, **kwargs):
+    bump_on_commit([facets.CATALOG, cloth_namespace(instance.id)])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Address)
+@receiver(post_save, sender=SellerProfile)
+def invalidate_catalog(sender, **kwargs):
+    bump_on_commit([facets.CATALOG])
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category_cards(sender, instance, created, **kwargs):
+    if not created:
+        bump_on_commit(
+            cloth_namespace(cloth_id)
+            for cloth_id in instance.clothes.values_list("id", flat=True)
+        )
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_deleted_category(sender, instance, **kwargs):
+    bump_on_commit([facets.CATALOG, *(
+        cloth_namespace(cloth_id)
+        for cloth_id in getattr(instance, "_deleted_cloth_ids", [])
+    )])
+
+
+@receiver(m2m_changed, sender=Cloth.categories.through)
+def invalidate_catalog_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        cloth_ids = [instance.id]
+    elif action == "post_clear":
+        cloth_ids = getattr(instance, "_cleared_cloth_ids", [])
+    else:
+        cloth_ids = pk_set or []
+
+    bump_on_commit([facets.CATALOG, *(cloth_namespace(cloth_id) for cloth_id in cloth_ids)])
@@ -0,0 +1,152 @@
+"""
+Monthly seller statements.
+
+The main process streams the month's rentals ordered by seller with
+`.iterator()` and hands each seller's rows, as plain tuples, to a process
+pool. Workers only run ReportLab and never touch the database. Each PDF is
+written to a temporary file and renamed into place, so a crashed run never
+leaves a half-written statement behind.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import date, datetime, time
+from decimal import Decimal
+from io import BytesIO
+from itertools import groupby
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, TableStyle
+
+from .files import write_atomic
+from .receipts import receipt_styles
+
+
+STATEMENT_DIR = "statements"
+
+COLUMNS = ["Order", "Item", "Buyer", "Qty", "Period", "Days", "Status", "Payment", "Amount"]
+
+ROW_FIELDS = (
+    "id", "cloth__name", "buyer__first_name", "quantity", "start_date",
+    "end_date", "total_days", "status", "payment_status", "total_price",
+)
+
+
+def month_bounds(month):
+    """'2026-03' -> (date(2026, 3, 1), date(2026, 4, 1)). Raises ValueError."""
+    year, month_number = (int(part) for part in month.split("-"))
+    start = date(year, month_number, 1)
+    end = date(year + month_number // 12, month_number % 12 + 1, 1)
+    return start, end
+
+
+def statement_rentals(start, end):
+    """The month's paid, completed and cancelled rentals, seller by seller."""
+    from django.db.models import Q
+    from django.utils import timezone
+
+    from .models import RentRequest
+
+    # A datetime range, unlike __date, can use an index on created_at
+    since, until = (
+        timezone.make_aware(datetime.combine(day, time.min)) for day in (start, end)
+    )
+    return (
+        RentRequest.objects
+        .filter(created_at__gte=since, created_at__lt=until)
+        .filter(Q(status__in=["completed", "cancelled"]) | Q(payment_status="paid"))
+        .order_by("seller_id", "created_at", "id")
+        .values_list("seller_id", "seller__seller_profile__store_name",
+                     "seller__first_name", *ROW_FIELDS)
+    )
+
+
+def statement_jobs(start, end, output_dir, chunk_size=2000):
+    rows = statement_rentals(start, end).iterator(chunk_size=chunk_size)
+
+    for (seller_id, store_name, first_name), seller_rows in groupby(
+        rows, key=lambda row: row[:3]
+    ):
+        yield {
+            "seller_id": seller_id,
+            "seller": store_name or first_name,
+            "month": start.strftime("%B %Y"),
+            "path": os.path.join(output_dir, f"seller_{seller_id}.pdf"),
+            "rows": [row[3:] for row in seller_rows],
+        }
+
+
+# ---------------- RENDERING (worker processes) ---------------- #
+
+TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ("FONTSIZE", (0, 0), (-1, -1), 8),
+    ("ALIGN", (-1, 0), (-1, -1), "RIGHT"),
+    ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+])
+
+
+def render_statement(job):
+    styles = receipt_styles()
+    received = Decimal(0)
+    data = [COLUMNS]
+
+    for (rent_id, cloth, buyer, quantity, start_date, end_date,
+         total_days, status, payment_status, total_price) in job["rows"]:
+        if payment_status == "paid":
+            received += total_price
+        data.append([
+            f"RENT{rent_id}", cloth[:30], buyer, quantity,
+            f"{start_date} – {end_date}", total_days,
+            status.title(), payment_status.title(), f"{total_price}",
+        ])
+    data.append(["", "", "", "", "", "", "", "Received", f"{received}"])
+
+    table = LongTable(data, repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+
+    buffer = BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4, invariant=1,
+                      title=f"Rentify statement {job['month']}").build([
+        Paragraph("<b>RENTIFY – MONTHLY STATEMENT</b>", styles["Title"]),
+        Paragraph(f"<b>Seller:</b> {escape(job['seller'])}", styles["Normal"]),
+        Paragraph(f"<b>Month:</b> {job['month']}", styles["Normal"]),
+        Spacer(1, 12),
+        table,
+    ])
+
+    write_atomic(job["path"], buffer.getvalue())
+    return len(job["rows"])
+
+
+# ---------------- DRIVER ---------------- #
+
+def generate(month, output_dir, workers=None):
+    """
+    Render every seller's statement for `month` into `output_dir`.
+    Returns (statements, rentals).
+    """
+    start, end = month_bounds(month)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    statements = rentals = 0
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for job in statement_jobs(start, end, output_dir):
+            # Keep only a few sellers in flight so memory stays flat
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rentals += future.result()
+                    statements += 1
+            pending.add(pool.submit(render_statement, job))
+
+        for future in pending:
+            rentals += future.result()
+            statements += 1
+
+    return statements, rentals
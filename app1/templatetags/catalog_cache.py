@@ -0,0 +1,51 @@
+from django import template
+from django.core.cache import cache
+
+from app1.caching import fragment_key, get_fragment, record_lookup
+
+
+register = template.Library()
+
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        parts = [var.resolve(context) for var in self.vary_on]
+        key = fragment_key(self.fragment_name, parts)
+
+        value = get_fragment(key)
+        record_lookup(self.fragment_name, value is not None)
+
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, FRAGMENT_TIMEOUT)
+
+        return value
+
+
+@register.tag("versioned_cache")
+def do_versioned_cache(parser, token):
+    """
+    {% versioned_cache "cloth_card" cloth.id cloth.cache_version %}...{% endversioned_cache %}
+
+    Like {% cache %}, but meant to be keyed on version counters (so entries
+    never need deleting) and it records hit/miss stats per fragment name.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least a fragment name."
+        )
+
+    nodelist = parser.parse(("endversioned_cache",))
+    parser.delete_first_token()
+
+    fragment_name = bits[1].strip("'\"")
+    vary_on = [parser.compile_filter(bit) for bit in bits[2:]]
+    return VersionedCacheNode(nodelist, fragment_name, vary_on)
@@ -1,3 +1,1751 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import random
+import re
+import stat
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from smtplib import SMTPException
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.messages import get_messages
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, close_old_connections, connection, connections, transaction
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import ResolverMatch
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image
+
+from . import (
+    analytics, availability, caching, checks, facets, files, geo, imports, inventory, otp, outbox,
+    receipts, routers, search, thumbnails,
+)
+from .models import (
+    Address, Category, Cloth, ClothImport, CustomUser, EmailOutbox, OtpCounter, RentRequest,
+    SellerDailyStat, SellerProfile, StockReservation,
+)
+from .middleware import QueryBudgetMiddleware, query_budget
+from .pagination import KeysetPaginator
+from .views import BULK_CONFLICT
+
+
+def run_concurrently(workers, target):
+    """Start `workers` threads on `target(index)` at once; return their results."""
+    barrier = threading.Barrier(workers)
+    results = [None] * workers
+
+    def run(index):
+        try:
+            barrier.wait()
+            results[index] = target(index)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def retry_locked(func, attempts=50):
+    """The shared-cache test database reports lock conflicts instead of waiting."""
+    for _ in range(attempts):
+        try:
+            return func()
+        except OperationalError as error:
+            if "locked" not in str(error):
+                raise
+            close_old_connections()
+            time.sleep(0.01)
+    raise AssertionError("database stayed locked")
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.buyer = CustomUser.objects.create_user(
+            username="buyer@rentify.test", email="buyer@rentify.test",
+            password="pw", is_buyer=True,
+        )
+        self.client.force_login(self.buyer)
+
+    def queries(self, func):
+        """{alias: statements} run by func()."""
+        counts = Counter()
+
+        def count(execute, sql, params, many, context):
+            counts[context["connection"].alias] += 1
+            return execute(sql, params, many, context)
+
+        with connections["default"].execute_wrapper(count), \
+                connections["replica"].execute_wrapper(count):
+            func()
+        return counts
+
+    def test_reads_use_the_replica_only_inside_use_replica(self):
+        self.assertEqual(self.queries(lambda: list(Cloth.objects.all())), {"default": 1})
+
+        with routers.use_replica():
+            self.assertEqual(self.queries(lambda: list(Cloth.objects.all())), {"replica": 1})
+            self.assertEqual(self.queries(lambda: list(Session.objects.all())), {"default": 1})
+            with transaction.atomic():
+                self.assertEqual(self.queries(lambda: list(Cloth.objects.all())), {"default": 1})
+
+    def test_writes_use_the_primary(self):
+        with routers.use_replica():
+            counts = self.queries(lambda: Category.objects.create(name="Sarees", slug="sarees"))
+        self.assertEqual(set(counts), {"default"})
+
+    def test_only_real_writes_pin_the_session(self):
+        dashboard = lambda: self.client.get("/buyer/dashboard/")
+
+        # The first visit creates the buyer profile, a real write
+        self.queries(dashboard)
+        self.assertIn(routers.PIN_SESSION_KEY, self.client.session)
+        self.assertNotIn("replica", self.queries(dashboard))
+
+        # get_or_create finding the profile writes nothing
+        later = time.time() + settings.REPLICA_STICKY_SECONDS + 1
+        with mock.patch("app1.routers.time.time", return_value=later):
+            for _ in range(2):
+                self.assertGreater(self.queries(dashboard)["replica"], 0)
+        self.assertLess(self.client.session[routers.PIN_SESSION_KEY], later)
+
+
+class RentRequestTransitionTests(TransactionTestCase):
+    """Two clicks racing on one request: exactly one transition may win."""
+
+    WORKERS = 16
+
+    def setUp(self):
+        self.seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+        self.buyer = CustomUser.objects.create_user(
+            username="buyer@rentify.test", email="buyer@rentify.test",
+            password="pw", is_buyer=True,
+        )
+        self.cloth = Cloth.objects.create(
+            seller=self.seller, name="Banarasi Saree", rent_per_day=500, quantity=5,
+        )
+
+    def make_request(self, **fields):
+        values = {
+            "buyer": self.buyer, "seller": self.seller, "cloth": self.cloth,
+            "quantity": 2, "start_date": date(2026, 1, 10), "end_date": date(2026, 1, 12),
+            "total_days": 3, "total_price": 3000,
+        }
+        values.update(fields)
+        return RentRequest.objects.create(**values)
+
+    def test_conflicting_transitions_have_one_winner(self):
+        rent = self.make_request()
+        actions = ["accept", "reject", "cancel"]
+
+        # Every racer saw the request while it was still pending
+        loaded = [RentRequest.objects.get(pk=rent.pk) for _ in range(self.WORKERS)]
+
+        def attempt(index):
+            action = actions[index % len(actions)]
+            return retry_locked(lambda: loaded[index].transition(action))
+
+        results = run_concurrently(self.WORKERS, attempt)
+
+        self.assertEqual(results.count(True), 1)
+        winner = actions[results.index(True) % len(actions)]
+        rent.refresh_from_db()
+        self.assertEqual(rent.status, RentRequest.TRANSITIONS[winner]["to"]["status"])
+
+    def test_transition_from_wrong_state_is_refused(self):
+        rent = self.make_request(status="completed", payment_status="paid")
+
+        for action in RentRequest.TRANSITIONS:
+            self.assertFalse(rent.transition(action))
+
+        rent.refresh_from_db()
+        self.assertEqual((rent.status, rent.payment_status), ("completed", "paid"))
+
+    def test_concurrent_accept_clicks_apply_side_effects_once(self):
+        rent = self.make_request()
+
+        # Log in up front so only the accept clicks race
+        clients = [self.client_class() for _ in range(self.WORKERS)]
+        for client in clients:
+            client.force_login(self.seller)
+
+        def click(index):
+            return retry_locked(lambda: clients[index].get(f"/seller/request/{rent.pk}/accept/"))
+
+        run_concurrently(self.WORKERS, click)
+
+        rent.refresh_from_db()
+        self.cloth.refresh_from_db()
+        self.assertEqual(rent.status, "approved")
+        self.assertEqual(self.cloth.quantity, 5)
+        self.assertEqual(StockReservation.objects.filter(released_at__isnull=True).count(), 1)
+        self.assertEqual(EmailOutbox.objects.filter(to=[self.buyer.email]).count(), 1)
+
+    def test_concurrent_accepts_never_oversell(self):
+        # Sixteen buyers each want 2 of the 5 units; only two can be approved
+        rents = [self.make_request() for _ in range(self.WORKERS)]
+
+        def accept(index):
+            def attempt():
+                try:
+                    with transaction.atomic():
+                        if not rents[index].transition("accept"):
+                            return False
+                        inventory.reserve(rents[index])
+                except inventory.InsufficientStock:
+                    return False
+                return True
+            return retry_locked(attempt)
+
+        results = run_concurrently(self.WORKERS, accept)
+
+        self.cloth.refresh_from_db()
+        self.assertEqual(sorted(results), [False] * (self.WORKERS - 2) + [True] * 2)
+        self.assertEqual(RentRequest.objects.filter(status="approved").count(), 2)
+        self.assertEqual(self.cloth.quantity, 5)
+        free = availability.free_units_map([self.cloth.pk], date(2026, 1, 10), date(2026, 1, 12))
+        self.assertEqual(free[self.cloth.pk], 1)
+        self.assertEqual(inventory.overbooked(), {})
+        call_command("reconcile_inventory", stdout=StringIO())
+
+    def test_reservations_only_block_their_own_dates(self):
+        # All five units are out next month; this month is still free
+        later = self.make_request(quantity=5, start_date=date(2026, 2, 10), end_date=date(2026, 2, 12))
+        self.assertTrue(later.transition("accept"))
+        inventory.reserve(later)
+
+        now = self.make_request(quantity=5)
+        self.assertTrue(now.transition("accept"))
+        inventory.reserve(now)
+
+        clash = self.make_request(quantity=1, start_date=date(2026, 2, 12), end_date=date(2026, 2, 14))
+        with self.assertRaises(inventory.InsufficientStock):
+            inventory.reserve(clash)
+        self.assertEqual(StockReservation.objects.filter(released_at__isnull=True).count(), 2)
+
+
+class QueryPlanTests(TestCase):
+    """
+    Every statement the hot views run, explained against a few thousand
+    clothes and requests: none may scan a large table without an index.
+    """
+
+    CLOTHES = 3000
+    REQUESTS = 12000
+
+    LARGE_TABLES = {
+        "app1_cloth", "app1_cloth_categories", "app1_rentrequest",
+        "app1_stockreservation", "app1_sellerdailystat", "app1_emailoutbox",
+    }
+
+    _ALIAS_RE = re.compile(r'"(\w+)" (?:AS )?"?([A-Z]\d+)"?')
+    # Whole tables, and whole indexes walked without a search term
+    _SCAN_RE = re.compile(r"^SCAN (\S+)( USING (?:COVERING )?INDEX \S+)?$")
+    _LIMIT_RE = re.compile(r"\bLIMIT \d+\s*$")
+
+    # Category facet counts read the whole filtered catalog once by design;
+    # app1.facets caches them per catalog version
+    _FACET_SQL = 'SELECT "app1_cloth_categories"."category_id" AS "category_id", COUNT('
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        cls.sellers = [
+            CustomUser.objects.create_user(
+                username=f"seller{index}@rentify.test", email=f"seller{index}@rentify.test",
+                password="pw", is_seller=True,
+            )
+            for index in range(10)
+        ]
+        cls.buyer = CustomUser.objects.create_user(
+            username="buyer@rentify.test", email="buyer@rentify.test",
+            password="pw", is_buyer=True,
+        )
+        buyers = [cls.buyer] + [
+            CustomUser.objects.create_user(
+                username=f"buyer{index}@rentify.test", email=f"buyer{index}@rentify.test",
+                password="pw", is_buyer=True,
+            )
+            for index in range(20)
+        ]
+        categories = Category.objects.bulk_create([
+            Category(name=name, slug=name.lower()) for name in ("Sarees", "Lehengas", "Gowns")
+        ])
+        cls.category = categories[0]
+
+        clothes = Cloth.objects.bulk_create([
+            Cloth(
+                seller=rng.choice(cls.sellers),
+                name=f"Silk saree {index}",
+                quantity=rng.randint(0, 4),
+                rent_per_day=Decimal(rng.randint(200, 3000)),
+                pickup_pincode=rng.choice(["411001", "400001", "110001"]),
+            )
+            for index in range(cls.CLOTHES)
+        ])
+        Through = Cloth.categories.through
+        Through.objects.bulk_create([
+            Through(cloth_id=cloth.id, category_id=rng.choice(categories).id)
+            for cloth in clothes
+        ])
+        cls.cloth = clothes[0]
+
+        start = date.today() + timedelta(days=1)
+        statuses = ["pending", "approved", "rejected", "completed", "cancelled"]
+        rents = RentRequest.objects.bulk_create([
+            RentRequest(
+                buyer=rng.choice(buyers),
+                seller=cloth.seller,
+                cloth=cloth,
+                quantity=1,
+                start_date=start + timedelta(days=offset),
+                end_date=start + timedelta(days=offset + 2),
+                total_days=3,
+                total_price=Decimal(600),
+                status=rng.choice(statuses),
+            )
+            for cloth, offset in (
+                (rng.choice(clothes), rng.randrange(60)) for _ in range(cls.REQUESTS)
+            )
+        ])
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                cloth_id=rent.cloth_id, rent_request=rent, quantity=1,
+                start_date=rent.start_date, end_date=rent.end_date,
+            )
+            for rent in rents if rent.status == "approved"
+        ])
+        cls.pending = next(
+            rent for rent in rents
+            if rent.status == "pending" and rent.seller_id == cls.sellers[0].id
+        )
+
+        search.rebuild_index()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def setUp(self):
+        cache.clear()
+
+    def capture(self, func):
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            func()
+        return statements
+
+    def full_scans(self, sql, params, allowed=()):
+        aliases = dict(
+            (alias, table) for table, alias in self._ALIAS_RE.findall(sql)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+
+        # An index walked in ORDER BY order under a LIMIT stops after one
+        # page (the keyset seek of page one); any other index walk is a scan
+        bounded = self._LIMIT_RE.search(sql) and not any(
+            "TEMP B-TREE FOR ORDER BY" in detail for detail in plan
+        )
+
+        scans = []
+        for detail in plan:
+            match = self._SCAN_RE.match(detail)
+            if match and not (match.group(2) and bounded):
+                table = aliases.get(match.group(1), match.group(1))
+                if table in self.LARGE_TABLES and table not in allowed:
+                    scans.append(detail)
+        return scans, plan
+
+    def assertIndexed(self, user, path, presorted=False):
+        """
+        No statement `path` runs may scan a large table; with `presorted`,
+        none may sort its rows either (pages must come off an index).
+        """
+        if user:
+            self.client.force_login(user)
+        else:
+            self.client.logout()
+
+        statements = self.capture(lambda: self.client.get(path))
+        self.assertTrue(statements, path)
+
+        for sql, params in statements:
+            if not sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+            allowed = ("app1_cloth",) if sql.startswith(self._FACET_SQL) else ()
+            scans, plan = self.full_scans(sql, params, allowed)
+            self.assertFalse(
+                scans, f"{path} scans {scans}:\n{sql}\n" + "\n".join(plan)
+            )
+            if presorted:
+                self.assertNotIn(
+                    "USE TEMP B-TREE FOR ORDER BY", plan,
+                    f"{path} sorts:\n{sql}\n" + "\n".join(plan)
+                )
+
+    def test_catalog(self):
+        window = f"start={date.today() + timedelta(days=3)}&end={date.today() + timedelta(days=5)}"
+        for query in ("", "q=silk", "pincode=411001", f"category={self.category.id}", window):
+            with self.subTest(query=query):
+                self.assertIndexed(self.buyer, f"/buyer/rent/?{query}")
+                self.assertIndexed(None, f"/buyer/rent/?{query}")
+
+    def test_cloth_pages(self):
+        self.assertIndexed(self.buyer, f"/cloth/{self.cloth.id}/")
+        self.assertIndexed(self.buyer, f"/cloth/{self.cloth.id}/rent/")
+
+    def test_dashboards(self):
+        for status in ("all", "pending", "approved"):
+            with self.subTest(status=status):
+                self.assertIndexed(self.buyer, f"/buyer/dashboard/?status={status}", presorted=True)
+                self.assertIndexed(self.sellers[0], f"/seller/dashboard/?status={status}", presorted=True)
+        self.assertIndexed(self.sellers[0], "/seller/list/")
+
+    def test_api(self):
+        self.assertIndexed(None, "/api/clothes/")
+        self.assertIndexed(None, "/api/clothes/?pincode=411001")
+        self.assertIndexed(None, f"/api/clothes/{self.cloth.id}/")
+
+    def test_seller_actions(self):
+        self.assertIndexed(self.sellers[0], f"/seller/request/{self.pending.id}/accept/")
+
+    def test_monthly_statements(self):
+        from .statements import month_bounds, statement_rentals
+
+        queryset = statement_rentals(*month_bounds(date.today().strftime("%Y-%m")))
+        sql, params = queryset.query.sql_with_params()
+        scans, plan = self.full_scans(sql, params)
+        self.assertFalse(scans, "\n".join(plan))
+
+
+class BulkRentRequestTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+        self.buyers = [
+            CustomUser.objects.create_user(
+                username=f"buyer{index}@rentify.test", email=f"buyer{index}@rentify.test",
+                password="pw", is_buyer=True,
+            )
+            for index in range(2)
+        ]
+        self.cloth = Cloth.objects.create(
+            seller=self.seller, name="Banarasi Saree", rent_per_day=500, quantity=3,
+        )
+        self.client.force_login(self.seller)
+
+    def make_request(self, buyer, status="pending"):
+        start = date.today() + timedelta(days=10)
+        return RentRequest.objects.create(
+            buyer=buyer, seller=self.seller, cloth=self.cloth, quantity=1,
+            start_date=start, end_date=start + timedelta(days=2), total_days=3,
+            total_price=1500, status=status,
+        )
+
+    def bulk(self, action, rents):
+        return self.client.post("/seller/requests/bulk/", {
+            "action": action, "ids": [rent.id for rent in rents],
+        })
+
+    def statuses(self, rents):
+        return [RentRequest.objects.get(pk=rent.pk).status for rent in rents]
+
+    def test_accept_takes_the_oldest_that_fit_and_mails_each_buyer_once(self):
+        first, second = self.buyers
+        rents = [
+            self.make_request(first), self.make_request(first), self.make_request(second),
+            # Three units: the newest pending request no longer fits
+            self.make_request(second),
+            self.make_request(second, status="rejected"),
+        ]
+
+        response = self.bulk("accept", rents)
+
+        self.assertEqual(
+            [str(message) for message in get_messages(response.wsgi_request)],
+            ["3 requests updated.",
+             "2 requests were skipped (already updated or not enough units free on their dates)."],
+        )
+        self.assertEqual(
+            self.statuses(rents), ["approved", "approved", "approved", "pending", "rejected"]
+        )
+        self.assertEqual(StockReservation.objects.filter(released_at__isnull=True).count(), 3)
+        self.assertEqual(inventory.overbooked(), {})
+
+        emails = sorted(EmailOutbox.objects.values_list("to", "body"))
+        self.assertEqual([to for to, _ in emails], [[first.email], [second.email]])
+        self.assertEqual(emails[0][1].count("Banarasi Saree"), 2)
+
+    def test_failed_reservation_rolls_back_every_request(self):
+        rents = [self.make_request(buyer) for buyer in self.buyers]
+        fitting = inventory.fitting
+
+        # Another seller session booked the units between the view's check
+        # and its reservation: reserve_many refuses, under its row locks
+        def stale_check(rents, quantities=None):
+            return list(rents) if quantities is None else fitting(rents, quantities)
+
+        self.cloth.quantity = 1
+        self.cloth.save()
+        with mock.patch.object(inventory, "fitting", side_effect=stale_check):
+            response = self.bulk("accept", rents)
+
+        self.assertEqual(last_message(response), BULK_CONFLICT)
+        self.assertEqual(self.statuses(rents), ["pending", "pending"])
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    def test_nothing_pending_updates_nothing(self):
+        rents = [self.make_request(buyer, status="rejected") for buyer in self.buyers]
+
+        response = self.bulk("accept", rents)
+
+        self.assertEqual(last_message(response), "None of the selected requests could be updated.")
+        self.assertEqual(self.statuses(rents), ["rejected", "rejected"])
+        self.assertFalse(EmailOutbox.objects.exists())
+
+
+def last_message(response):
+    # The reset pages do not render messages, so they pile up in the cookie
+    return [str(message) for message in get_messages(response.wsgi_request)][-1]
+
+
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        self.entry = outbox.queue_email("Request accepted", "See you soon.", ["buyer@rentify.test"])
+
+    def failing_connection(self):
+        connection = mock.Mock()
+        connection.send_messages.side_effect = SMTPException("421 try again later")
+        return connection
+
+    def test_sends_due_messages_once(self):
+        connection = mail.get_connection("django.core.mail.backends.locmem.EmailBackend")
+        self.assertEqual(outbox.drain(connection=connection), (1, 0))
+        self.assertEqual(outbox.drain(connection=connection), (0, 0))
+
+        self.entry.refresh_from_db()
+        self.assertEqual((self.entry.status, self.entry.attempts), ("sent", 1))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failures_back_off_then_dead_letter(self):
+        connection = self.failing_connection()
+        for attempt in range(1, outbox.MAX_ATTEMPTS + 1):
+            before = timezone.now()
+            dies = attempt == outbox.MAX_ATTEMPTS
+            with self.assertLogs("app1.outbox", "ERROR") if dies else nullcontext():
+                self.assertEqual(outbox.drain(connection=connection), (0, 1))
+            self.entry.refresh_from_db()
+            self.assertEqual(self.entry.attempts, attempt)
+            self.assertIsNone(self.entry.lease_until)
+            self.assertIn("SMTPException", self.entry.last_error)
+            if attempt < outbox.MAX_ATTEMPTS:
+                self.assertEqual(self.entry.status, "pending")
+                self.assertGreaterEqual(self.entry.next_attempt_at, before + outbox.backoff(attempt))
+                # Not due again until the backoff has passed
+                self.assertEqual(outbox.drain(connection=connection), (0, 0))
+                EmailOutbox.objects.filter(pk=self.entry.pk).update(next_attempt_at=before)
+
+        self.assertEqual(self.entry.status, "dead")
+        self.assertEqual(outbox.drain(connection=connection), (0, 0))
+        self.assertEqual(
+            [outbox.backoff(attempt).seconds // 60 for attempt in range(1, 5)], [1, 2, 4, 8]
+        )
+
+    def test_message_claimed_by_another_worker_is_skipped(self):
+        entries = outbox.due_messages(10)
+        # Another worker claims it between our SELECT and our send
+        self.assertTrue(outbox.claim(outbox.due_messages(10)[0], timezone.now()))
+
+        connection = mock.Mock()
+        self.assertEqual(outbox.send_batch(entries, connection), (0, 0))
+        connection.send_messages.assert_not_called()
+
+    def test_outcome_is_not_written_over_a_takeover(self):
+        for error in (None, SMTPException("421 try again later")):
+            with self.subTest(error=error):
+                EmailOutbox.objects.filter(pk=self.entry.pk).update(
+                    status="pending", attempts=0, lease_until=None, last_error="",
+                )
+                later = timezone.now() + outbox.LEASE * 2
+
+                def slow_send(messages):
+                    # Our lease runs out mid-send and another worker claims the row
+                    outbox.release_expired(now=later)
+                    self.assertTrue(outbox.claim(EmailOutbox.objects.get(pk=self.entry.pk), later))
+                    if error:
+                        raise error
+
+                connection = mock.Mock()
+                connection.send_messages.side_effect = slow_send
+                with self.assertLogs("app1.outbox", "WARNING"):
+                    outbox.send_batch(outbox.due_messages(10), connection)
+
+                self.entry.refresh_from_db()
+                self.assertEqual(
+                    (self.entry.status, self.entry.attempts, self.entry.last_error),
+                    ("sending", 0, ""),
+                )
+                self.assertEqual(self.entry.lease_until, later + outbox.LEASE)
+
+    def test_expired_lease_is_retried(self):
+        EmailOutbox.objects.filter(pk=self.entry.pk).update(
+            status="sending", lease_until=timezone.now() - timedelta(seconds=1)
+        )
+        connection = mail.get_connection("django.core.mail.backends.locmem.EmailBackend")
+        self.assertEqual(outbox.drain(connection=connection), (1, 0))
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+        # Equal timestamps in pairs, so the id tie-breaker matters
+        created = timezone.now()
+        self.clothes = Cloth.objects.bulk_create([
+            Cloth(seller=seller, name=f"Silk saree {index}", rent_per_day=500, quantity=1)
+            for index in range(7)
+        ])
+        for index, cloth in enumerate(self.clothes):
+            Cloth.objects.filter(pk=cloth.pk).update(
+                created_at=created - timedelta(minutes=index // 2)
+            )
+        self.paginator = KeysetPaginator(per_page=3)
+        self.expected = list(
+            Cloth.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def ids(self, page):
+        return [cloth.id for cloth in page]
+
+    def test_pages_forward_and_back(self):
+        pages, cursor = [], None
+        while True:
+            page = self.paginator.paginate(Cloth.objects.all(), cursor)
+            pages.append(self.ids(page))
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual([len(ids) for ids in pages], [3, 3, 1])
+
+        back = self.paginator.paginate(Cloth.objects.all(), page.prev_cursor)
+        self.assertEqual(self.ids(back), pages[1])
+        first = self.paginator.paginate(Cloth.objects.all(), back.prev_cursor)
+        self.assertEqual(self.ids(first), pages[0])
+        self.assertFalse(first.has_previous)
+
+    def test_invalid_cursors_serve_the_first_page(self):
+        def token(data):
+            raw = json.dumps(data).encode()
+            return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+        cursors = [
+            "not a cursor",
+            token(["next", 1]),
+            token({"d": "next", "v": "2026-01-01"}),
+            token({"d": "next", "v": {"0": 1, "1": 2}}),
+            token({"d": "next", "v": ["yesterday", 5]}),
+            token({"d": "next", "v": ["2026-01-01T00:00:00+00:00", "five"]}),
+            token({"d": "prev", "v": [None, 5]}),
+            token({"d": "next", "v": [[1], {"a": 2}]}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                page = self.paginator.paginate(Cloth.objects.all(), cursor)
+                self.assertEqual(self.ids(page), self.expected[:3])
+                self.assertEqual(self.client.get("/buyer/rent/", {"cursor": cursor}).status_code, 200)
+                self.assertEqual(self.client.get("/api/clothes/", {"cursor": cursor}).status_code, 200)
+
+
+class ImportQueueTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+        Category.objects.create(name="Sarees", slug="sarees")
+        self.seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+        self.client.force_login(self.seller)
+
+    def upload(self, rows=None):
+        image = BytesIO()
+        Image.new("RGB", (40, 60), "red").save(image, "JPEG")
+        rows = rows or (
+            "name,description,quantity,rent_per_day,condition,categories,image\n"
+            "Silk saree,,2,500,new,Sarees,saree.jpg\n"
+            "Broken row,,-1,500,new,Sarees,saree.jpg\n"
+        )
+        return self.client.post("/seller/import/", {
+            "rows": SimpleUploadedFile("clothes.csv", rows.encode()),
+            "images": [SimpleUploadedFile("saree.jpg", image.getvalue())],
+        })
+
+    def test_upload_is_queued_then_run_by_the_command(self):
+        self.upload()
+        job = ClothImport.objects.get()
+        self.assertEqual(job.status, "pending")
+        self.assertFalse(Cloth.objects.exists())
+
+        call_command("run_imports", workers=1, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows, job.created, job.error_count), ("done", 2, 1, 1))
+        self.assertEqual(Cloth.objects.get().name, "Silk saree")
+        self.assertFalse(default_storage.exists(job.directory))
+
+        # The seller hears about it once
+        response = self.client.get("/seller/list/")
+        self.assertIn("Imported 1 of 2 clothes.", [str(m) for m in get_messages(response.wsgi_request)])
+        job.refresh_from_db()
+        self.assertTrue(job.reported)
+
+        # A job another worker already took is left alone
+        self.assertIsNone(imports.run_import(job))
+
+    def three_rows(self):
+        return "name,description,quantity,rent_per_day,condition,categories,image\n" + "".join(
+            f"Saree {index},,1,500,new,Sarees,saree.jpg\n" for index in range(3)
+        )
+
+    def second_batch_raises(self, error):
+        write_batch = imports._write_batch
+        calls = []
+
+        def write(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise error
+            return write_batch(*args)
+
+        return mock.patch.object(imports, "_write_batch", side_effect=write)
+
+    def test_failed_import_reports_the_batches_it_committed(self):
+        self.upload(self.three_rows())
+        job = ClothImport.objects.get()
+
+        with self.second_batch_raises(OSError("disk full")):
+            self.assertIsNone(imports.run_import(job, workers=1, batch_size=1))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows, job.created), ("failed", 1, 1))
+        self.assertEqual(Cloth.objects.count(), 1)
+        response = self.client.get("/seller/list/")
+        self.assertIn(
+            "An import stopped after 1 clothes from its first 1 rows were imported; "
+            "upload only the rows after those.",
+            [str(m) for m in get_messages(response.wsgi_request)],
+        )
+
+    def test_job_of_a_dead_worker_is_resumed(self):
+        self.upload(self.three_rows())
+        job = ClothImport.objects.get()
+
+        # The worker is killed while writing its second batch
+        with self.second_batch_raises(KeyboardInterrupt), self.assertRaises(KeyboardInterrupt):
+            imports.run_import(job, workers=1, batch_size=1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created), ("running", 1))
+        # Still leased: no other worker takes it yet
+        self.assertFalse(imports.runnable_jobs().exists())
+
+        ClothImport.objects.filter(pk=job.pk).update(lease_until=timezone.now() - timedelta(seconds=1))
+        call_command("run_imports", workers=1, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows, job.created, job.error_count), ("done", 3, 3, 0))
+        self.assertEqual(
+            sorted(Cloth.objects.values_list("name", flat=True)), ["Saree 0", "Saree 1", "Saree 2"]
+        )
+
+    def test_images_stored_under_another_name_are_found(self):
+        directory = "0" * 32
+        default_storage.save(f"imports/{directory}/images/saree.jpg", BytesIO(b"not an image"))
+
+        with mock.patch("app1.imports.uuid.uuid4", return_value=mock.Mock(hex=directory)):
+            self.upload()
+        job = ClothImport.objects.get()
+        self.assertNotEqual(job.image_names["saree.jpg"], "saree.jpg")
+
+        call_command("run_imports", workers=1, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.created, job.error_count), ("done", 1, 1))
+        with default_storage.open(Cloth.objects.get().image.name) as handle, Image.open(handle) as image:
+            self.assertEqual(image.size, (40, 60))
+
+
+class ImageVariantTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+        self.seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+
+    def test_original_loses_its_metadata(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotated: stored landscape, shown portrait
+        exif[0x8825] = {2: (18.0, 31.0, 12.0), 4: (73.0, 51.0, 24.0)}
+        photo = BytesIO()
+        Image.new("RGB", (60, 40), "red").save(photo, "JPEG", exif=exif, xmp=b"<x:xmpmeta/>")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cloth = Cloth.objects.create(
+                seller=self.seller, name="Banarasi Saree", rent_per_day=500,
+                image=SimpleUploadedFile("saree.jpg", photo.getvalue()),
+            )
+
+        with default_storage.open(cloth.image.name) as handle, Image.open(handle) as original:
+            self.assertEqual(original.size, (40, 60))
+            self.assertEqual(dict(original.getexif()), {})
+            self.assertNotIn("xmp", original.info)
+        self.assertEqual(Cloth.objects.get().image_variants, [40])
+
+    def test_variants_are_built_after_commit_without_removing_files(self):
+        photo = BytesIO()
+        Image.new("RGB", (400, 300), "blue").save(photo, "PNG")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            cloth = Cloth.objects.create(
+                seller=self.seller, name="Silk Lehenga", rent_per_day=800,
+                image=SimpleUploadedFile("lehenga.png", photo.getvalue()),
+            )
+        self.assertEqual(Cloth.objects.get().image_variants, [])
+
+        with mock.patch.object(default_storage, "delete") as delete:
+            for callback in callbacks:
+                callback()
+            # Rebuilding replaces the variants in place
+            thumbnails.build_variants(cloth.image)
+
+        delete.assert_not_called()
+        self.assertEqual(Cloth.objects.get().image_variants, [160, 320, 400])
+        for width in (160, 320, 400):
+            self.assertTrue(default_storage.exists(thumbnails.variant_name(cloth.image.name, width)))
+
+    def test_rewritten_files_keep_the_upload_permissions(self):
+        umask = os.umask(0o027)
+        self.addCleanup(os.umask, umask)
+        files._default_mode.cache_clear()
+        self.addCleanup(files._default_mode.cache_clear)
+
+        exif = Image.Exif()
+        exif[0x0112] = 1
+        photo = BytesIO()
+        Image.new("RGB", (200, 100), "green").save(photo, "JPEG", exif=exif)
+
+        # None falls back to 0666 less the umask, as FileSystemStorage does
+        for permissions, expected in ((0o644, 0o644), (0o604, 0o604), (None, 0o640)):
+            with self.subTest(permissions=permissions), \
+                    override_settings(FILE_UPLOAD_PERMISSIONS=permissions):
+                with self.captureOnCommitCallbacks(execute=True):
+                    cloth = Cloth.objects.create(
+                        seller=self.seller, name="Cotton Kurta", rent_per_day=300,
+                        image=SimpleUploadedFile("kurta.jpg", photo.getvalue()),
+                    )
+
+                names = [cloth.image.name] + [
+                    thumbnails.variant_name(cloth.image.name, width) for width in (160, 200)
+                ]
+                for name in names:
+                    mode = stat.S_IMODE(os.stat(default_storage.path(name)).st_mode)
+                    self.assertEqual(mode, expected, name)
+
+
+class SearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+
+    def make_cloth(self, name, description=""):
+        return Cloth.objects.create(
+            seller=self.seller, name=name, description=description,
+            rent_per_day=500, quantity=1,
+        )
+
+    def matches(self, text):
+        return list(
+            search.search_clothes(Cloth.objects.all(), text)
+            .order_by("search_rank", "id")
+            .values_list("name", flat=True)
+        )
+
+    def test_punctuation_only_query_lists_nothing(self):
+        self.make_cloth("Silk Saree")
+        for text in ("-", "!!", '"'):
+            with self.subTest(text=text):
+                self.assertEqual(self.matches(text), [])
+                response = self.client.get("/buyer/rent/", {"q": text})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context["clothes"]), [])
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.make_cloth("Velvet Gown", "Pairs well with a silk dupatta, festive wear")
+        self.make_cloth("Silk Saree", "Banarasi weave")
+        self.assertEqual(self.matches("silk"), ["Silk Saree", "Velvet Gown"])
+        # Prefix terms, AND-ed
+        self.assertEqual(self.matches("sil banar"), ["Silk Saree"])
+
+    def test_index_follows_cloth_saves_and_deletes(self):
+        cloth = self.make_cloth("Silk Saree")
+        self.assertEqual(self.matches("silk"), ["Silk Saree"])
+
+        cloth.name = "Velvet Gown"
+        cloth.save()
+        self.assertEqual(self.matches("silk"), [])
+        self.assertEqual(self.matches("velvet"), ["Velvet Gown"])
+
+        category = Category.objects.create(name="Bridal", slug="bridal")
+        cloth.categories.add(category)
+        self.assertEqual(self.matches("bridal"), ["Velvet Gown"])
+
+        cloth.delete()
+        self.assertEqual(self.matches("velvet"), [])
+
+
+class AnalyticsTests(TestCase):
+
+    FIELDS = ("seller_id", "cloth_id", "day", "requests", "approved_requests",
+              "approved_units", "rented_unit_days", "revenue", "paid_amount")
+
+    def test_rebuild_matches_the_incremental_hooks(self):
+        rng = random.Random(14)
+        sellers = [
+            CustomUser.objects.create_user(
+                username=f"seller{index}@rentify.test", email=f"seller{index}@rentify.test",
+                password="pw", is_seller=True,
+            )
+            for index in range(2)
+        ]
+        buyer = CustomUser.objects.create_user(
+            username="buyer@rentify.test", email="buyer@rentify.test",
+            password="pw", is_buyer=True,
+        )
+        clothes = [
+            Cloth.objects.create(seller=seller, name=f"Saree {index}", rent_per_day=499.5, quantity=9)
+            for index, seller in enumerate(sellers * 2)
+        ]
+
+        rents = []
+        for index in range(60):
+            cloth = rng.choice(clothes)
+            days = rng.randint(1, 5)
+            rent = RentRequest.objects.create(
+                buyer=buyer, seller=cloth.seller, cloth=cloth, quantity=rng.randint(1, 3),
+                start_date=date(2026, 5, 1), end_date=date(2026, 5, days), total_days=days,
+                total_price=Decimal("499.50") * days,
+            )
+            created_at = timezone.now() - timedelta(days=index % 4, hours=rng.randint(0, 23))
+            RentRequest.objects.filter(pk=rent.pk).update(created_at=created_at)
+            rent.created_at = created_at
+            analytics.record_request(rent)
+            rents.append(rent)
+
+        # The same lifecycle the views drive, hook for hook
+        approved = rents[:40]
+        RentRequest.objects.filter(pk__in=[rent.pk for rent in approved]).update(status="approved")
+        for rent in approved:
+            rent.status = "approved"
+        analytics.record_approvals(approved[:30])
+        for rent in approved[30:]:
+            analytics.record_approval(rent)
+
+        for rent in approved[:10]:
+            RentRequest.objects.filter(pk=rent.pk).update(payment_status="paid", status="completed")
+            rent.payment_status, rent.status = "paid", "completed"
+            analytics.record_payment(rent)
+
+        for rent in approved[10:15]:
+            RentRequest.objects.filter(pk=rent.pk).update(status="cancelled")
+            analytics.record_approval(rent, sign=-1)
+
+        for rent in approved[:3] + rents[50:53]:
+            analytics.record_deletion(rent)
+            rent.delete()
+
+        incremental = set(SellerDailyStat.objects.values_list(*self.FIELDS))
+        analytics.rebuild()
+        rebuilt = set(SellerDailyStat.objects.values_list(*self.FIELDS))
+
+        # Rows whose requests were all deleted stay behind as zeros
+        empty = {row for row in incremental if not any(row[3:])}
+        self.assertEqual(incremental - empty, rebuilt)
+        self.assertGreater(len(rebuilt), 8)
+
+
+class ReceiptTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+        seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True, first_name="Asha",
+        )
+        self.buyer = CustomUser.objects.create_user(
+            username="buyer@rentify.test", email="buyer@rentify.test",
+            password="pw", is_buyer=True, first_name="Ravi",
+        )
+        cloth = Cloth.objects.create(seller=seller, name="Banarasi Saree", rent_per_day=500, quantity=1)
+        self.rent = RentRequest.objects.create(
+            buyer=self.buyer, seller=seller, cloth=cloth, quantity=1,
+            start_date=date(2026, 5, 1), end_date=date(2026, 5, 3), total_days=3,
+            total_price=1500, status="approved", payment_status="paid",
+        )
+
+    def stored_files(self):
+        return default_storage.listdir(receipts.RECEIPT_DIR)[1]
+
+    def test_download_renders_once_then_serves_the_stored_file(self):
+        self.client.force_login(self.buyer)
+
+        for _ in range(2):
+            response = self.client.get(f"/request/{self.rent.id}/receipt/")
+            self.assertEqual(response["Content-Type"], "application/pdf")
+            self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+            response.close()
+
+        self.assertEqual(len(self.stored_files()), 1)
+
+    def test_racing_renders_leave_one_file(self):
+        fields = receipts.receipt_fields(self.rent)
+
+        # Every racer sees no file yet and renders it
+        with mock.patch.object(default_storage, "exists", return_value=False):
+            paths = run_concurrently(8, lambda index: receipts.stored_receipt(fields))
+
+        self.assertEqual(set(paths), {receipts.receipt_path(fields)})
+        self.assertEqual(self.stored_files(), [receipts.receipt_path(fields).split("/")[-1]])
+        with default_storage.open(paths[0], "rb") as handle:
+            self.assertEqual(handle.read(), receipts.render_receipt(fields))
+
+
+class StatementTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.output_dir = media.name
+
+        self.sellers = [
+            CustomUser.objects.create_user(
+                username=f"{name.lower()}@rentify.test", email=f"{name.lower()}@rentify.test",
+                password="pw", is_seller=True, first_name=name,
+            )
+            for name in ("Asha", "Meera")
+        ]
+        SellerProfile.objects.create(user=self.sellers[0], store_name="Saree House")
+        buyer = CustomUser.objects.create_user(
+            username="buyer@rentify.test", email="buyer@rentify.test",
+            password="pw", is_buyer=True, first_name="Ravi",
+        )
+
+        rows = [
+            # seller, day of March, status, payment, price
+            (0, 3, "approved", "paid", 1500),
+            (0, 9, "completed", "pending", 900),
+            (0, 12, "pending", "pending", 700),
+            (0, 31, "cancelled", "pending", 400),
+            (1, 5, "completed", "paid", 2000),
+            (1, 1, "approved", "pending", 800),
+        ]
+        self.rents = []
+        for seller, day, status, payment, price in rows + [(0, 32, "completed", "paid", 600)]:
+            cloth = Cloth.objects.create(
+                seller=self.sellers[seller], name=f"Saree {day}", rent_per_day=100, quantity=1,
+            )
+            rent = RentRequest.objects.create(
+                buyer=buyer, seller=self.sellers[seller], cloth=cloth, quantity=1,
+                start_date=date(2026, 3, 1), end_date=date(2026, 3, 3), total_days=3,
+                total_price=price, status=status, payment_status=payment,
+            )
+            # Day 32 is April 1st, outside the month
+            created = timezone.make_aware(datetime(2026, 3, 1, 10)) + timedelta(days=day - 1)
+            RentRequest.objects.filter(pk=rent.pk).update(created_at=created)
+            self.rents.append(rent)
+
+    def test_jobs_hold_each_sellers_statement_rows_in_order(self):
+        from . import statements
+
+        jobs = list(statements.statement_jobs(*statements.month_bounds("2026-03"), self.output_dir))
+
+        self.assertEqual(
+            [(job["seller_id"], job["seller"], job["month"]) for job in jobs],
+            [(self.sellers[0].id, "Saree House", "March 2026"), (self.sellers[1].id, "Meera", "March 2026")],
+        )
+        # Paid, completed or cancelled rentals of the month, oldest first
+        self.assertEqual(
+            [[row[0] for row in job["rows"]] for job in jobs],
+            [[self.rents[0].id, self.rents[1].id, self.rents[3].id], [self.rents[4].id]],
+        )
+        self.assertEqual(jobs[0]["rows"][0][1:3], ("Saree 3", "Ravi"))
+
+    def test_statement_totals_the_payments_received(self):
+        from . import statements
+
+        job = next(statements.statement_jobs(*statements.month_bounds("2026-03"), self.output_dir))
+        with mock.patch.object(statements, "LongTable", wraps=statements.LongTable) as table:
+            self.assertEqual(statements.render_statement(job), 3)
+
+        data = table.call_args.args[0]
+        self.assertEqual(data[0], statements.COLUMNS)
+        self.assertEqual(data[1][0], f"RENT{self.rents[0].id}")
+        self.assertEqual(data[-1][-2:], ["Received", "1500.00"])
+        with open(job["path"], "rb") as handle:
+            self.assertTrue(handle.read().startswith(b"%PDF"))
+
+    def test_command_writes_one_pdf_per_seller(self):
+        out = StringIO()
+        call_command("generate_statements", "--month", "2026-03", "--workers", "1",
+                     "--output-dir", self.output_dir, stdout=out)
+
+        self.assertIn("Wrote 2 statements (4 rentals)", out.getvalue())
+        self.assertEqual(
+            sorted(path.name for path in Path(self.output_dir).iterdir()),
+            sorted(f"seller_{seller.id}.pdf" for seller in self.sellers),
+        )
+
+
+class CatalogCacheTests(TestCase):
+
+    CLOTHES = 5
+
+    def setUp(self):
+        cache.clear()
+        seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+        Cloth.objects.bulk_create([
+            Cloth(seller=seller, name=f"Silk saree {index}", rent_per_day=500, quantity=1)
+            for index in range(self.CLOTHES)
+        ])
+
+    def test_card_lookups_are_batched(self):
+        self.client.get("/buyer/rent/")
+        self.assertEqual(caching.lookup_stats(["cloth_card"])["cloth_card"]["misses"], self.CLOTHES)
+
+        # A new page, built from the cached cards
+        caching.bump_version(facets.CATALOG)
+        with mock.patch.object(cache, "get_many", wraps=cache.get_many) as get_many, \
+                mock.patch.object(cache, "incr", wraps=cache.incr) as incr:
+            self.client.get("/buyer/rent/")
+
+        self.assertEqual(caching.lookup_stats(["cloth_card"])["cloth_card"]["hits"], self.CLOTHES)
+        # Card versions, then the cards themselves
+        self.assertEqual(get_many.call_count, 2)
+        # One page miss, one batch of card hits
+        self.assertEqual(incr.call_count, 2)
+
+    def test_versions_move_when_the_write_commits(self):
+        cloth = Cloth.objects.first()
+        namespaces = [facets.CATALOG, caching.cloth_namespace(cloth.id)]
+        before = caching.get_versions(namespaces)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cloth.name = "Silk lehenga"
+            cloth.save()
+            # A reader inside the open transaction still caches under the old version
+            self.assertEqual(caching.get_versions(namespaces), before)
+
+        after = caching.get_versions(namespaces)
+        self.assertEqual(after, {namespace: version + 1 for namespace, version in before.items()})
+
+    def test_detail_etag_follows_pickup_address_edits(self):
+        cloth = Cloth.objects.first()
+        address = Address.objects.create(
+            building="1 Main Road", city="Pune", state="Maharashtra",
+            taluka="Haveli", pincode="411001",
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            SellerProfile.objects.create(user=cloth.seller, store_name="Saree House", pickup_address=address)
+
+        url = f"/api/clothes/{cloth.id}/"
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            address.city, address.pincode = "Mumbai", "400001"
+            address.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["pickup"]["city"], "Mumbai")
+        self.assertEqual(response.json()["pickup"]["pincode"], "400001")
+
+    def test_last_modified_follows_deletes_and_category_changes(self):
+        cloth = Cloth.objects.first()
+        category = Category.objects.create(name="Sarees", slug="sarees")
+        seen = self.client.get("/api/clothes/")["Last-Modified"]
+
+        for hours, change in ((1, lambda: cloth.categories.add(category)), (2, cloth.delete)):
+            changed_at = timezone.now() + timedelta(hours=hours)
+            with mock.patch("app1.caching.timezone.now", return_value=changed_at), \
+                    self.captureOnCommitCallbacks(execute=True):
+                change()
+
+            response = self.client.get("/api/clothes/", HTTP_IF_MODIFIED_SINCE=seen)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Last-Modified"], http_date(changed_at.timestamp()))
+            seen = response["Last-Modified"]
+
+        response = self.client.get("/api/clothes/", HTTP_IF_MODIFIED_SINCE=seen)
+        self.assertEqual(response.status_code, 304)
+
+
+class FacetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+        self.sarees = Category.objects.create(name="Sarees", slug="sarees")
+        self.lehengas = Category.objects.create(name="Lehengas", slug="lehengas")
+        self.clothes = Cloth.objects.bulk_create([
+            Cloth(seller=seller, name=name, rent_per_day=500, quantity=1, pickup_pincode=pincode)
+            for name, pincode in (
+                ("Silk saree", "411001"), ("Cotton saree", "400001"), ("Bridal lehenga", "411001"),
+            )
+        ])
+        silk, cotton, bridal = self.clothes
+        silk.categories.add(self.sarees, self.lehengas)
+        cotton.categories.add(self.sarees)
+        bridal.categories.add(self.lehengas)
+
+    def counts(self, pincode=""):
+        clothes = Cloth.objects.all()
+        if pincode:
+            clothes = clothes.filter(pickup_pincode=pincode)
+        return facets.category_counts(clothes, {"pincode": pincode})
+
+    def test_counts_per_category_under_the_filters(self):
+        self.assertEqual(self.counts(), {self.sarees.id: 2, self.lehengas.id: 2})
+        self.assertEqual(self.counts("411001"), {self.sarees.id: 1, self.lehengas.id: 2})
+        self.assertEqual(self.counts("110001"), {})
+
+    def test_counts_are_cached_until_the_catalog_changes(self):
+        self.assertEqual(self.counts(), {self.sarees.id: 2, self.lehengas.id: 2})
+
+        # Through-table rows written behind the signals' back stay unseen
+        Cloth.categories.through.objects.create(cloth=self.clothes[1], category=self.lehengas)
+        self.assertEqual(self.counts(), {self.sarees.id: 2, self.lehengas.id: 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.clothes[2].categories.add(self.sarees)
+        self.assertEqual(self.counts(), {self.sarees.id: 3, self.lehengas.id: 3})
+
+
+class PickupLocationTests(TestCase):
+
+    def setUp(self):
+        self.seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+        self.address = Address.objects.create(
+            building="1 Main Road", city="Pune", state="Maharashtra",
+            taluka="Haveli", pincode="411001",
+        )
+        self.profile = SellerProfile.objects.create(
+            user=self.seller, store_name="Saree House", pickup_address=self.address,
+        )
+        self.cloth = Cloth.objects.create(
+            seller=self.seller, name="Silk saree", rent_per_day=500, quantity=1,
+        )
+
+    def pickup(self):
+        self.cloth.refresh_from_db()
+        return (self.cloth.pickup_pincode, self.cloth.pickup_city, self.cloth.pickup_state)
+
+    def verify(self):
+        out = StringIO()
+        call_command("sync_pickup_locations", "--verify", stdout=out)
+        return out.getvalue()
+
+    def test_copies_follow_address_and_profile_changes(self):
+        self.assertEqual(self.pickup(), ("411001", "Pune", "Maharashtra"))
+
+        self.address.city, self.address.pincode = "Pimpri", "411018"
+        self.address.save()
+        self.assertEqual(self.pickup(), ("411018", "Pimpri", "Maharashtra"))
+
+        self.profile.pickup_address = Address.objects.create(
+            building="2 Marine Drive", city="Mumbai", state="Maharashtra",
+            taluka="Mumbai City", pincode="400001",
+        )
+        self.profile.save()
+        self.assertEqual(self.pickup(), ("400001", "Mumbai", "Maharashtra"))
+
+        self.profile.pickup_address.delete()
+        self.assertEqual(self.pickup(), ("", "", ""))
+        self.assertIn("in sync", self.verify())
+
+    def test_verify_reports_copies_a_bulk_update_left_stale(self):
+        self.assertIn("in sync", self.verify())
+
+        # Queryset updates skip the signals
+        Address.objects.filter(pk=self.address.pk).update(city="Pimpri")
+        with self.assertRaisesMessage(CommandError, "1 clothes have stale pickup locations"):
+            self.verify()
+
+        call_command("sync_pickup_locations", stdout=StringIO())
+        self.assertEqual(self.pickup(), ("411001", "Pimpri", "Maharashtra"))
+        self.assertIn("in sync", self.verify())
+
+
+class GeoTests(TestCase):
+
+    DIRECTORY = (
+        "circlename,regionname,divisionname,officename,pincode,officetype,"
+        "delivery,district,statename,latitude,longitude\n"
+        "Maharashtra Circle,Pune Region,Pune City East,Pune H.O,411001,H.O,Delivery,PUNE,MAHARASHTRA,18.52,73.85\n"
+        "Maharashtra Circle,Pune Region,Pune City East,Camp S.O,411001,S.O,Delivery,PUNE,MAHARASHTRA,18.50,73.87\n"
+        "Maharashtra Circle,Pune Region,Pune City West,Aundh S.O,411007,S.O,Delivery,PUNE,MAHARASHTRA,18.56,73.81\n"
+        "Maharashtra Circle,Pune Region,Pune City West,Baner B.O,411045,B.O,Delivery,PUNE,MAHARASHTRA,NA,NA\n"
+    )
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False)
+        directory.write(self.DIRECTORY)
+        directory.close()
+        settings_override = override_settings(PINCODE_FILE=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        geo.pincode_table.cache_clear()
+        self.addCleanup(geo.pincode_table.cache_clear)
+
+    def make_seller(self, name, pincode):
+        seller = CustomUser.objects.create_user(
+            username=f"{name}@rentify.test", email=f"{name}@rentify.test",
+            password="pw", is_seller=True,
+        )
+        address = Address.objects.create(
+            building="1 Main Road", city="Pune", state="Maharashtra",
+            taluka="Haveli", pincode=pincode,
+        )
+        SellerProfile.objects.create(user=seller, store_name=name, pickup_address=address)
+        return seller
+
+    def test_directory_offices_are_averaged_per_pincode(self):
+        self.assertEqual(geo.locate("411001"), (18.51, 73.86))
+        # No coordinates for 411045 itself: the district's mean is used
+        self.assertEqual(geo.locate("411045"), (18.526667, 73.843333))
+        self.assertIsNone(geo.locate("110001"))
+
+    def test_bundled_table_covers_six_digit_pincodes(self):
+        # The four-office fixture is flagged as too small
+        self.assertEqual([warning.id for warning in checks.check_pincode_file(None)], ["app1.W001"])
+
+        bundled = Path(geo.__file__).parent / "data" / "pincodes.csv"
+        with override_settings(PINCODE_FILE=bundled):
+            geo.pincode_table.cache_clear()
+            self.assertEqual(checks.check_pincode_file(None), [])
+            for pincode, (lat, lon) in {
+                "110001": (28.63, 77.22), "400001": (19.07, 72.88), "560001": (12.97, 77.59),
+            }.items():
+                with self.subTest(pincode=pincode):
+                    self.assertLess(geo.haversine_km(lat, lon, *geo.locate(pincode)), 5)
+        geo.pincode_table.cache_clear()
+
+    def test_distance_sort_uses_stored_coordinates(self):
+        near = self.make_seller("near", "411001")
+        far = self.make_seller("far", "411007")
+        for seller in (far, near):
+            Cloth.objects.create(seller=seller, name=f"{seller.username} saree", rent_per_day=500)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/buyer/rent/", {"pincode": "411001", "radius": "25", "sort": "distance"}
+            )
+
+        clothes = list(response.context["clothes"])
+        self.assertEqual([cloth.seller_id for cloth in clothes], [near.id, far.id])
+        # Distances come from the seller index, not a join per cloth
+        catalog = [query["sql"] for query in queries if '"app1_cloth"."pickup_pincode"' in query["sql"]]
+        self.assertTrue(catalog)
+        for sql in catalog:
+            self.assertNotIn('"app1_address"', sql)
+        self.assertEqual(clothes[0].distance_km, 0)
+        self.assertAlmostEqual(clothes[1].distance_km, geo.haversine_km(18.51, 73.86, 18.56, 73.81), places=2)
+
+    def test_non_finite_radius_uses_the_default(self):
+        near = self.make_seller("near", "411001")
+        Cloth.objects.create(seller=near, name="Silk saree", rent_per_day=500)
+
+        for radius in ("nan", "inf", "-inf", "ten"):
+            with self.subTest(radius=radius):
+                response = self.client.get("/buyer/rent/", {"pincode": "411001", "radius": radius})
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, "Silk saree")
+
+    def test_street_coordinates_survive_resaving_the_address(self):
+        seller = self.make_seller("seller", "411001")
+        address = seller.seller_profile.pickup_address
+        Address.objects.filter(pk=address.pk).update(latitude=18.5310, longitude=73.8470)
+
+        address.refresh_from_db()
+        address.building = "2 Main Road"
+        address.save()
+        address.refresh_from_db()
+        self.assertEqual((address.latitude, address.longitude), (18.5310, 73.8470))
+
+        address.pincode = "411007"
+        address.save()
+        self.assertEqual((address.latitude, address.longitude), (18.56, 73.81))
+
+
+@query_budget(max_queries=3)
+def budgeted_view(request):
+    def body():
+        for _ in range(4):
+            yield str(Category.objects.count())
+
+    return StreamingHttpResponse(body())
+
+
+class QueryBudgetTests(TestCase):
+
+    def setUp(self):
+        reports = tempfile.TemporaryDirectory()
+        self.addCleanup(reports.cleanup)
+        self.report_path = f"{reports.name}/query_budget.jsonl"
+        self.enterContext(override_settings(QUERY_BUDGET={
+            "ENABLED": True, "REPORT_PATH": self.report_path, "MAX_QUERIES": 50,
+        }))
+
+    def run_view(self, view):
+        def get_response(request):
+            request.resolver_match = ResolverMatch(view, (), {}, url_name="budgeted")
+            return view(request)
+
+        request = RequestFactory().get("/budgeted/")
+        response = QueryBudgetMiddleware(get_response)(request)
+        b"".join(response.streaming_content)
+        with open(self.report_path, encoding="utf-8") as fh:
+            return [json.loads(line) for line in fh]
+
+    def test_streamed_queries_count_against_the_view_budget(self):
+        with self.assertLogs("app1.middleware", "WARNING"):
+            [entry] = self.run_view(budgeted_view)
+
+        # Every query ran while the body was streamed
+        self.assertEqual(entry["queries"], 4)
+        self.assertEqual(entry["max_queries"], 3)
+        self.assertTrue(entry["over_budget"])
+
+
+class AvailabilityTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seller = CustomUser.objects.create_user(
+            username="seller@rentify.test", email="seller@rentify.test",
+            password="pw", is_seller=True,
+        )
+        self.buyer = CustomUser.objects.create_user(
+            username="buyer@rentify.test", email="buyer@rentify.test",
+            password="pw", is_buyer=True,
+        )
+        self.cloth = Cloth.objects.create(
+            seller=self.seller, name="Banarasi Saree", rent_per_day=500, quantity=2,
+        )
+
+    def book(self, start, end, quantity=2):
+        rent = RentRequest.objects.create(
+            buyer=self.buyer, seller=self.seller, cloth=self.cloth, quantity=quantity,
+            start_date=start, end_date=end, total_days=(end - start).days + 1,
+            total_price=1000, status="approved",
+        )
+        # The catalog version is bumped once the reservation commits
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.reserve(rent)
+
+    def test_peak_counts_overlaps_only(self):
+        day = date(2026, 3, 1)
+        bookings = [
+            (1, day, day + timedelta(days=2), 1),
+            # Starts the day after the first one ends: never stacks with it
+            (1, day + timedelta(days=3), day + timedelta(days=4), 1),
+            (1, day + timedelta(days=4), day + timedelta(days=9), 2),
+            (1, day - timedelta(days=30), day - timedelta(days=20), 5),
+        ]
+        peaks = availability.peak_occupancy(bookings, day, day + timedelta(days=5))
+        self.assertEqual(peaks, {1: 3})
+
+        far = availability.peak_occupancy(bookings, date(1, 1, 1), date(9999, 12, 31))
+        self.assertEqual(far, {1: 5})
+
+    def test_catalog_lists_what_is_free_today(self):
+        today = date.today()
+        self.assertContains(self.client.get("/buyer/rent/"), "Banarasi Saree")
+
+        self.book(today + timedelta(days=30), today + timedelta(days=32))
+        self.assertContains(self.client.get("/buyer/rent/"), "Banarasi Saree")
+
+        self.book(today, today + timedelta(days=2))
+        self.assertNotContains(self.client.get("/buyer/rent/"), "Banarasi Saree")
+
+    def test_api_and_seller_list_agree_with_the_catalog(self):
+        today = date.today()
+
+        def api_listing():
+            return json.loads(b"".join(self.client.get("/api/clothes/").streaming_content))["results"]
+
+        def detail_available():
+            return self.client.get(f"/api/clothes/{self.cloth.id}/").json()["available"]
+
+        self.client.force_login(self.seller)
+
+        # Booked next month only: free today
+        self.book(today + timedelta(days=30), today + timedelta(days=32))
+        self.assertEqual([(row["id"], row["available"]) for row in api_listing()], [(self.cloth.id, True)])
+        self.assertTrue(detail_available())
+        self.assertNotContains(self.client.get("/seller/list/"), "Unavailable")
+
+        # Every unit out today
+        self.book(today, today + timedelta(days=2))
+        self.assertEqual(api_listing(), [])
+        self.assertFalse(detail_available())
+        self.assertContains(self.client.get("/seller/list/"), "Unavailable")
+        self.assertFalse(Cloth.objects.get().is_available)
+
+    def test_windows_are_capped(self):
+        response = self.client.get("/buyer/rent/?start=2026-01-01&end=9999-12-31")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(last_message(response), "Rentals can span at most 90 days.")
+
+        self.client.force_login(self.buyer)
+        start = date.today() + timedelta(days=1)
+        response = self.client.post(f"/cloth/{self.cloth.id}/rent/", {
+            "quantity": 1,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=availability.MAX_WINDOW_DAYS)).isoformat(),
+        })
+        self.assertEqual(last_message(response), "Rentals can span at most 90 days.")
+        self.assertFalse(RentRequest.objects.exists())
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class PasswordResetTests(TestCase):
+
+    def setUp(self):
+        caches["otp"].clear()
+        self.user = CustomUser.objects.create_user(
+            username="reset@rentify.test", email="reset@rentify.test", password="old-pass-123",
+        )
+
+    def request_code(self):
+        response = self.client.post("/forgot-password/", {"email": self.user.email})
+        code = re.search(r"\d{6}", mail.outbox[-1].body).group()
+        return response["Location"], parse_qs(urlsplit(response["Location"]).query)["token"][0], code
+
+    def test_reset_flow_writes_no_session(self):
+        verify_url, token, code = self.request_code()
+        self.assertEqual(self.client.get(verify_url).status_code, 200)
+
+        wrong = "000000" if code != "000000" else "111111"
+        self.client.post("/verify-otp/", {"token": token, "otp": wrong})
+        response = self.client.post("/verify-otp/", {"token": token, "otp": code})
+        reset_url = response["Location"]
+        reset_token = parse_qs(urlsplit(reset_url).query)["token"][0]
+
+        data = {"token": reset_token, "password": "new-pass-456", "confirm": "new-pass-456"}
+        self.assertRedirects(self.client.post("/reset-password/", data), "/login/",
+                             fetch_redirect_response=False)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("new-pass-456"))
+        self.assertFalse(Session.objects.exists())
+
+        # Codes and reset tokens work once
+        response = self.client.post("/verify-otp/", {"token": token, "otp": code})
+        self.assertEqual(last_message(response), "Invalid OTP")
+        self.assertRedirects(self.client.post("/reset-password/", data), "/forgot-password/",
+                             fetch_redirect_response=False)
+
+    def test_code_burns_after_max_attempts(self):
+        _, token, code = self.request_code()
+        wrong = "000000" if code != "000000" else "111111"
+        for _ in range(otp.OTP_MAX_ATTEMPTS):
+            self.client.post("/verify-otp/", {"token": token, "otp": wrong})
+
+        response = self.client.post("/verify-otp/", {"token": token, "otp": code})
+        self.assertEqual(last_message(response), "Invalid OTP")
+
+    def test_sends_are_rate_limited_per_email(self):
+        for _ in range(otp.EMAIL_RATE_LIMIT):
+            self.client.post("/forgot-password/", {"email": self.user.email})
+        response = self.client.post("/forgot-password/", {"email": self.user.email})
+        self.assertEqual(last_message(response), "Too many OTP requests. Please try again later.")
+        self.assertEqual(len(mail.outbox), otp.EMAIL_RATE_LIMIT)
+
+    def test_otp_cache_must_be_shared(self):
+        self.assertEqual(checks.check_otp_cache(None), [])
+
+        local = {**settings.CACHES, "otp": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=local):
+            self.assertEqual([error.id for error in checks.check_otp_cache(None)], ["app1.E002"])
+
+
+class OtpCounterTests(TransactionTestCase):
+    """Parallel guesses and sends racing on one counter."""
+
+    WORKERS = 16
+
+    def test_parallel_hits_never_pass_the_limit(self):
+        counts = run_concurrently(
+            self.WORKERS, lambda index: retry_locked(lambda: otp._count("guesses", 5, 60))
+        )
+        self.assertEqual(sorted(count for count in counts if count is not None), [1, 2, 3, 4, 5])
+        self.assertEqual(OtpCounter.objects.get(key="guesses").count, 5)
+
+    def test_parallel_wrong_guesses_burn_the_code(self):
+        email = "reset@rentify.test"
+        code = otp.issue(email)
+        wrong = "000000" if code != "000000" else "111111"
+
+        with mock.patch("app1.otp.constant_time_compare", wraps=otp.constant_time_compare) as compare:
+            run_concurrently(self.WORKERS, lambda index: retry_locked(lambda: otp.verify(email, wrong)))
+
+        self.assertLessEqual(compare.call_count, otp.OTP_MAX_ATTEMPTS)
+        self.assertFalse(otp.verify(email, code))
+
+    def test_window_starts_over_once_expired(self):
+        self.assertEqual([otp._count("sends", 2, 60) for _ in range(3)], [1, 2, None])
+        OtpCounter.objects.update(expires_at=timezone.now())
+        self.assertEqual(otp._count("sends", 2, 60), 1)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class EmailLoginTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username="shopper", email="shopper@rentify.test", password="pass-123", is_buyer=True,
+        )
+
+    def test_login_is_one_query(self):
+        with self.assertNumQueries(1):
+            user = authenticate(email="shopper@rentify.test", password="pass-123")
+        self.assertEqual(user, self.user)
+
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(email="shopper@rentify.test", password="wrong"))
+        with self.assertNumQueries(1), mock.patch.object(
+            CustomUser, "set_password", autospec=True
+        ) as dummy_hash:
+            self.assertIsNone(authenticate(email="nobody@rentify.test", password="pass-123"))
+        dummy_hash.assert_called_once()
+
+    def test_login_view(self):
+        response = self.client.post("/login/", {"email": "shopper@rentify.test", "password": "pass-123"})
+        self.assertRedirects(response, "/buyer/dashboard/", fetch_redirect_response=False)
+
+    def test_hash_cost_upgrades_on_login(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertEqual(authenticate(email="shopper@rentify.test", password="pass-123"), self.user)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$2000$"))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class SeedingTests(TestCase):
+
+    def seed(self):
+        out = StringIO()
+        call_command("seed_rentify", "--sellers", "3", "--buyers", "6", "--clothes", "40",
+                     "--requests", "120", stdout=out)
+        return out.getvalue()
+
+    def table_counts(self):
+        return {
+            model.__name__: model.objects.count()
+            for model in (CustomUser, SellerProfile, Address, Cloth, RentRequest, StockReservation)
+        }
+
+    def test_seeds_the_requested_rows_once(self):
+        self.assertIn("rent_requests  120", self.seed())
+
+        counts = self.table_counts()
+        approved = RentRequest.objects.filter(status="approved").count()
+        self.assertEqual(counts, {
+            "CustomUser": 9, "SellerProfile": 3, "Address": 9, "Cloth": 40,
+            "RentRequest": 120, "StockReservation": approved,
+        })
+        self.assertTrue(Cloth.categories.through.objects.filter(cloth__isnull=False).exists())
+
+        # What the signals would have maintained is consistent
+        from . import pickup
+
+        self.assertFalse(pickup.stale_clothes().exists())
+        self.assertTrue(all(
+            len(pincode) == 6 for pincode in Address.objects.values_list("pincode", flat=True)
+        ))
+        window = (date.today(), date.today() + timedelta(days=60))
+        peaks = availability.peak_occupancy(availability.overlapping_bookings(*window), *window)
+        for cloth_id, quantity in Cloth.objects.values_list("id", "quantity"):
+            self.assertLessEqual(peaks.get(cloth_id, 0), quantity)
+
+        # A second run is refused and leaves the data alone
+        with self.assertRaisesMessage(CommandError, "already been seeded"):
+            self.seed()
+        self.assertEqual(self.table_counts(), counts)
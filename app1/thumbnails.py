@@ -0,0 +1,118 @@
+"""
+Responsive WebP derivatives of cloth images.
+
+Each original `clothes/<name>.<ext>` gets `clothes/<name>.w<width>.webp`
+siblings, one per entry in VARIANT_WIDTHS (capped at the original width).
+The EXIF orientation is applied to the pixels and the metadata itself is
+dropped, so phone photos neither render sideways nor leak GPS tags. The
+original is rewritten the same way when it carries EXIF or XMP, since it
+is still served to whoever opens the full-size image. Every file is
+replaced atomically, so a reader never finds it missing and a crash never
+loses the photo.
+"""
+import io
+import os
+
+from PIL import Image, ImageOps
+
+from .files import store_atomic
+
+
+VARIANT_WIDTHS = (160, 320, 640, 960)
+
+# Width the catalog cards are rendered at; the `src` fallback for browsers
+# that ignore srcset.
+CARD_WIDTH = 320
+
+WEBP_QUALITY = 80
+
+# Originals re-encoded to drop their metadata; other formats are left alone
+REWRITTEN_FORMATS = {"JPEG": "JPEG", "MPO": "JPEG", "PNG": "PNG", "WEBP": "WEBP"}
+ORIGINAL_QUALITY = 95
+
+_ORIENTATION = 0x0112
+_METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp")
+
+
+def variant_name(image_name, width):
+    root, _ = os.path.splitext(image_name)
+    return f"{root}.w{width}.webp"
+
+
+def _prepare(original):
+    image = ImageOps.exif_transpose(original)
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def _encode(image, icc_profile=None):
+    buffer = io.BytesIO()
+    options = {"quality": WEBP_QUALITY, "method": 4}
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    image.save(buffer, "WEBP", **options)
+    return buffer.getvalue()
+
+
+def _strip_original(original, icc_profile):
+    """
+    The original re-encoded upright and without EXIF/XMP, or None when it
+    has no metadata to drop. Pillow writes no metadata it is not handed.
+    """
+    target = REWRITTEN_FORMATS.get(original.format)
+    if target is None or not (
+        original.getexif() or any(key in original.info for key in _METADATA_KEYS)
+    ):
+        return None
+
+    options = {"icc_profile": icc_profile} if icc_profile else {}
+    if original.format == "JPEG" and original.getexif().get(_ORIENTATION, 1) == 1:
+        # Already upright: reuse its quantization tables instead of re-compressing
+        image, options["quality"] = original, "keep"
+    else:
+        image = ImageOps.exif_transpose(original)
+        if target != "PNG":
+            options["quality"] = ORIGINAL_QUALITY
+
+    buffer = io.BytesIO()
+    image.save(buffer, target, **options)
+    return buffer.getvalue()
+
+
+def build_variants(image_field, widths=VARIANT_WIDTHS):
+    """
+    Write every WebP variant of `image_field` next to it and return the
+    widths that now exist, smallest first. The original itself loses its
+    EXIF/XMP metadata in place.
+
+    Raises OSError when the original is missing or not an image.
+    """
+    storage = image_field.storage
+
+    with storage.open(image_field.name, "rb") as handle:
+        with Image.open(handle) as original:
+            icc_profile = original.info.get("icc_profile")
+            stripped = _strip_original(original, icc_profile)
+            image = _prepare(original)
+            image.load()
+
+    if stripped is not None:
+        store_atomic(storage, image_field.name, stripped)
+
+    targets = sorted({min(width, image.width) for width in widths})
+
+    for width in targets:
+        if width == image.width:
+            resized = image
+        else:
+            height = max(round(image.height * width / image.width), 1)
+            resized = image.resize(
+                (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+            )
+
+        store_atomic(storage, variant_name(image_field.name, width), _encode(resized, icc_profile))
+
+    return targets
+
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path("", views.home, name="home"),
@@ -18,6 +18,7 @@ path("buyer/request/<int:pk>/cancel/", views.cancel_rent_request, name="cancel_r
     # Seller
     path("seller/dashboard/", views.seller_dashboard, name="seller_dashboard"),
     path("seller/list/", views.list_clothes, name="list_clothes"),
+    path("seller/import/", views.import_clothes, name="import_clothes"),
 
     path("cloth/edit/<int:cloth_id>/", views.edit_cloth, name="edit_cloth"),
     path("cloth/delete/<int:cloth_id>/", views.delete_cloth, name="delete_cloth"),
@@ -38,8 +39,14 @@ path("seller/request/<int:pk>/accept/", views.accept_rent_request, name="accept_
 path("seller/request/<int:pk>/reject/", views.reject_rent_request, name="reject_rent"),
 path("seller/request/<int:pk>/paid/", views.mark_payment_paid, name="mark_paid"),
 path("seller/request/<int:pk>/complete/", views.complete_rental, name="complete_rental"),
+path("seller/requests/bulk/", views.bulk_rent_requests, name="bulk_rent_requests"),
+path("request/<int:pk>/receipt/", views.download_receipt, name="download_receipt"),
 
     path("forgot-password/", views.forgot_password, name="forgot_password"),
     path("verify-otp/", views.verify_otp, name="verify_otp"),
     path("reset-password/", views.reset_password, name="reset_password"),
+
+    # Read-only JSON API
+    path("api/clothes/", api.cloth_list_api, name="api_cloth_list"),
+    path("api/clothes/<int:cloth_id>/", api.cloth_detail_api, name="api_cloth_detail"),
 ]
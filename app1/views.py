@@ -2,20 +2,16 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib import messages
 from django.contrib.auth.hashers import make_password
 from django.core.mail import send_mail
-from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.core.mail import EmailMessage
-from django.conf import settings
-from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-
-
+from django.db import transaction
+from django.core.files.storage import default_storage
+from django.db.models import Count, Q
+from django.http import FileResponse
+from app1 import analytics, imports, inventory, outbox, receipts
+from app1.routers import replica_reads
 from app1.forms import AddressForm, BuyerProfileForm, BuyerUserForm, ClothForm, RentRequestForm, SellerProfileForm
-from .models import Cloth, RentRequest
+from .models import Cloth, ClothImport, RentRequest
 
 from .models import CustomUser, Address, BuyerProfile, SellerProfile,  Cloth, Category
 
@@ -44,17 +40,8 @@ def login_view(request):
         email = request.POST.get("email")
         password = request.POST.get("password")
 
-        try:
-            user_obj = CustomUser.objects.get(email=email)
-        except CustomUser.DoesNotExist:
-            messages.error(request, "Invalid email or password")
-            return redirect("login")
-
-        user = authenticate(
-            request,
-            username=user_obj.username,
-            password=password
-        )
+        # One lookup by email; unknown emails cost as much as wrong passwords
+        user = authenticate(request, email=email, password=password)
 
         if user is not None:
             login(request, user)
@@ -104,55 +91,56 @@ def register(request):
             messages.error(request, "Invalid role selected")
             return redirect("register")
 
-        # ---------------- CREATE USER ----------------
-        user = CustomUser.objects.create(
-            username=email,
-            email=email,
-            first_name=full_name,
-            contact=contact,
-            password=make_password(password)
-        )
-
-        # ---------------- ROLE FLAGS ----------------
-        if role == "buyer":
-            user.is_buyer = True
-        else:
-            user.is_seller = True
-
-        user.save()
-
-        # ---------------- CREATE ADDRESS ----------------
-        address = Address.objects.create(
-            building=building,
-            taluka=taluka,
-            city=city,
-            state=state,
-            pincode=pincode
-        )
-
-        # ---------------- CREATE PROFILE ----------------
-        if role == "buyer":
-            BuyerProfile.objects.create(
-                user=user,
-                address=address
+        with transaction.atomic():
+            # ---------------- CREATE USER ----------------
+            user = CustomUser.objects.create(
+                username=email,
+                email=email,
+                first_name=full_name,
+                contact=contact,
+                password=make_password(password)
             )
 
-        elif role == "seller":
+            # ---------------- ROLE FLAGS ----------------
+            if role == "buyer":
+                user.is_buyer = True
+            else:
+                user.is_seller = True
 
-            # 🔥 DEFAULT STORE NAME FOR INDIVIDUAL SELLERS
-            if not store_name:
-                store_name = f"{full_name} Wardrobe"
+            user.save()
 
-            SellerProfile.objects.create(
-                user=user,
-                store_name=store_name,
-                pickup_address=address
+            # ---------------- CREATE ADDRESS ----------------
+            address = Address.objects.create(
+                building=building,
+                taluka=taluka,
+                city=city,
+                state=state,
+                pincode=pincode
             )
 
-        # ---------------- SEND EMAIL ----------------
-        send_mail(
-            subject="Welcome to Rentify 🎉",
-            message=f"""
+            # ---------------- CREATE PROFILE ----------------
+            if role == "buyer":
+                BuyerProfile.objects.create(
+                    user=user,
+                    address=address
+                )
+
+            elif role == "seller":
+
+                # 🔥 DEFAULT STORE NAME FOR INDIVIDUAL SELLERS
+                if not store_name:
+                    store_name = f"{full_name} Wardrobe"
+
+                SellerProfile.objects.create(
+                    user=user,
+                    store_name=store_name,
+                    pickup_address=address
+                )
+
+            # ---------------- QUEUE EMAIL ----------------
+            outbox.queue_email(
+                subject="Welcome to Rentify 🎉",
+                body=f"""
 Hello {full_name},
 
 Welcome to Rentify!
@@ -163,10 +151,8 @@ You can now login and start using Rentify.
 
 – Team Rentify
             """,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=False
-        )
+                to=[email],
+            )
 
         messages.success(request, "Registration successful. Please login.")
         return redirect("login")
@@ -184,7 +170,39 @@ def logout_view(request):
 from datetime import date, datetime
 from .models import Address
 
+DASHBOARD_PAGE_SIZE = 12
+
+
+def _request_tabs(request, requests):
+    """
+    Status tabs for a dashboard: per-status counts from one GROUP BY, and a
+    keyset page of the selected tab served by the (user, status, created_at)
+    indexes, or the (user, created_at, id) ones for "all".
+    """
+    counts = dict(
+        requests.order_by()
+        .values_list("status")
+        .annotate(total=Count("id"))
+    )
+
+    tabs = [{"status": "all", "label": "All", "count": sum(counts.values())}]
+    tabs += [
+        {"status": status, "label": label, "count": counts.get(status, 0)}
+        for status, label in RentRequest.STATUS_CHOICES
+    ]
+
+    selected = request.GET.get("status", "all")
+    if selected not in {tab["status"] for tab in tabs}:
+        selected = "all"
+    if selected != "all":
+        requests = requests.filter(status=selected)
+
+    paginator = KeysetPaginator(ordering=("-created_at", "-id"), per_page=DASHBOARD_PAGE_SIZE)
+    return tabs, selected, paginator.paginate(requests, request.GET.get("cursor"))
+
+
 @login_required
+@replica_reads
 def buyer_dashboard(request):
 
     if not request.user.is_buyer:
@@ -207,11 +225,11 @@ def buyer_dashboard(request):
             f"{address.pincode}"
         )
 
-    requests = (
+    tabs, selected_status, requests = _request_tabs(
+        request,
         RentRequest.objects
         .filter(buyer=request.user)
         .select_related("cloth")
-        .order_by("-created_at")
     )
 
     user_form = BuyerUserForm(instance=request.user)
@@ -259,6 +277,8 @@ def buyer_dashboard(request):
 
     return render(request, "buyer_dashboard.html", {
         "requests": requests,
+        "tabs": tabs,
+        "selected_status": selected_status,
         "user_form": user_form,
         "buyer_profile": buyer_profile,
         "address": buyer_profile.address,
@@ -285,12 +305,14 @@ def edit_rent_request(request, pk):
         start_date = date.fromisoformat(request.POST.get("start_date"))
         end_date = date.fromisoformat(request.POST.get("end_date"))
 
-        if quantity <= 0 or quantity > cloth.quantity:
-            messages.error(request, "Quantity not available.")
+        error = availability.window_error(start_date, end_date)
+        if error:
+            messages.error(request, error)
             return redirect("buyer_dashboard")
 
-        if end_date < start_date:
-            messages.error(request, "Invalid date range.")
+        free = availability.free_units(cloth, start_date, end_date)
+        if quantity <= 0 or quantity > free:
+            messages.error(request, "Quantity not available.")
             return redirect("buyer_dashboard")
 
         total_days = (end_date - start_date).days + 1
@@ -323,7 +345,9 @@ def delete_rent_request(request, pk):
         return redirect("home")
 
     if request.method == "POST":
-        rent.delete()
+        with transaction.atomic():
+            analytics.record_deletion(rent)
+            rent.delete()
         messages.success(request, "Rental request deleted.")
 
     return redirect(request.META.get("HTTP_REFERER", "home"))
@@ -339,19 +363,17 @@ def cancel_rent_request(request, pk):
         buyer=request.user
     )
 
-    if rent.status not in ["pending", "approved"]:
-        messages.error(request, "Cannot cancel this request.")
-        return redirect("buyer_dashboard")
-
-    cloth = rent.cloth
+    was_approved = rent.status == "approved"
 
-    # 🔁 RESTOCK ONLY IF ALREADY APPROVED
-    if rent.status == "approved":
-        cloth.quantity += rent.quantity
-        cloth.save()
+    with transaction.atomic():
+        if not rent.transition("cancel"):
+            messages.error(request, "Cannot cancel this request.")
+            return redirect("buyer_dashboard")
 
-    rent.status = "cancelled"
-    rent.save()
+        # 🔁 RESTOCK ONLY IF ALREADY APPROVED
+        if was_approved:
+            inventory.release(rent)
+            analytics.record_approval(rent, sign=-1)
 
     messages.success(request, "Rental request cancelled.")
     return redirect("buyer_dashboard")
@@ -361,6 +383,7 @@ def cancel_rent_request(request, pk):
 
 
 @login_required
+@replica_reads
 def seller_dashboard(request):
 
     if not request.user.is_seller:
@@ -417,15 +440,18 @@ def seller_dashboard(request):
         )
 
     # ---------- RENT REQUESTS ----------
-    requests = (
+    tabs, selected_status, requests = _request_tabs(
+        request,
         RentRequest.objects
         .filter(seller=request.user)
         .select_related("buyer", "cloth")
-        .order_by("-created_at")
     )
 
     return render(request, "seller_dashboard.html", {
         "requests": requests,
+        "tabs": tabs,
+        "selected_status": selected_status,
+        "stats": analytics.seller_summary(request.user),
         "profile": profile,
         "address": address,
         "full_address": full_address,
@@ -440,7 +466,7 @@ def seller_dashboard(request):
 def accept_rent_request(request, pk):
 
     rent = get_object_or_404(
-        RentRequest,
+        RentRequest.objects.select_related("cloth", "buyer"),
         pk=pk,
         seller=request.user,
         status="pending"
@@ -448,20 +474,19 @@ def accept_rent_request(request, pk):
 
     cloth = rent.cloth
 
-    # 🔐 Safety check
-    if rent.quantity > cloth.quantity:
-        messages.error(request, "Insufficient stock.")
-        return redirect("seller_dashboard")
+    try:
+        with transaction.atomic():
+            if not rent.transition("accept"):
+                messages.error(request, "This request was already updated.")
+                return redirect("seller_dashboard")
 
-    # ✅ REDUCE STOCK HERE
-    cloth.quantity -= rent.quantity
-    cloth.save()
+            # ✅ RESERVE STOCK (guarded; rolls the transition back if short)
+            inventory.reserve(rent)
 
-    rent.status = "approved"
-    rent.save()
-    send_mail(
-    subject="Your Rent Request is Approved ✅",
-    message=f"""
+            analytics.record_approval(rent)
+            outbox.queue_email(
+                subject="Your Rent Request is Approved ✅",
+                body=f"""
 Hello {rent.buyer.first_name},
 
 Good news! Your rental request has been approved.
@@ -475,13 +500,13 @@ Please proceed with payment.
 
 – Team Rentify
 """,
-    from_email=settings.DEFAULT_FROM_EMAIL,
-    recipient_list=[rent.buyer.email],
-    fail_silently=False
-)
-
+                to=[rent.buyer.email],
+            )
+    except inventory.InsufficientStock:
+        messages.error(request, "Not enough units are free on those dates.")
+        return redirect("seller_dashboard")
 
-    messages.success(request, "Request accepted & stock updated.")
+    messages.success(request, "Request accepted & units reserved.")
     return redirect("seller_dashboard")
 
 
@@ -490,17 +515,20 @@ Please proceed with payment.
 def reject_rent_request(request, pk):
 
     rent = get_object_or_404(
-        RentRequest,
+        RentRequest.objects.select_related("cloth", "buyer"),
         pk=pk,
         seller=request.user,
         status="pending"
     )
 
-    rent.status = "rejected"
-    rent.save()
-    send_mail(
-    subject="Rent Request Rejected ❌",
-    message=f"""
+    with transaction.atomic():
+        if not rent.transition("reject"):
+            messages.error(request, "This request was already updated.")
+            return redirect("seller_dashboard")
+
+        outbox.queue_email(
+            subject="Rent Request Rejected ❌",
+            body=f"""
 Hello {rent.buyer.first_name},
 
 Unfortunately, your rental request has been rejected.
@@ -511,10 +539,8 @@ You can browse other available clothes on Rentify.
 
 – Team Rentify
 """,
-    from_email=settings.DEFAULT_FROM_EMAIL,
-    recipient_list=[rent.buyer.email],
-    fail_silently=False
-)
+            to=[rent.buyer.email],
+        )
 
     messages.success(request, "Request rejected.")
     return redirect("seller_dashboard")
@@ -525,62 +551,23 @@ You can browse other available clothes on Rentify.
 def mark_payment_paid(request, pk):
 
     rent = get_object_or_404(
-        RentRequest,
+        RentRequest.objects.select_related("buyer"),
         pk=pk,
         seller=request.user,
         status="approved"
     )
 
-    rent.payment_status = "paid"
-    rent.save()
-
-    # ================= PDF RECEIPT =================
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    elements.append(Paragraph("<b>RENTIFY – PAYMENT RECEIPT</b>", styles["Title"]))
-    elements.append(Spacer(1, 12))
-
-    elements.append(Paragraph(f"<b>Order ID:</b> RENT{rent.id}", styles["Normal"]))
-    elements.append(Paragraph(f"<b>Payment Status:</b> PAID", styles["Normal"]))
-    elements.append(Spacer(1, 12))
-
-    data = [
-        ["Item Name", rent.cloth.name],
-        ["Seller", rent.seller.first_name],
-        ["Buyer", rent.buyer.first_name],
-        ["Quantity", str(rent.quantity)],
-        ["Rental Period", f"{rent.start_date} to {rent.end_date}"],
-        ["Total Days", str(rent.total_days)],
-        ["Amount Paid", f"₹{rent.total_price}"],
-    ]
-
-    table = Table(data, colWidths=[150, 300])
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-        ("PADDING", (0, 0), (-1, -1), 8),
-    ]))
-
-    elements.append(table)
-    elements.append(Spacer(1, 20))
-
-    elements.append(
-        Paragraph(
-            "Thank you for choosing Rentify. This receipt confirms successful payment.",
-            styles["Italic"]
-        )
-    )
+    # ================= EMAIL WITH PDF =================
+    with transaction.atomic():
+        if not rent.transition("mark_paid"):
+            messages.error(request, "This request was already updated.")
+            return redirect("seller_dashboard")
 
-    doc.build(elements)
-    buffer.seek(0)
+        analytics.record_payment(rent)
 
-    # ================= EMAIL WITH PDF =================
-    email = EmailMessage(
-        subject="Payment Confirmation Receipt 🧾",
-        body=f"""
+        outbox.queue_email(
+            subject="Payment Confirmation Receipt 🧾",
+            body=f"""
 Hello {rent.buyer.first_name},
 
 Your payment has been successfully received.
@@ -591,45 +578,58 @@ Thank you for choosing Rentify.
 
 – Team Rentify
 """,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[rent.buyer.email],
-    )
-
-    email.attach(
-        f"Rentify_Receipt_RENT{rent.id}.pdf",
-        buffer.read(),
-        "application/pdf"
-    )
-
-    email.send(fail_silently=False)
+            to=[rent.buyer.email],
+            # Rendered by the outbox worker, not in this request
+            receipt_ids=[rent.id],
+        )
 
     messages.success(request, "Payment marked as received and receipt emailed.")
     return redirect("seller_dashboard")
 
 
+@login_required
+def download_receipt(request, pk):
+
+    rent = get_object_or_404(
+        RentRequest.objects.select_related("cloth", "buyer", "seller"),
+        Q(buyer=request.user) | Q(seller=request.user),
+        pk=pk,
+        payment_status="paid"
+    )
+
+    # Rendered once, then served straight from media/receipts/
+    fields = receipts.receipt_fields(rent)
+    return FileResponse(
+        default_storage.open(receipts.stored_receipt(fields), "rb"),
+        as_attachment=True,
+        filename=receipts.receipt_filename(fields),
+        content_type="application/pdf"
+    )
+
+
 
 @login_required
 def complete_rental(request, pk):
 
     rent = get_object_or_404(
-        RentRequest,
+        RentRequest.objects.select_related("cloth", "buyer"),
         pk=pk,
         seller=request.user,
         status="approved",
         payment_status="paid"
     )
 
-    cloth = rent.cloth
+    with transaction.atomic():
+        if not rent.transition("complete"):
+            messages.error(request, "This request was already updated.")
+            return redirect("seller_dashboard")
 
-    # 🔁 RESTOCK AFTER RETURN
-    cloth.quantity += rent.quantity
-    cloth.save()
+        # 🔁 RESTOCK AFTER RETURN
+        inventory.release(rent)
 
-    rent.status = "completed"
-    rent.save()
-    send_mail(
-    subject="Rental Completed Successfully 🎉",
-    message=f"""
+        outbox.queue_email(
+            subject="Rental Completed Successfully 🎉",
+            body=f"""
 Hello {rent.buyer.first_name},
 
 Your rental has been completed successfully.
@@ -641,21 +641,146 @@ We hope to see you again on Rentify!
 
 – Team Rentify
 """,
-    from_email=settings.DEFAULT_FROM_EMAIL,
-    recipient_list=[rent.buyer.email],
-    fail_silently=False
-)
+            to=[rent.buyer.email],
+        )
 
 
-    messages.success(request, "Rental completed & stock restored.")
+    messages.success(request, "Rental completed & units released.")
     return redirect("seller_dashboard")
 
 
 
+BULK_LIMIT = 100
+
+BULK_CONFLICT = "Some requests changed while you were working; nothing was updated."
+
+BULK_EMAILS = {
+    "accept": (
+        "Your Rent Requests are Approved ✅",
+        "Good news! These rental requests have been approved:",
+        "Please proceed with payment.",
+    ),
+    "reject": (
+        "Rent Requests Rejected ❌",
+        "Unfortunately, these rental requests have been rejected:",
+        "You can browse other available clothes on Rentify.",
+    ),
+    "complete": (
+        "Rentals Completed Successfully 🎉",
+        "These rentals have been completed successfully:",
+        "Thank you for returning the items. We hope to see you again on Rentify!",
+    ),
+}
+
+
+@login_required
+def bulk_rent_requests(request):
+
+    if request.method != "POST":
+        return redirect("seller_dashboard")
+
+    action = request.POST.get("action")
+    ids = [value for value in request.POST.getlist("ids") if value.isdigit()][:BULK_LIMIT]
+
+    if action not in BULK_EMAILS or not ids:
+        messages.error(request, "Select some requests and an action.")
+        return redirect("seller_dashboard")
+
+    rule = RentRequest.TRANSITIONS[action]
+    rents = list(
+        RentRequest.objects
+        .select_related("cloth", "buyer")
+        .filter(pk__in=ids, seller=request.user)
+        .filter(**{f"{field}__in": allowed for field, allowed in rule["from"].items()})
+        .order_by("created_at", "id")
+    )
+
+    skipped = len(set(ids)) - len(rents)
+
+    if action == "accept":
+        # Oldest requests first, as long as units are free on their dates
+        fits = inventory.fitting(rents)
+        skipped += len(rents) - len(fits)
+        rents = fits
+
+    if not rents:
+        messages.error(request, "None of the selected requests could be updated.")
+        return redirect("seller_dashboard")
+
+    try:
+        with transaction.atomic():
+            if not RentRequest.transition_many(action, rents):
+                transaction.set_rollback(True)
+                messages.error(request, BULK_CONFLICT)
+                return redirect("seller_dashboard")
+
+            if action == "accept":
+                inventory.reserve_many(rents)
+                analytics.record_approvals(rents)
+            elif action == "complete":
+                inventory.release_many(rents)
+
+            # One message per buyer, however many of their requests changed
+            subject, opening, closing = BULK_EMAILS[action]
+            by_buyer = {}
+            for rent in rents:
+                by_buyer.setdefault(rent.buyer_id, []).append(rent)
+
+            for buyer_rents in by_buyer.values():
+                buyer = buyer_rents[0].buyer
+                lines = "\n".join(
+                    f"- {rent.cloth.name} × {rent.quantity}, "
+                    f"{rent.start_date} to {rent.end_date}, ₹{rent.total_price}"
+                    for rent in buyer_rents
+                )
+                outbox.queue_email(
+                    subject=subject,
+                    body=f"""
+Hello {buyer.first_name},
+
+{opening}
+
+{lines}
 
+{closing}
+
+– Team Rentify
+""",
+                    to=[buyer.email],
+                )
+    except inventory.InsufficientStock:
+        messages.error(request, BULK_CONFLICT)
+        return redirect("seller_dashboard")
+
+    messages.success(request, f"{len(rents)} requests updated.")
+    if skipped:
+        messages.warning(request, f"{skipped} requests were skipped (already updated or not enough units free on their dates).")
+    return redirect("seller_dashboard")
+
+
+
+
+
+import math
 
 from app1.models import RentRequest
+from app1 import availability, facets, geo, search
+from app1.caching import (
+    batched_lookups, cloth_namespace, fragment_key, get_version, get_versions,
+    record_lookup,
+)
+from app1.pagination import KeysetPaginator
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+CATALOG_PAGE_SIZE = 24
+CATALOG_PAGE_TIMEOUT = 300
 
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 100
+
+
+@replica_reads
 def rent_clothes(request):
     if request.user.is_authenticated and not request.user.is_buyer:
         messages.error(request, "Only buyers can rent clothes")
@@ -663,21 +788,83 @@ def rent_clothes(request):
 
     selected_category = request.GET.get("category", "all")
     pincode = request.GET.get("pincode")
+    query = request.GET.get("q", "").strip()
+    radius = request.GET.get("radius", "")
+    sort = request.GET.get("sort", "")
 
-    clothes = (
-        Cloth.objects
-        .filter(quantity__gt=0)
-        .prefetch_related("categories", "seller")
-        .order_by("-created_at")
-    )
-
-    if selected_category != "all":
-        clothes = clothes.filter(categories__id=selected_category).distinct()
+    # 📅 OPTIONAL RENTAL WINDOW
+    available_from = request.GET.get("start", "")
+    available_to = request.GET.get("end", "")
+    window = None
 
-    if pincode:
-        clothes = clothes.filter(
-            seller__seller_profile__pickup_address__pincode=pincode
+    if available_from and available_to:
+        try:
+            window = (
+                date.fromisoformat(available_from),
+                date.fromisoformat(available_to)
+            )
+        except ValueError:
+            messages.error(request, "Invalid dates.")
+        else:
+            error = availability.window_error(*window)
+            if error:
+                messages.error(request, error)
+                window = None
+
+    # Without a window, list what is free today
+    today = date.today()
+    listed_window = window or (today, today)
+
+    # Keep the active filters on next / previous and category links
+    params = request.GET.copy()
+    params.pop("cursor", None)
+    filter_query = params.urlencode()
+    params.pop("category", None)
+    category_query = params.urlencode()
+
+    # 🗄️ WHOLE RESULTS BLOCK, CACHED PER FILTER SET + CATALOG VERSION
+    role = "buyer" if request.user.is_authenticated else "guest"
+    page_key = fragment_key("catalog_page", [
+        get_version(facets.CATALOG),
+        role,
+        listed_window,
+        request.GET.urlencode(),
+    ])
+
+    catalog_html = cache.get(page_key)
+    record_lookup("catalog_page", catalog_html is not None)
+
+    if catalog_html is None:
+        window_selected = window is not None
+        context, cacheable = _catalog_results(
+            request,
+            selected_category=selected_category,
+            pincode=pincode,
+            query=query,
+            radius=radius,
+            sort=sort,
+            window=listed_window,
         )
+        context.update({
+            "selected_category": selected_category,
+            "window_selected": window_selected,
+            "filter_query": filter_query,
+            "category_query": category_query,
+        })
+        # Same parts as {% versioned_cache "cloth_card" %} in the template
+        card_keys = [
+            fragment_key("cloth_card", [
+                cloth.id, cloth.cache_version, request.user.is_authenticated,
+                window_selected, getattr(cloth, "distance_km", ""),
+            ])
+            for cloth in context["clothes"]
+        ]
+        with batched_lookups(card_keys):
+            catalog_html = render_to_string(
+                "includes/catalog_results.html", context, request
+            )
+        if cacheable:
+            cache.set(page_key, catalog_html, CATALOG_PAGE_TIMEOUT)
 
     # ✅ buyer active requests
     requested_cloth_ids = []
@@ -689,16 +876,106 @@ def rent_clothes(request):
             ).values_list("cloth_id", flat=True)
         )
 
-    categories = Category.objects.filter(is_active=True)
-
     return render(request, "rent_clothes.html", {
-        "clothes": clothes,
-        "categories": categories,
+        "catalog_html": catalog_html,
         "selected_category": selected_category,
+        "pincode": pincode or "",
+        "query": query,
+        "radius": radius,
+        "sort": sort,
+        "available_from": available_from,
+        "available_to": available_to,
         "requested_cloth_ids": requested_cloth_ids,
     })
 
 
+def _catalog_results(request, selected_category, pincode, query, radius, sort, window):
+    """
+    Run the catalog query for one set of filters. Returns the template
+    context and whether the result may be cached (no user-facing errors).
+    """
+    cacheable = True
+
+    # Cards show categories but never the seller, so nothing else to load
+    clothes = Cloth.objects.prefetch_related("categories")
+
+    # At least one unit free on every day of the window
+    clothes = availability.available_between(clothes, *window)
+
+    # 📍 EXACT PINCODE, OR EVERY SELLER WITHIN `radius` KM OF IT
+    distances = None
+    if pincode and radius:
+        try:
+            radius_km = float(radius)
+        except ValueError:
+            radius_km = DEFAULT_RADIUS_KM
+        # "nan" and "inf" parse too
+        if not math.isfinite(radius_km):
+            radius_km = DEFAULT_RADIUS_KM
+        radius_km = min(max(radius_km, 1), MAX_RADIUS_KM)
+
+        distances = geo.sellers_near(pincode, radius_km)
+        if distances is None:
+            messages.error(request, "We could not locate that pincode.")
+            cacheable = False
+
+        if not distances:
+            clothes = clothes.none()
+        else:
+            clothes = clothes.filter(seller_id__in=distances)
+
+    elif pincode:
+        clothes = clothes.filter(pickup_pincode=pincode)
+
+    # 🔍 FULL-TEXT SEARCH (BM25 RANKED)
+    if query:
+        clothes = search.search_clothes(clothes, query)
+        ordering = ("search_rank", "id")
+    else:
+        ordering = ("-created_at", "-id")
+
+    # 🏷️ CATEGORY COUNTS UNDER EVERY FILTER EXCEPT THE CATEGORY ITSELF
+    category_counts = facets.category_counts(clothes, {
+        "pincode": pincode or "",
+        "radius": radius if pincode else "",
+        "start": window[0],
+        "end": window[1],
+        "q": query,
+    })
+
+    # A cloth holds each category once, so the join needs no DISTINCT
+    if selected_category != "all":
+        clothes = clothes.filter(categories__id=selected_category)
+
+    # 📏 NEAREST SELLERS FIRST
+    if distances and sort == "distance":
+        clothes = clothes.annotate(distance_km=geo.seller_distance_km(distances))
+        ordering = ("distance_km",) + ordering
+
+    # 📄 KEYSET PAGINATION
+    paginator = KeysetPaginator(
+        ordering=ordering,
+        per_page=CATALOG_PAGE_SIZE
+    )
+    page = paginator.paginate(clothes, request.GET.get("cursor"))
+    availability.mark_free_units(page, *window)
+
+    # 🧩 CARD VERSIONS FOR THE FRAGMENT CACHE, ONE CACHE ROUND TRIP
+    versions = get_versions(cloth_namespace(cloth.id) for cloth in page)
+    for cloth in page:
+        cloth.cache_version = versions[cloth_namespace(cloth.id)]
+
+    categories = list(Category.objects.filter(is_active=True))
+    for cat in categories:
+        cat.result_count = category_counts.get(cat.id, 0)
+
+    return {
+        "clothes": page,
+        "page": page,
+        "categories": categories,
+    }, cacheable
+
+
 
 
 
@@ -712,6 +989,8 @@ def list_clothes(request):
         messages.error(request, "Only sellers can list clothes.")
         return redirect("home")
 
+    _report_imports(request)
+
     # 🔎 CATEGORY FILTER
     selected_category = request.GET.get("category", "all")
 
@@ -749,18 +1028,84 @@ def list_clothes(request):
     else:
         form = ClothForm()
 
+    # Free today, which also keys the cards: availability moves with the date
+    today = date.today()
+    clothes = availability.mark_free_units(clothes, today, today)
+    versions = get_versions(cloth_namespace(cloth.id) for cloth in clothes)
+    for cloth in clothes:
+        cloth.cache_version = versions[cloth_namespace(cloth.id)]
+
     categories = Category.objects.filter(is_active=True)
 
-    return render(request, "list_clothes.html", {
-        "form": form,
-        "clothes": clothes,
-        "categories": categories,
-        "selected_category": selected_category,
-    })
+    # Same parts as the {% versioned_cache %} blocks in the template
+    fragment_keys = [
+        fragment_key(name, [cloth.id, cloth.cache_version, cloth.is_available])
+        for cloth in clothes
+        for name in ("seller_cloth_card", "seller_cloth_modal")
+    ]
+    with batched_lookups(fragment_keys):
+        return render(request, "list_clothes.html", {
+            "form": form,
+            "clothes": clothes,
+            "categories": categories,
+            "selected_category": selected_category,
+        })
 
 
 
 
+IMPORT_ERRORS_SHOWN = 10
+
+
+@login_required(login_url="login")
+def import_clothes(request):
+
+    if not request.user.is_seller:
+        messages.error(request, "Only sellers can list clothes.")
+        return redirect("home")
+
+    upload = request.FILES.get("rows")
+    if request.method != "POST" or upload is None:
+        messages.error(request, "Choose a CSV or JSONL file to import.")
+        return redirect("list_clothes")
+
+    # Stored and queued; `manage.py run_imports` does the work
+    imports.queue_import(upload, request.FILES.getlist("images"), request.user)
+    messages.success(
+        request, "Import queued. Your clothes will appear here once it has run."
+    )
+    return redirect("list_clothes")
+
+
+def _report_imports(request):
+    """Tell the seller how their finished imports went, once each."""
+    jobs = list(
+        ClothImport.objects
+        .filter(seller=request.user, status__in=["done", "failed"], reported=False)
+        .order_by("finished_at", "id")
+    )
+    for job in jobs:
+        if job.status == "failed":
+            if job.created:
+                messages.error(
+                    request,
+                    f"An import stopped after {job.created} clothes from its first "
+                    f"{job.rows} rows were imported; upload only the rows after those."
+                )
+            else:
+                messages.error(request, "An import could not be run; please upload it again.")
+            continue
+        if job.created:
+            messages.success(request, f"Imported {job.created} of {job.rows} clothes.")
+        for line, message in job.errors[:IMPORT_ERRORS_SHOWN]:
+            messages.error(request, f"Line {line}: {message}")
+        if job.error_count > IMPORT_ERRORS_SHOWN:
+            messages.error(request, f"…and {job.error_count - IMPORT_ERRORS_SHOWN} more rows with errors.")
+
+    if jobs:
+        ClothImport.objects.filter(id__in=[job.id for job in jobs]).update(reported=True)
+
+
 @login_required(login_url="login")
 def edit_cloth(request, cloth_id):
 
@@ -790,15 +1135,26 @@ def edit_cloth(request, cloth_id):
 
         # ✅ Update fields
         cloth.name = request.POST.get("name")
-        cloth.quantity = quantity          # 🔑 ONLY THIS
         cloth.rent_per_day = rent
         cloth.condition = request.POST.get("condition")
         cloth.description = request.POST.get("description")
 
+        fields = ["name", "rent_per_day", "condition", "description", "updated_at"]
         if request.FILES.get("image"):
             cloth.image = request.FILES["image"]
+            fields.append("image")
 
-        cloth.save()
+        with transaction.atomic():
+            # Units go through the ledger, never a full-row save
+            try:
+                inventory.adjust(cloth, quantity - cloth.quantity)
+            except inventory.InsufficientStock:
+                messages.error(
+                    request, "Some units are rented out; quantity cannot go that low."
+                )
+                return redirect("list_clothes")
+
+            cloth.save(update_fields=fields)
 
         # 🔁 Update categories (ManyToMany)
         category_ids = request.POST.getlist("categories")
@@ -832,6 +1188,7 @@ def delete_cloth(request, cloth_id):
 
 
 @login_required(login_url="login")
+@replica_reads
 def cloth_detail(request, cloth_id):
     cloth = get_object_or_404(Cloth, id=cloth_id)
 
@@ -857,7 +1214,11 @@ def request_cloth(request, cloth_id):
         messages.error(request, "Only buyers can rent clothes.")
         return redirect("home")
 
-    cloth = get_object_or_404(Cloth, id=cloth_id)
+    # Seller, profile and pickup address in the same query
+    cloth = get_object_or_404(
+        Cloth.objects.select_related("seller__seller_profile__pickup_address"),
+        id=cloth_id
+    )
 
     # ================= SELLER LOCATION (FOR MAP) =================
     seller_profile = None
@@ -891,10 +1252,6 @@ def request_cloth(request, cloth_id):
             messages.error(request, "Quantity must be greater than 0.")
             return redirect("request_cloth", cloth_id=cloth.id)
 
-        if quantity > cloth.quantity:
-            messages.error(request, "Requested quantity not available.")
-            return redirect("request_cloth", cloth_id=cloth.id)
-
         # ---------- DATE VALIDATION ----------
         try:
             start_date = date.fromisoformat(start_date_raw)
@@ -908,8 +1265,18 @@ def request_cloth(request, cloth_id):
             messages.error(request, "Start date cannot be in the past.")
             return redirect("request_cloth", cloth_id=cloth.id)
 
-        if end_date < start_date:
-            messages.error(request, "End date cannot be before start date.")
+        error = availability.window_error(start_date, end_date)
+        if error:
+            messages.error(request, error)
+            return redirect("request_cloth", cloth_id=cloth.id)
+
+        # ---------- AVAILABILITY FOR THESE DATES ----------
+        free = availability.free_units(cloth, start_date, end_date)
+        if quantity > free:
+            messages.error(
+                request,
+                f"Only {free} available between {start_date} and {end_date}."
+            )
             return redirect("request_cloth", cloth_id=cloth.id)
 
         # ---------- PICKUP TIME VALIDATION ----------
@@ -924,23 +1291,25 @@ def request_cloth(request, cloth_id):
         total_days = (end_date - start_date).days + 1
         total_price = total_days * quantity * cloth.rent_per_day
 
-        # ---------- SAVE REQUEST (NO STOCK CHANGE) ----------
-        RentRequest.objects.create(
-            buyer=request.user,
-            seller=cloth.seller,
-            cloth=cloth,
-            quantity=quantity,
-            start_date=start_date,
-            end_date=end_date,
-            total_days=total_days,
-            total_price=total_price,
-            buyer_requested_pickup_date=pickup_datetime,
-            buyer_note=note,
-            status="pending"
-        )
-        send_mail(
-    subject="New Rental Request Received 🧥",
-    message=f"""
+        with transaction.atomic():
+            # ---------- SAVE REQUEST (NO STOCK CHANGE) ----------
+            rent = RentRequest.objects.create(
+                buyer=request.user,
+                seller=cloth.seller,
+                cloth=cloth,
+                quantity=quantity,
+                start_date=start_date,
+                end_date=end_date,
+                total_days=total_days,
+                total_price=total_price,
+                buyer_requested_pickup_date=pickup_datetime,
+                buyer_note=note,
+                status="pending"
+            )
+            analytics.record_request(rent)
+            outbox.queue_email(
+                subject="New Rental Request Received 🧥",
+                body=f"""
 Hello {cloth.seller.first_name},
 
 You have received a new rental request.
@@ -954,10 +1323,8 @@ Please login to your seller dashboard to take action.
 
 – Team Rentify
 """,
-    from_email=settings.DEFAULT_FROM_EMAIL,
-    recipient_list=[cloth.seller.email],
-    fail_silently=False
-)
+                to=[cloth.seller.email],
+            )
         messages.success(
             request,
             "Rent request sent successfully. Waiting for seller approval."
@@ -975,52 +1342,74 @@ Please login to your seller dashboard to take action.
     })
 
 
-import random
+from django.urls import reverse
+from django.utils.http import urlencode
+from app1 import otp
+
+RESET_EXPIRED = "Your reset link has expired. Please request a new OTP."
+
+
+def _with_token(name, token):
+    return f"{reverse(name)}?{urlencode({'token': token})}"
+
+
+# The email travels in signed tokens, not the session (see app1.otp)
 def forgot_password(request):
     if request.method == "POST":
-        email = request.POST.get("email")
-        if CustomUser.objects.filter(email=email).exists():
-            otp = random.randint(100000, 999999)
-            request.session["reset_email"] = email
-            request.session["reset_otp"] = str(otp)
+        email = (request.POST.get("email") or "").strip()
+        if otp.rate_limited(email, request.META.get("REMOTE_ADDR")):
+            messages.error(request, "Too many OTP requests. Please try again later.")
+        elif CustomUser.objects.filter(email=email).exists():
+            code = otp.issue(email)
 
             send_mail(
                 "Your Rentify OTP",
-                f"Your OTP for password reset is: {otp}",
+                f"Your OTP for password reset is: {code}",
                 "noreply@rentify.com",
                 [email],
             )
-            return redirect("verify_otp")
+            return redirect(_with_token("verify_otp", otp.verify_token(email)))
         else:
             messages.error(request, "Email not registered")
     return render(request, "forgot_password.html")
 
 
 def verify_otp(request):
+    token = request.POST.get("token") or request.GET.get("token")
+    email = otp.email_from_verify_token(token)
+    if email is None:
+        messages.error(request, RESET_EXPIRED)
+        return redirect("forgot_password")
+
     if request.method == "POST":
-        user_otp = request.POST.get("otp")
-        if user_otp == request.session.get("reset_otp"):
-            return redirect("reset_password")
+        if otp.verify(email, request.POST.get("otp")):
+            return redirect(_with_token("reset_password", otp.reset_token(email)))
         else:
             messages.error(request, "Invalid OTP")
-    return render(request, "verify_otp.html")
+    return render(request, "verify_otp.html", {"token": token})
 
 
 def reset_password(request):
+    token = request.POST.get("token") or request.GET.get("token")
+    email = otp.email_from_reset_token(token)
+    if email is None:
+        messages.error(request, RESET_EXPIRED)
+        return redirect("forgot_password")
+
     if request.method == "POST":
         p1 = request.POST.get("password")
         p2 = request.POST.get("confirm")
 
         if p1 != p2:
             messages.error(request, "Passwords do not match")
+        elif not otp.consume_reset_token(token):
+            messages.error(request, RESET_EXPIRED)
+            return redirect("forgot_password")
         else:
-            email = request.session.get("reset_email")
             user = CustomUser.objects.get(email=email)
             user.set_password(p1)
-            user.save()
-            del request.session["reset_email"]
-            del request.session["reset_otp"]
+            user.save(update_fields=["password"])
             messages.success(request, "Password reset successful")
             return redirect("login")
 
-    return render(request, "reset_password.html")
\ No newline at end of file
+    return render(request, "reset_password.html", {"token": token})
\ No newline at end of file